@@ -1,6 +1,7 @@
 """
 CryptoAnalyzer - Ana Orkestrasyon Sınıfı
 """
+import asyncio
 import time
 import logging
 from datetime import datetime
@@ -8,6 +9,7 @@ import pytz
 from typing import Dict, Optional, List
 from config import TARGET_SYMBOL, MIN_KLINES, MIN_KLINES_PER_TIMEFRAME, TIMEFRAMES
 from indicators import IIndicator
+from klines import as_kline_frame
 from strategies import IStrategy
 from core import ExchangeClient, SignalTracker, TelegramNotifier
 from message_builders import ShortTermMessageBuilder, LongTermMessageBuilder
@@ -15,6 +17,29 @@ from message_builders import ShortTermMessageBuilder, LongTermMessageBuilder
 logger = logging.getLogger(__name__)
 
 
+def _latest_values(indicators: Dict, idx: int) -> Dict:
+    """Strateji context'indeki serilerden idx'teki değerleri al (log için)
+
+    Bazı indikatörler tüm sonuç dict'i olarak tutulur (örn. {"cmo": {"cmo": [...]}});
+    bunlar iç anahtarlarıyla düzleştirilir.
+    """
+    values = {}
+    for key, value in indicators.items():
+        series = value if isinstance(value, dict) else {key: value}
+        for name, data in series.items():
+            if isinstance(data, list) and len(data) > idx:
+                values[name] = data[idx]
+    return values
+
+
+def _builder_indicators(strategy_context: Dict) -> Dict:
+    """Builder'ların beklediği format: tam seriler + vote_breakdown"""
+    indicators = dict(strategy_context.get("indicators", {}))
+    if "vote_breakdown" in strategy_context:
+        indicators["vote_breakdown"] = strategy_context["vote_breakdown"]
+    return indicators
+
+
 class CryptoAnalyzer:
     """Ana orkestrasyon sınıfı - Tüm componentleri koordine eder"""
 
@@ -37,9 +62,56 @@ class CryptoAnalyzer:
         self._short_builder = ShortTermMessageBuilder()
         self._long_builder = LongTermMessageBuilder()
 
+    def _expected_close_time(self, timeframe: str) -> Optional[int]:
+        """Scheduler'ın beklediği mum kapanışı (scheduler yoksa None)"""
+        if self.scheduler and hasattr(self.scheduler, 'next_candle_close'):
+            return self.scheduler.next_candle_close.get(timeframe)
+        return None
+
+    def _data_not_ready(self, timeframe: str, expected_close_time: int, last_completed_candle_close_time: int):
+        """Beklenen mum henüz yok: retry sayacını artır (timeframe kendi backoff'uyla
+        tekrar planlanır), retry hakkı bitince mumu atla"""
+        # Retry counter'ı artır
+        retry_count = self.scheduler.increment_retry(timeframe)
+        max_attempts = self.scheduler.retry_max_attempts
+
+        # Retry hakkı (~60 saniye) bitti mi?
+        if self.scheduler.should_skip_due_to_timeout(timeframe):
+            logger.error(
+                f"{timeframe}: Data TIMEOUT after {max_attempts} retries! "
+                f"Expected close: {expected_close_time}, "
+                f"Got: {last_completed_candle_close_time}. "
+                f"Skipping this candle permanently and moving to next."
+            )
+            # Scheduler'ı güncelle (bir sonraki mumu bekle)
+            self.scheduler.mark_analyzed(timeframe)
+            return
+
+        logger.warning(
+            f"{timeframe}: Data not yet updated (retry {retry_count}/{max_attempts}). "
+            f"Expected close: {expected_close_time}, "
+            f"Got: {last_completed_candle_close_time} "
+            f"(diff: {(expected_close_time - last_completed_candle_close_time) / 1000:.1f}s). "
+            f"Will retry in {self.scheduler.retry_delay(retry_count):.1f}s..."
+        )
+
     async def analyze_timeframe(self, timeframe: str) -> Optional[Dict]:
         """Belirli bir timeframe için analiz yap"""
-        klines = await self.exchange.get_klines(self.symbol, timeframe)
+        # Retry modunda önce ucuz hazırlık kontrolü (outputsize=2) - tam/delta seri
+        # ancak beklenen mum sağlayıcıda oluşunca indirilir
+        expected_close_time = self._expected_close_time(timeframe)
+        if expected_close_time and self.scheduler.retry_counts.get(timeframe, 0) > 0:
+            latest_close_time = await self.exchange.latest_closed_time(self.symbol, timeframe)
+            if latest_close_time is not None and latest_close_time < expected_close_time:
+                self._data_not_ready(timeframe, expected_close_time, latest_close_time)
+                return None
+
+        klines = as_kline_frame(await self.exchange.get_klines(self.symbol, timeframe))
+
+        # Saat aritmetiğiyle başlatılan scheduler'ın kova hizasını ilk yanıtla doğrula
+        if len(klines) > 0 and self.scheduler and hasattr(self.scheduler, 'verify_alignment'):
+            if not self.scheduler.verify_alignment(timeframe, int(klines.close_time[-1])):
+                return None
 
         # Minimum mum kontrolü (TradingView uyumlu)
         # API aktif mumu da döndürür, bu yüzden min+1 gerekli
@@ -47,71 +119,45 @@ class CryptoAnalyzer:
         min_required = MIN_KLINES_PER_TIMEFRAME.get(timeframe, MIN_KLINES)
 
         # En az min_required + 1 mum olmalı (aktif mum dahil)
-        if not klines or len(klines) < min_required + 1:
+        if len(klines) < min_required + 1:
             logger.warning(
                 f"Insufficient data for {self.symbol} {timeframe}: "
-                f"got {len(klines) if klines else 0}, need {min_required + 1}"
+                f"got {len(klines)}, need {min_required + 1}"
             )
             return None
 
-        # Stratejiyi çağır ve sinyal al
-        indicator_values = self.indicator.calculate(klines)
-        signal = self.strategy.analyze(indicator_values, klines)
+        # Stratejiyi çağır ve sinyal al (indikatörler strateji içinde bir kez hesaplanır)
+        signal, strategy_context = self.strategy.analyze(None, klines)
+
+        # Builder'lar tam serileri + oylama detayını bekler
+        # (lazy modda eksik kalan kısım mesaj öncesi _complete_breakdowns ile tamamlanır)
+        indicators = _builder_indicators(strategy_context)
 
         # Sinyal bilgilerini hazırla
         # SON KAPANMIŞ MUMU KULLAN (aktif mum hariç) - TradingView senkronizasyonu için
-        closes = [float(k[4]) for k in klines]
+        closes = klines.close.tolist()
         curr_idx = len(klines) - 2  # Son kapanmış mum
 
         # Data validation kontrolü
         # Aldığımız son kapanmış mumun close_time'ını kontrol et
-        last_completed_candle_close_time = int(klines[curr_idx][6])  # close_time (ms)
+        last_completed_candle_close_time = int(klines.close_time[curr_idx])  # close_time (ms)
 
         # Scheduler varsa, beklenen close time ile karşılaştır
-        if self.scheduler and hasattr(self.scheduler, 'next_candle_close'):
-            expected_close_time = self.scheduler.next_candle_close.get(timeframe)
-            if expected_close_time:
-                # Son kapanmış mum, beklenen mumdan ESKİ mi?
-                if last_completed_candle_close_time < expected_close_time:
-                    # Retry counter'ı artır
-                    retry_count = self.scheduler.increment_retry(timeframe)
-
-                    # 60 saniye (6 retry x 10 saniye) geçti mi?
-                    if self.scheduler.should_skip_due_to_timeout(timeframe):
-                        logger.error(
-                            f"{timeframe}: Data TIMEOUT after 6 retries (60 seconds)! "
-                            f"Expected close: {expected_close_time}, "
-                            f"Got: {last_completed_candle_close_time}. "
-                            f"Skipping this candle permanently and moving to next."
-                        )
-                        # Scheduler'ı güncelle (bir sonraki mumu bekle)
-                        self.scheduler.mark_analyzed(timeframe)
-                        return None  # Analiz yok (mum atlandı)
-
-                    logger.warning(
-                        f"{timeframe}: Data not yet updated (retry {retry_count}/6). "
-                        f"Expected close: {expected_close_time}, "
-                        f"Got: {last_completed_candle_close_time} "
-                        f"(diff: {(expected_close_time - last_completed_candle_close_time) / 1000:.1f}s). "
-                        f"Will retry on next loop cycle..."
-                    )
-                    return None  # Bu iterasyonu atla, bir sonraki döngüde tekrar dene
-                else:
-                    # Timestamp validation başarılı, retry counter'ı sıfırla
-                    self.scheduler.reset_retry(timeframe)
+        if expected_close_time:
+            # Son kapanmış mum, beklenen mumdan ESKİ mi?
+            if last_completed_candle_close_time < expected_close_time:
+                self._data_not_ready(timeframe, expected_close_time, last_completed_candle_close_time)
+                return None  # Bu iterasyonu atla (ya da timeout'ta mum atlandı), backoff sonunda tekrar dene
+            else:
+                # Timestamp validation başarılı, retry counter'ı sıfırla
+                self.scheduler.reset_retry(timeframe)
 
-        timestamp = int(klines[curr_idx][0]) // 1000
+        timestamp = int(klines.open_time[curr_idx]) // 1000
 
         # NEUTRAL durumlar için loglama
         if signal == "NEUTRAL":
-            # indicator_values dictionary'den değerleri al (arrays)
-            indicators_raw = indicator_values if isinstance(indicator_values, dict) else {}
-            
             # curr_idx ile son değerleri al
-            indicators_data = {}
-            for key, value in indicators_raw.items():
-                if isinstance(value, list) and len(value) > curr_idx:
-                    indicators_data[key] = value[curr_idx]
+            indicators_data = _latest_values(indicators, curr_idx)
 
             # NEUTRAL durumlar için log
             log_parts = [
@@ -140,21 +186,16 @@ class CryptoAnalyzer:
                 "signal": "NEUTRAL",
                 "price": closes[curr_idx],
                 "timestamp": timestamp,
-                "indicators": indicators_data
+                "indicators": indicators,
+                "indicator_values": indicators_data,
+                "strategy_context": strategy_context
             }
 
-        # Sinyali tracker'a kaydet (mesaj gönderme kontrolü için değil, sadece "son sinyal" bilgisi için)
-        self.tracker.last_signals[f"{self.symbol}_{timeframe}"] = signal
-        self.tracker.signal_timestamps[f"{self.symbol}_{timeframe}"] = timestamp
+        # Sinyal tracker'a burada yazılmaz - batch'teki should_send() değişimi kontrol edip kaydeder
+        # (önceden yazılırsa her sinyal tekrar sayılır ve mesaj hiç gönderilmez)
 
-        # İndikatör değerlerini hazırla (mesajda göstermek için)
-        indicators_raw = indicator_values if isinstance(indicator_values, dict) else {}
-        
-        # curr_idx ile son değerleri al
-        indicators_data = {}
-        for key, value in indicators_raw.items():
-            if isinstance(value, list) and len(value) > curr_idx:
-                indicators_data[key] = value[curr_idx]
+        # curr_idx ile son değerleri al (log için)
+        indicators_data = _latest_values(indicators, curr_idx)
 
         # Detaylı sinyal + indikatör logu
         log_parts = [
@@ -182,9 +223,29 @@ class CryptoAnalyzer:
             "signal": signal,
             "price": closes[curr_idx],
             "timestamp": timestamp,
-            "indicators": indicators_data
+            "indicators": indicators,
+            "indicator_values": indicators_data,
+            "strategy_context": strategy_context
         }
 
+    async def _analyze_concurrently(self, timeframes: List[str]) -> Dict[str, Optional[Dict]]:
+        """Timeframe'leri asyncio.gather ile eşzamanlı analiz et
+
+        Latency toplam değil en yavaş isteğin süresi olur. Bir timeframe'deki hata
+        diğerlerini etkilemez (o timeframe sonuçsuz sayılır ve sonraki döngüde tekrar denenir).
+        """
+        outcomes = await asyncio.gather(
+            *(self.analyze_timeframe(timeframe) for timeframe in timeframes),
+            return_exceptions=True
+        )
+        results = {}
+        for timeframe, outcome in zip(timeframes, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error analyzing {timeframe}: {outcome}", exc_info=outcome)
+                outcome = None
+            results[timeframe] = outcome
+        return results
+
     async def analyze_short_term_batch(self, timeframes: List[str]) -> List[str]:
         """Kısa vadeli timeframe'leri toplu analiz et (1m, 5m, 15m, 1h)
 
@@ -199,10 +260,15 @@ class CryptoAnalyzer:
             # Her timeframe için analiz sonuçlarını topla
             results = {}
 
+            # Mumu kapanan timeframe'leri eşzamanlı analiz et (rate limit client'ta)
+            analyzed = await self._analyze_concurrently(
+                [tf for tf in ["1m", "5m", "15m", "1h"] if tf in timeframes]
+            )
+
             for timeframe in ["1m", "5m", "15m", "1h"]:  # Tüm kısa vadeli timeframe'leri kontrol et
                 if timeframe in timeframes:
-                    # Bu timeframe mum kapandı, analiz et
-                    result = await self.analyze_timeframe(timeframe)
+                    # Bu timeframe mum kapandı, analiz sonucu
+                    result = analyzed.get(timeframe)
                     if result:
                         results[timeframe] = result
                         successfully_analyzed.append(timeframe)  # ✅ BAŞARILI
@@ -264,10 +330,12 @@ class CryptoAnalyzer:
             # Her timeframe için analiz sonuçlarını topla
             results = {}
 
+            analyzed = await self._analyze_concurrently([tf for tf in ["4h"] if tf in timeframes])
+
             for timeframe in ["4h"]:  # Uzun vade timeframe'ini kontrol et
                 if timeframe in timeframes:
-                    # Bu timeframe mum kapandı, analiz et
-                    result = await self.analyze_timeframe(timeframe)
+                    # Bu timeframe mum kapandı, analiz sonucu
+                    result = analyzed.get(timeframe)
                     if result:
                         results[timeframe] = result
                         successfully_analyzed.append(timeframe)  # ✅ BAŞARILI
@@ -346,11 +414,21 @@ class CryptoAnalyzer:
         if not short_term_signals and not long_term_signals:
             logger.info("No signals generated on any timeframe")
 
+    def _complete_breakdowns(self, results: Dict):
+        """Lazy oylamada değerlendirilmeyen indikatörleri mesajdan önce tamamla"""
+        for result in results.values():
+            if not result or "strategy_context" not in result:
+                continue
+            if result["strategy_context"].get("vote_breakdown", {}).get("pending"):
+                strategy_context = self.strategy.complete(result["strategy_context"])
+                result["indicators"] = _builder_indicators(strategy_context)
+
     async def _send_short_term_batch_message(self, results: Dict):
         first_active_result = next((r for r in results.values() if r is not None), None)
         if not first_active_result:
             logger.warning("No active results in batch, skipping message")
             return
+        self._complete_breakdowns(results)
         symbol = first_active_result['symbol']
         price = first_active_result['price']
         message = self._short_builder.build(symbol, price, results, self.tracker)
@@ -392,7 +470,7 @@ class CryptoAnalyzer:
             if timeframe in signals:
                 signal_data = signals[timeframe]
                 signal_type = signal_data['signal']
-                indicators = signal_data['indicators']
+                indicators = signal_data.get('indicator_values', signal_data['indicators'])
 
                 if signal_type == "BUY":
                     message += f"{tf_info['emoji']} *{tf_info['name']}*\n"
@@ -501,6 +579,7 @@ class CryptoAnalyzer:
         if not first_active_result:
             logger.warning("No active results in long-term batch, skipping message")
             return
+        self._complete_breakdowns(results)
         symbol = first_active_result['symbol']
         price = first_active_result['price']
         message = self._long_builder.build(symbol, price, results, self.tracker)
@@ -540,7 +619,7 @@ class CryptoAnalyzer:
             if timeframe in signals:
                 signal_data = signals[timeframe]
                 signal_type = signal_data['signal']
-                indicators = signal_data['indicators']
+                indicators = signal_data.get('indicator_values', signal_data['indicators'])
 
                 if signal_type == "BUY":
                     message += f"{tf_info['emoji']} *{tf_info['name']}*\n"
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Vektörel Backtest - MajorityVoteStrategy geçmiş performansı
+
+Strateji oylaması ``analyze_series`` ile tüm barlar için tek seferde hesaplanır,
+gönderilecek sinyaller ``SignalTracker.should_send`` ile aynı kuralla ayıklanır ve
+her gönderilen sinyal bir pozisyon dönüşü (BUY -> long, SELL -> short) olarak
+simüle edilir.
+
+Simülasyon varsayımları:
+- Sinyal i. mumun kapanışında üretilir, giriş fiyatı close[i]'dir (mesajdaki fiyat)
+- Pozisyon bir sonraki ters yönlü gönderilen sinyale kadar tutulur (stop/TP yok)
+- Son açık pozisyon son kapanış fiyatından değerlenir
+- PnL fiyat birimindedir (XAU/USD için 1 ons başına USD), komisyon/spread yok
+
+Kullanım:
+    python backtest.py --csv 1m=data/xauusd_1m.csv --csv 5m=data/xauusd_5m.csv
+    python backtest.py --csv 1m=data/xauusd_1m.csv --resample 5m,15m,1h,4h
+"""
+import argparse
+import csv
+import logging
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import (
+    TARGET_SYMBOL, MIN_KLINES, MIN_KLINES_PER_TIMEFRAME,
+    CMO_LENGTH,
+    STOCH_PERIOD_K, STOCH_SMOOTH_K, STOCH_SMOOTH_D,
+    RSI_LENGTH,
+    MACD_FAST_LENGTH, MACD_SLOW_LENGTH, MACD_SIGNAL_LENGTH,
+    STOCH_RSI_LENGTH_RSI, STOCH_RSI_LENGTH_STOCH, STOCH_RSI_SMOOTH_K, STOCH_RSI_SMOOTH_D,
+    WILLIAMS_R_LENGTH, FISHER_LENGTH, CORAL_PERIOD, CORAL_MULTIPLIER,
+    INDICATOR_BACKEND, RESAMPLE_OFFSETS_MS
+)
+from core import TimeframeScheduler
+from indicators import (
+    ChandeMomentumOscillator, StochasticOscillator, RelativeStrengthIndex, MACD,
+    StochasticRSI, WilliamsR, FisherTransform, CoralTrend
+)
+from klines import KlineFrame
+from resampler import resample
+from strategies import MajorityVoteStrategy, DEFAULT_THRESHOLDS, VOTE_NEUTRAL
+
+logger = logging.getLogger(__name__)
+
+
+# Strateji parametreleri (config.py isimleriyle) - build_strategy(params=...) ile override edilir
+DEFAULT_PARAMS: Dict[str, float] = {
+    "CMO_LENGTH": CMO_LENGTH,
+    "STOCH_PERIOD_K": STOCH_PERIOD_K, "STOCH_SMOOTH_K": STOCH_SMOOTH_K, "STOCH_SMOOTH_D": STOCH_SMOOTH_D,
+    "RSI_LENGTH": RSI_LENGTH,
+    "MACD_FAST_LENGTH": MACD_FAST_LENGTH, "MACD_SLOW_LENGTH": MACD_SLOW_LENGTH,
+    "MACD_SIGNAL_LENGTH": MACD_SIGNAL_LENGTH,
+    "STOCH_RSI_LENGTH_RSI": STOCH_RSI_LENGTH_RSI, "STOCH_RSI_LENGTH_STOCH": STOCH_RSI_LENGTH_STOCH,
+    "STOCH_RSI_SMOOTH_K": STOCH_RSI_SMOOTH_K, "STOCH_RSI_SMOOTH_D": STOCH_RSI_SMOOTH_D,
+    "WILLIAMS_R_LENGTH": WILLIAMS_R_LENGTH,
+    "FISHER_LENGTH": FISHER_LENGTH,
+    "CORAL_PERIOD": CORAL_PERIOD, "CORAL_MULTIPLIER": CORAL_MULTIPLIER,
+    **DEFAULT_THRESHOLDS,
+}
+
+
+def build_strategy(backend: str = INDICATOR_BACKEND, params: Optional[Dict[str, float]] = None,
+                   lazy: bool = False) -> MajorityVoteStrategy:
+    """main.py ile aynı parametrelerle strateji oluştur
+
+    Args:
+        backend: İndikatör backend'i
+        params: DEFAULT_PARAMS üzerine yazılacak değerler (örn. {"CMO_LENGTH": 9})
+        lazy: Lazy oylama (backtest'te tüm oylar gerekir; replay canlı ayarı kullanır)
+    """
+    unknown = set(params or {}) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown strategy parameter(s): {', '.join(sorted(unknown))}")
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    return MajorityVoteStrategy(
+        cmo_indicator=ChandeMomentumOscillator(length=int(p["CMO_LENGTH"]), use_low=True, backend=backend),
+        stoch_indicator=StochasticOscillator(
+            period_k=int(p["STOCH_PERIOD_K"]), smooth_k=int(p["STOCH_SMOOTH_K"]),
+            smooth_d=int(p["STOCH_SMOOTH_D"]), backend=backend
+        ),
+        rsi_indicator=RelativeStrengthIndex(length=int(p["RSI_LENGTH"]), backend=backend),
+        macd_indicator=MACD(
+            fast_length=int(p["MACD_FAST_LENGTH"]), slow_length=int(p["MACD_SLOW_LENGTH"]),
+            signal_length=int(p["MACD_SIGNAL_LENGTH"])
+        ),
+        stoch_rsi_indicator=StochasticRSI(
+            length_rsi=int(p["STOCH_RSI_LENGTH_RSI"]), length_stoch=int(p["STOCH_RSI_LENGTH_STOCH"]),
+            smooth_k=int(p["STOCH_RSI_SMOOTH_K"]), smooth_d=int(p["STOCH_RSI_SMOOTH_D"]), backend=backend
+        ),
+        williams_r_indicator=WilliamsR(length=int(p["WILLIAMS_R_LENGTH"]), backend=backend),
+        fisher_indicator=FisherTransform(length=int(p["FISHER_LENGTH"])),
+        coral_indicator=CoralTrend(period=int(p["CORAL_PERIOD"]), multiplier=float(p["CORAL_MULTIPLIER"])),
+        lazy=lazy,
+        thresholds={name: p[name] for name in DEFAULT_THRESHOLDS}
+    )
+
+
+def sent_signal_indices(signal: np.ndarray) -> np.ndarray:
+    """SignalTracker.should_send ile gönderilecek sinyallerin indeksleri
+
+    should_send yalnızca BUY/SELL için çağrılır ve son gönderilen sinyalden farklıysa
+    True döner (başlangıç NEUTRAL). NEUTRAL barlar son sinyali sıfırlamaz; yani
+    BUY, NEUTRAL, BUY dizisinde yalnızca ilk BUY gönderilir.
+    """
+    active = np.flatnonzero(signal != VOTE_NEUTRAL)
+    if len(active) == 0:
+        return active
+    directions = signal[active]
+    changed = np.empty(len(active), dtype=bool)
+    changed[0] = True
+    changed[1:] = directions[1:] != directions[:-1]
+    return active[changed]
+
+
+def simulate_trades(signal: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+    """Gönderilen sinyallerde pozisyonu çevir ve trade sonuçlarını hesapla
+
+    Returns:
+        Dict (trade başına array'ler): entry_index, exit_index, direction (1/-1),
+        entry_price, exit_price, pnl (fiyat birimi), return_pct
+    """
+    entries = sent_signal_indices(signal)
+    if len(entries) == 0:
+        empty_int = np.empty(0, dtype=np.int64)
+        empty = np.empty(0, dtype=np.float64)
+        return {
+            "entry_index": empty_int, "exit_index": empty_int, "direction": empty_int,
+            "entry_price": empty, "exit_price": empty, "pnl": empty, "return_pct": empty
+        }
+
+    exits = np.empty(len(entries), dtype=np.int64)
+    exits[:-1] = entries[1:]
+    exits[-1] = len(close) - 1  # Son pozisyon son kapanıştan değerlenir
+
+    direction = signal[entries].astype(np.int64)
+    entry_price = close[entries]
+    exit_price = close[exits]
+    pnl = direction * (exit_price - entry_price)
+    return {
+        "entry_index": entries,
+        "exit_index": exits,
+        "direction": direction,
+        "entry_price": entry_price,
+        "exit_price": exit_price,
+        "pnl": pnl,
+        "return_pct": pnl / entry_price * 100
+    }
+
+
+def _max_drawdown(pnl: np.ndarray) -> float:
+    """Kümülatif trade PnL'indeki en büyük tepe-dip düşüşü"""
+    if len(pnl) == 0:
+        return 0.0
+    equity = np.concatenate(([0.0], np.cumsum(pnl)))
+    return float(np.max(np.maximum.accumulate(equity) - equity))
+
+
+def trade_metrics(signal: np.ndarray, close: np.ndarray) -> Dict:
+    """Sinyal serisi için trade simülasyonu + özet metrikler"""
+    trades = simulate_trades(signal, close)
+    pnl = trades["pnl"]
+    wins = int(np.count_nonzero(pnl > 0))
+    return {
+        "signal_bars": int(np.count_nonzero(signal)),
+        "sent_signals": len(pnl),
+        "trades": trades,
+        "wins": wins,
+        "hit_rate": wins / len(pnl) if len(pnl) else 0.0,
+        "total_pnl": float(pnl.sum()),
+        "avg_pnl": float(pnl.mean()) if len(pnl) else 0.0,
+        "total_return_pct": float(trades["return_pct"].sum()),
+        "max_drawdown": _max_drawdown(pnl),
+    }
+
+
+def backtest_frame(
+    frame: KlineFrame,
+    timeframe: str,
+    strategy: Optional[MajorityVoteStrategy] = None,
+    threshold: Optional[int] = None
+) -> Dict:
+    """Tek timeframe için backtest
+
+    Args:
+        frame: Kapanmış mumlar (eskiden yeniye)
+        timeframe: Rapor etiketi ve minimum mum sayısı için (örn. "1m")
+        strategy: Varsayılan build_strategy()
+        threshold: Majority vote eşiği (varsayılan MINIMUM_VOTE_THRESHOLD)
+
+    Returns:
+        Dict: Özet metrikler + "trades" (simulate_trades çıktısı)
+    """
+    started = time.perf_counter()
+    strategy = strategy or build_strategy()
+    series = strategy.analyze_series(frame, threshold=threshold)
+
+    # Canlıdaki minimum mum kontrolü: ilk min_required mumda analiz yapılmaz
+    signal = series["signal"].copy()
+    min_required = MIN_KLINES_PER_TIMEFRAME.get(timeframe, MIN_KLINES)
+    signal[:min_required] = VOTE_NEUTRAL
+
+    return {
+        "timeframe": timeframe,
+        "bars": len(frame),
+        "threshold": series["threshold"],
+        **trade_metrics(signal, frame.close),
+        "elapsed": time.perf_counter() - started
+    }
+
+
+def run_backtest(
+    frames: Dict[str, KlineFrame],
+    strategy: Optional[MajorityVoteStrategy] = None,
+    threshold: Optional[int] = None
+) -> Dict[str, Dict]:
+    """Birden fazla timeframe için backtest (timeframe -> backtest_frame sonucu)"""
+    strategy = strategy or build_strategy()
+    results = {}
+    for timeframe, frame in frames.items():
+        results[timeframe] = backtest_frame(frame, timeframe, strategy, threshold)
+        logger.info(
+            f"{timeframe}: {results[timeframe]['bars']} bars, "
+            f"{results[timeframe]['sent_signals']} trades in {results[timeframe]['elapsed']:.2f}s"
+        )
+    return results
+
+
+def format_report(results: Dict[str, Dict], symbol: str = TARGET_SYMBOL) -> str:
+    """Sonuçları tablo olarak formatla"""
+    lines = [
+        f"Backtest - {symbol}",
+        f"{'TF':<5}{'Bars':>10}{'Trades':>8}{'Hit%':>8}{'PnL':>12}{'Avg':>9}{'Ret%':>9}{'MaxDD':>10}{'Sec':>7}"
+    ]
+    for timeframe, r in results.items():
+        lines.append(
+            f"{timeframe:<5}{r['bars']:>10}{r['sent_signals']:>8}{r['hit_rate'] * 100:>8.1f}"
+            f"{r['total_pnl']:>12.2f}{r['avg_pnl']:>9.2f}{r['total_return_pct']:>9.2f}"
+            f"{r['max_drawdown']:>10.2f}{r['elapsed']:>7.2f}"
+        )
+    return "\n".join(lines)
+
+
+def load_csv(path: str, timeframe: str) -> KlineFrame:
+    """CSV'den KlineFrame oku
+
+    Beklenen başlıklar: datetime (UTC, "YYYY-MM-DD HH:MM:SS" veya epoch sn/ms),
+    open, high, low, close, [volume]. Ayraç otomatik algılanır (, veya ;).
+    Satırlar eskiden yeniye sıralanır.
+    """
+    with open(path, newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        rows = list(csv.DictReader(f, dialect=dialect))
+    if not rows:
+        return KlineFrame.empty()
+
+    columns = {name.strip().lower(): name for name in rows[0].keys()}
+    time_column = columns.get("datetime") or columns.get("timestamp") or columns.get("time")
+    raw_times = [row[time_column].strip() for row in rows]
+    if raw_times[0].isdigit():
+        open_time = np.array(raw_times, dtype=np.int64)
+        if open_time[0] < 10_000_000_000:  # saniye -> ms
+            open_time = open_time * 1000
+    else:
+        open_time = np.array(raw_times, dtype="datetime64[ms]").astype(np.int64)
+
+    def column(name: str) -> np.ndarray:
+        if name not in columns:
+            return np.zeros(len(rows))
+        return np.array([row[columns[name]] for row in rows], dtype=np.float64)
+
+    order = np.argsort(open_time, kind="stable")
+    return KlineFrame(
+        open_time[order], column("open")[order], column("high")[order],
+        column("low")[order], column("close")[order], column("volume")[order],
+        interval_ms=TimeframeScheduler.TIMEFRAME_MS.get(timeframe, 60 * 1000)
+    )
+
+
+def load_frames(csv_items: List[str], resample_timeframes: Optional[List[str]] = None) -> Dict[str, KlineFrame]:
+    """``TF=PATH`` listesinden frame'leri oku, istenen timeframe'leri 1m serisinden türet
+
+    Canlı bot ``ResamplingClient`` ile aynı kovalama kuralını kullanır, böylece
+    backtest canlıda analiz edilen mumlarla aynı mumları görür.
+    """
+    frames = {}
+    for item in csv_items:
+        timeframe, path = item.split("=", 1)
+        frames[timeframe] = load_csv(path, timeframe)
+
+    for timeframe in resample_timeframes or []:
+        if "1m" not in frames:
+            raise ValueError("Resampling requires a 1m CSV (--csv 1m=PATH)")
+        frames[timeframe] = resample(
+            frames["1m"], TimeframeScheduler.TIMEFRAME_MS[timeframe], RESAMPLE_OFFSETS_MS.get(timeframe, 0)
+        )
+    return frames
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="MajorityVoteStrategy vektörel backtest")
+    parser.add_argument(
+        "--csv", action="append", required=True, metavar="TF=PATH",
+        help="Timeframe ve CSV dosyası (örn. 1m=data/xauusd_1m.csv), birden fazla verilebilir"
+    )
+    parser.add_argument("--threshold", type=int, default=None, help="Majority vote eşiği")
+    parser.add_argument("--backend", default=INDICATOR_BACKEND, help="İndikatör backend'i")
+    parser.add_argument("--resample", default="", metavar="TF,TF",
+                        help="1m CSV'den türetilecek timeframe'ler (örn. 5m,15m,1h,4h)")
+    args = parser.parse_args(argv)
+
+    frames = load_frames(args.csv, [tf for tf in args.resample.split(",") if tf])
+
+    results = run_backtest(frames, build_strategy(args.backend), args.threshold)
+    print(format_report(results))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    main()
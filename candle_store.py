@@ -0,0 +1,118 @@
+"""
+Kalıcı Mum Deposu - SQLite (symbol + interval + open_time anahtarlı)
+"""
+import logging
+import sqlite3
+from typing import Optional
+
+import numpy as np
+
+from klines import KlineFrame
+
+logger = logging.getLogger(__name__)
+
+
+class CandleStore:
+    """Mumları diskte (SQLite) saklar, restart ve analizler arasında tekrar kullanır
+
+    Her satır (symbol, interval, open_time) ile tekildir; aynı mum tekrar yazılırsa
+    üzerine yazılır (INSERT OR REPLACE). Böylece API'den gelen çakışan kuyruk ile
+    depodaki geçmiş birleştirilirken tekrar eden mum oluşmaz ve henüz kapanmamış
+    son mumun güncel değeri saklanır.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS candles (
+            symbol    TEXT    NOT NULL,
+            interval  TEXT    NOT NULL,
+            open_time INTEGER NOT NULL,
+            open      REAL    NOT NULL,
+            high      REAL    NOT NULL,
+            low       REAL    NOT NULL,
+            close     REAL    NOT NULL,
+            volume    REAL    NOT NULL,
+            PRIMARY KEY (symbol, interval, open_time)
+        ) WITHOUT ROWID
+    """
+
+    def __init__(self, path: str, max_rows: int = 5000):
+        """
+        Args:
+            path: SQLite dosya yolu (":memory:" test için kullanılabilir)
+            max_rows: symbol + interval başına tutulacak en fazla mum (eskiler silinir)
+        """
+        self.path = path
+        self.max_rows = max_rows
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(self.SCHEMA)
+        self.conn.commit()
+        logger.info(f"CandleStore opened: {path} (max {max_rows} candles per series)")
+
+    def last_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        """Depodaki en yeni mumun açılış zamanı (ms), seri yoksa None"""
+        row = self.conn.execute(
+            "SELECT MAX(open_time) FROM candles WHERE symbol = ? AND interval = ?",
+            (symbol, interval),
+        ).fetchone()
+        return None if row is None or row[0] is None else int(row[0])
+
+    def count(self, symbol: str, interval: str) -> int:
+        """Serideki mum sayısı"""
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM candles WHERE symbol = ? AND interval = ?",
+            (symbol, interval),
+        ).fetchone()
+        return int(row[0])
+
+    def load(self, symbol: str, interval: str, limit: int, interval_ms: int) -> KlineFrame:
+        """Son ``limit`` mumu en eskiden en yeniye sıralı KlineFrame olarak döndür"""
+        rows = self.conn.execute(
+            "SELECT open_time, open, high, low, close, volume FROM candles "
+            "WHERE symbol = ? AND interval = ? ORDER BY open_time DESC LIMIT ?",
+            (symbol, interval, limit),
+        ).fetchall()
+        if not rows:
+            return KlineFrame.empty()
+        rows.reverse()
+        data = np.array(rows, dtype=np.float64)
+        return KlineFrame(
+            data[:, 0].astype(np.int64), data[:, 1], data[:, 2], data[:, 3], data[:, 4],
+            data[:, 5], interval_ms=interval_ms
+        )
+
+    def upsert(self, symbol: str, interval: str, frame: KlineFrame) -> int:
+        """Frame'deki mumları yaz (çakışanların üzerine yazılır), yazılan satır sayısını döndür"""
+        if len(frame) == 0:
+            return 0
+        rows = zip(
+            [symbol] * len(frame), [interval] * len(frame),
+            frame.open_time.tolist(), frame.open.tolist(), frame.high.tolist(),
+            frame.low.tolist(), frame.close.tolist(), frame.volume.tolist(),
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO candles "
+            "(symbol, interval, open_time, open, high, low, close, volume) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self._prune(symbol, interval)
+        self.conn.commit()
+        return len(frame)
+
+    def _prune(self, symbol: str, interval: str):
+        """max_rows'tan eski mumları sil (commit upsert içinde yapılır)"""
+        if not self.max_rows:
+            return
+        self.conn.execute(
+            "DELETE FROM candles WHERE symbol = ? AND interval = ? AND open_time < ("
+            "SELECT open_time FROM candles WHERE symbol = ? AND interval = ? "
+            "ORDER BY open_time DESC LIMIT 1 OFFSET ?)",
+            (symbol, interval, symbol, interval, self.max_rows - 1),
+        )
+
+    def close(self):
+        """Veritabanı bağlantısını kapat"""
+        self.conn.close()
+        logger.info("CandleStore closed")
@@ -26,6 +26,32 @@ MIN_KLINES_PER_TIMEFRAME = {
     "4h": 100    
 }
 
+# İndikatör hesaplama backend'i ("python" veya "numpy")
+# numpy: CMO, Stochastic, RSI, Stochastic RSI ve Williams %R için array tabanlı hesaplama (aynı sonuçlar, daha hızlı)
+INDICATOR_BACKEND = "numpy"
+
+# Kalıcı mum deposu (SQLite) - restart ve analizler arasında geçmiş tekrar indirilmez
+# Boş bırakılırsa her istekte tam seri (outputsize=limit) indirilir
+CANDLE_STORE_PATH = "candles.db"
+CANDLE_STORE_MAX_ROWS = 5000  # symbol + timeframe başına saklanacak en fazla mum
+
+# Resampling - üst timeframe'ler tek bir 1m serisinden türetilir (saat başında 5 yerine 1 API çağrısı)
+# Boş liste: her timeframe sağlayıcıdan ayrı ayrı indirilir
+RESAMPLE_TIMEFRAMES = ["5m", "15m", "1h", "4h"]
+RESAMPLE_OFFSETS_MS = {"4h": 0}  # Kova hizalama kayması (ms) - sağlayıcının 4h mumları UTC 00:00'dan kayıksa
+# (scheduler'ın saat aritmetiğiyle başlatılması da aynı hizalamayı kullanır)
+
+# Scheduler başlangıcı - mum kapanışları UTC kova aritmetiğinden hesaplanır (API çağrısı yok);
+# hizalama ilk analizde sağlayıcının mumuyla doğrulanır, uymazsa sağlayıcınınki kullanılır.
+# False: her timeframe için başlangıçta get_klines(limit=2) çağrılır
+SCHEDULER_CLOCK_INIT = True
+# Bayat mum retry'ı - her timeframe kendi backoff zamanlayıcısıyla tekrar denenir
+# (diğer timeframe'ler ve ana döngü etkilenmez): 5, 10, 10, 10, 10, 10 sn -> ~55 sn sonra mum atlanır
+RETRY_BASE_DELAY = 5.0  # sn, ilk retry
+RETRY_MAX_DELAY = 10.0  # sn, her retry'da iki katına çıkar, bu değerle sınırlı (rate limit: 8 req/min)
+RETRY_MAX_ATTEMPTS = 6
+RESAMPLE_VERIFY_EVERY = 12  # Her timeframe için kaç türetmede bir sağlayıcı ile karşılaştırılır (0: kapalı)
+
 # Chande Momentum Oscillator Parametreleri
 CMO_LENGTH = 13
 CMO_OVERBOUGHT = 62.01  # Sell sinyali (simetrik)
@@ -73,6 +99,7 @@ CORAL_MULTIPLIER = 0.4  # ATR çarpanı (0.2-0.6 arası önerilir)
 
 # Strateji Parametreleri - Majority Vote
 MINIMUM_VOTE_THRESHOLD = 4  # 8 indikatörden en az kaç tanesi aynı yönde sinyal vermeli (4-8 arası)
+LAZY_VOTE_EVALUATION = True  # Ucuz indikatörden başla, sonuç kesinleşince dur (detay mesaj öncesi tamamlanır)
 
 # Twelve Data API Konfigürasyonu - Multiple Keys
 # Rotation ile rate limit aşılmadan tüm timeframe'ler çalışır
@@ -81,4 +108,37 @@ TWELVE_DATA_API_KEY_2 = os.getenv("TWELVE_DATA_API_KEY_2", "")
 TWELVE_DATA_API_KEY_3 = os.getenv("TWELVE_DATA_API_KEY_3", "")
 
 # API Key listesini oluştur (boş olmayanları)
-TWELVE_DATA_API_KEYS = [key for key in [TWELVE_DATA_API_KEY, TWELVE_DATA_API_KEY_2, TWELVE_DATA_API_KEY_3] if key]
\ No newline at end of file
+TWELVE_DATA_API_KEYS = [key for key in [TWELVE_DATA_API_KEY, TWELVE_DATA_API_KEY_2, TWELVE_DATA_API_KEY_3] if key]
+
+TWELVE_DATA_BASE_URL = "https://api.twelvedata.com"  # Yerel test: tools/td_standin.py (http://127.0.0.1:8766)
+
+# Key başına dakikalık istek limiti (free tier: 8 req/min) - eşzamanlı istekler bu limitle sıraya girer
+TWELVE_DATA_RATE_LIMIT_PER_MINUTE = 8
+# Eşzamanlı istekleri tek çağrıda birleştirmek için bekleme (sn, 0: kapalı). Tek sembolde
+# birleştirilecek istek yoktur, bekleme her isteğe gecikme ekler; birden fazla sembol izlenirse ~0.05
+TWELVE_DATA_BATCH_WINDOW = 0
+TWELVE_DATA_DAILY_LIMIT = 800  # Key başına günlük istek limiti (00:00 UTC'de sıfırlanır)
+API_USAGE_PATH = "api_usage.json"  # Günlük kullanım sayaçları (restart'ta korunur)
+API_USAGE_SAVE_INTERVAL = 30  # Dosyaya en fazla bu aralıkla yazılır (sn, kapanışta ve gün sınırında hemen)
+
+# Hedged istekler / failover - yanıt kaynağın p95 gecikmesini aşarsa ikinci istek
+# (diğer key) gönderilir, hata / boş yanıtta beklemeden sıradaki kaynağa geçilir
+HEDGE_REQUESTS_ENABLED = False  # 2+ API key gerekir (her hedge bir kredi harcar)
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_DELAY = 1.0  # sn
+HEDGE_MAX_DELAY = 5.0  # sn (yeterli ölçüm yokken kullanılır)
+FAILOVER_MAX_ERRORS = 3  # Art arda bu kadar hata veren kaynak geri plana alınır
+FAILOVER_COOLDOWN = 60  # sn
+
+# WebSocket fiyat akışı - 1m mumlar tick'lerden yerelde oluşturulur, mum sınırından
+# birkaç yüz ms sonra analiz edilir (REST polling, 5 sn buffer ve finalize retry'ı yok)
+STREAMING_ENABLED = False
+TWELVE_DATA_WS_URL = "wss://ws.twelvedata.com/v1/quotes/price"
+STREAM_HISTORY_CANDLES = 500  # Başlangıçta / yeniden bağlanmada REST'ten alınan 1m geçmişi
+STREAM_CLOSE_GRACE_MS = 150  # Mum sınırından sonra geç tick'ler için bekleme (ms)
+
+# Günlük istek bütçesi - tahmin kotayı aşarsa düşük öncelikli timeframe'ler önce
+# 1m'den türetmeye, sonra daha seyrek analize (her N mumda bir) geçirilir
+BUDGET_PRIORITY = ["4h", "1h", "15m", "5m", "1m"]  # Yüksekten düşüğe öncelik
+BUDGET_RESERVE = 0.05  # Kotanın beklenmeyen istekler (retry, restart) için ayrılan oranı
+BUDGET_MAX_CADENCE = 5  # En seyrek polling: her 5 mum kapanışında bir
\ No newline at end of file
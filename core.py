@@ -5,10 +5,27 @@ import httpx
 import time
 import logging
 import asyncio
+import hashlib
+import heapq
+import json
+import os
+from collections import Counter, deque
 from datetime import datetime
 import pytz
-from typing import List, Tuple, Callable, Awaitable, Any, Optional
-from config import MIN_KLINES
+import numpy as np
+from typing import List, Tuple, Callable, Awaitable, Any, Optional, Dict, Sequence, Set
+from config import (
+    MIN_KLINES, TWELVE_DATA_RATE_LIMIT_PER_MINUTE, TWELVE_DATA_DAILY_LIMIT, API_USAGE_PATH, API_USAGE_SAVE_INTERVAL,
+    BUDGET_PRIORITY, BUDGET_RESERVE, BUDGET_MAX_CADENCE, TWELVE_DATA_BATCH_WINDOW, TWELVE_DATA_BASE_URL,
+    RESAMPLE_OFFSETS_MS, SCHEDULER_CLOCK_INIT, RETRY_BASE_DELAY, RETRY_MAX_DELAY, RETRY_MAX_ATTEMPTS
+)
+from klines import KlineFrame, as_kline_frame
+from candle_store import CandleStore
+
+try:  # Opsiyonel: daha hızlı JSON decode
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
@@ -51,13 +68,400 @@ async def async_retry(
             raise
 
 
+def _loads(content: bytes) -> Any:
+    """JSON decode - orjson kuruluysa onu kullan (~2x hızlı)"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def decode_time_series(values: List[Dict], interval_ms: int) -> KlineFrame:
+    """Twelve Data ``values`` listesini (en yeni başta) KlineFrame'e çevir
+
+    Hızlı yol: kolonlar tek seferde numpy'a verilir - tarihler sabit
+    "YYYY-MM-DD HH:MM:SS" (veya "YYYY-MM-DD") formatından datetime64 ile UTC epoch
+    ms'ye, fiyat string'leri doğrudan float64 array'e çevrilir (mum başına
+    strptime/pytz/float() çağrısı yok). Tarihlerden biri bu sabit biçimde değilse ya da
+    beklenmeyen bir satır varsa eski satır satır yola düşülür; orada hatalı mumlar
+    loglanıp atlanır.
+    """
+    # Twelve Data: {"datetime": "2025-01-01 12:00:00", "open": "2000.00", "high": "2001.00", ...}
+    # Bot: KlineFrame(open_time_ms, open, high, low, close, volume, close_time_ms) - en eskiden en yeniye
+    values = values[::-1]
+    try:
+        dates = [candle["datetime"] for candle in values]
+        # datetime64 "YYYY-MM-DD HH:MM" gibi eksik formatları da kabul eder - hızlı yol yalnızca
+        # tümü sabit uzunlukta (19 ve ayraç boşluk, ya da 10) olduğunda; aksi halde satır satır
+        length = len(dates[0]) if dates else 19
+        if (length not in (10, 19) or any(len(date) != length for date in dates)
+                or (length == 19 and any(date[10] != " " for date in dates))):
+            return _decode_time_series_slow(values, interval_ms)
+        open_times = np.array(dates, dtype="datetime64[ms]").astype(np.int64)
+        opens, highs, lows, closes = (
+            np.array([candle[name] for candle in values], dtype=np.float64)
+            for name in ("open", "high", "low", "close")
+        )
+        # Forex'te volume olmayabilir
+        volumes = np.array([candle.get("volume", 0) for candle in values], dtype=np.float64)
+    except (KeyError, TypeError, ValueError):
+        return _decode_time_series_slow(values, interval_ms)
+    return KlineFrame(open_times, opens, highs, lows, closes, volumes, interval_ms=interval_ms)
+
+
+def _decode_time_series_slow(values: List[Dict], interval_ms: int) -> KlineFrame:
+    """Satır satır çözümleme (en eskiden en yeniye sıralı values) - hatalı mumları atlar"""
+    count = len(values)
+    open_times = np.empty(count, dtype=np.int64)
+    opens = np.empty(count, dtype=np.float64)
+    highs = np.empty(count, dtype=np.float64)
+    lows = np.empty(count, dtype=np.float64)
+    closes = np.empty(count, dtype=np.float64)
+    volumes = np.empty(count, dtype=np.float64)
+    filled = 0
+    
+    for candle in values:
+        # Datetime'ı parse et (UTC timezone)
+        dt_str = candle["datetime"]
+        # Format: "2025-01-01 12:00:00" veya "2025-01-01"
+        try:
+            if " " in dt_str:
+                # UTC olarak parse et
+                dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
+                dt = dt.replace(tzinfo=pytz.UTC)
+            else:
+                dt = datetime.strptime(dt_str, "%Y-%m-%d")
+                dt = dt.replace(tzinfo=pytz.UTC)
+            
+            open_times[filled] = int(dt.timestamp() * 1000)
+            opens[filled] = float(candle["open"])
+            highs[filled] = float(candle["high"])
+            lows[filled] = float(candle["low"])
+            closes[filled] = float(candle["close"])
+            volumes[filled] = float(candle.get("volume", 0))  # Forex'te volume olmayabilir
+            filled += 1
+        except Exception as e:
+            logger.error(f"Error parsing candle datetime '{dt_str}': {e}")
+            continue
+    
+    return KlineFrame(
+        open_times[:filled], opens[:filled], highs[:filled], lows[:filled],
+        closes[:filled], volumes[:filled], interval_ms=interval_ms
+    )
+
+
+class TokenBucket:
+    """Async rate limiter - herhangi bir ``period`` saniyelik pencerede en fazla ``capacity`` istek
+
+    Harcanan her token tam ``period`` saniye sonra kovaya geri döner (kayan pencere).
+    Böylece sabit hızla dolan klasik kovadaki "dolu kova + dolum" patlaması
+    (60 sn içinde 2 x capacity istek) oluşmaz ve API'nin dakikalık limiti hiç aşılmaz.
+    """
+
+    def __init__(self, capacity: int, period: float = 60.0, name: str = ""):
+        """
+        Args:
+            capacity: Pencere başına izin verilen istek sayısı
+            period: Pencere uzunluğu (saniye)
+            name: Log mesajlarında kullanılacak isim
+        """
+        self.capacity = capacity
+        self.period = period
+        self.name = name
+        self._issued = deque()  # Harcanan token'ların zamanları (monotonic)
+        self._lock = asyncio.Lock()
+
+    def _expire(self, now: float):
+        """Penceresi dolan token'ları kovaya geri koy"""
+        while self._issued and now - self._issued[0] >= self.period:
+            self._issued.popleft()
+
+    def available(self) -> int:
+        """Şu an beklemeden kullanılabilecek token sayısı"""
+        self._expire(time.monotonic())
+        return self.capacity - len(self._issued)
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """Token'lar varsa (ve bekleyen yoksa) hemen al, yoksa False"""
+        tokens = min(tokens, self.capacity)
+        if self._lock.locked() or self.available() < tokens:
+            return False
+        now = time.monotonic()
+        self._issued.extend([now] * tokens)
+        return True
+
+    async def acquire(self, tokens: int = 1) -> float:
+        """Token'lar alınana kadar bekle (FIFO), beklenen süreyi (saniye) döndür"""
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                if len(self._issued) + tokens <= self.capacity:
+                    self._issued.extend([now] * tokens)
+                    return waited
+                delay = self.period - (now - self._issued[len(self._issued) + tokens - self.capacity - 1])
+                logger.info(f"Rate limit reached for {self.name or 'bucket'}, waiting {delay:.1f}s")
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+class ApiKeyScheduler:
+    """Kota farkındalıklı API key seçimi - dakikalık ve günlük kullanım takibi
+
+    - Dakikalık limit: key başına TokenBucket
+    - Günlük limit: key başına sayaç, JSON dosyasına yazılır (restart'ta kaybolmaz)
+      ve sağlayıcının gün sınırında (00:00 UTC) sıfırlanır
+    - Seçim: günlük kalan hakkı en fazla olan ve dakikalık token'ı olan key
+    - projected_exhaustion(): son bir saatlik istek hızıyla toplam günlük kotanın
+      ne zaman biteceği (gün bitmeden bitmeyecekse None)
+
+    Dosyada API key'lerin kendisi değil, SHA-256 özetinin ilk 12 karakteri tutulur.
+    """
+
+    DAY_MS = 24 * 60 * 60 * 1000
+    RATE_WINDOW_MS = 60 * 60 * 1000  # Tüketim hızı için bakılan pencere
+    WARNING_INTERVAL_MS = 60 * 60 * 1000  # Kota uyarısı en fazla saatte bir
+
+    def __init__(
+        self,
+        api_keys: List[str],
+        daily_limit: int = TWELVE_DATA_DAILY_LIMIT,
+        per_minute: int = TWELVE_DATA_RATE_LIMIT_PER_MINUTE,
+        usage_path: Optional[str] = API_USAGE_PATH,
+        clock: Callable[[], float] = time.time,
+        save_interval: float = API_USAGE_SAVE_INTERVAL,
+    ):
+        """
+        Args:
+            api_keys: API key listesi
+            daily_limit: Key başına günlük istek limiti
+            per_minute: Key başına dakikalık istek limiti
+            usage_path: Günlük kullanımın yazılacağı JSON dosyası (None: sadece bellekte)
+            clock: Epoch saniye döndüren saat (test / replay için değiştirilebilir)
+            save_interval: Dosya yazımları arasındaki en kısa süre (sn, 0: her istekte)
+        """
+        self.api_keys = list(api_keys)
+        self.daily_limit = daily_limit
+        self.per_minute = per_minute
+        self.usage_path = usage_path
+        self.clock = clock
+        self.save_interval_ms = int(save_interval * 1000)
+        self._last_save_ms = 0
+        self._dirty = False
+        self.key_ids = {key: hashlib.sha256(key.encode()).hexdigest()[:12] for key in self.api_keys}
+        self.rate_limiters = {
+            key: TokenBucket(per_minute, 60.0, name=f"API key {i}")
+            for i, key in enumerate(self.api_keys, 1)
+        }
+        self.session_counts = {key: 0 for key in self.api_keys}  # Bu çalışmadaki istekler
+        self.daily_counts = {key: 0 for key in self.api_keys}
+        self.day = self._utc_day()
+        self._recent = deque()  # Son RATE_WINDOW_MS içindeki istek zamanları (ms)
+        self._last_warning_ms = 0
+        self._load()
+
+    def now_ms(self) -> int:
+        """Şu anki zaman (epoch ms, clock üzerinden)"""
+        return int(self.clock() * 1000)
+
+    def _utc_day(self) -> int:
+        """Gün numarası (epoch'tan itibaren UTC gün)"""
+        return self.now_ms() // self.DAY_MS
+
+    def _load(self):
+        """Bugüne ait kullanımı dosyadan oku (başka güne aitse yok say)"""
+        if not self.usage_path or not os.path.exists(self.usage_path):
+            return
+        try:
+            with open(self.usage_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read API usage file {self.usage_path}: {e}")
+            return
+        if data.get("day") != self.day:
+            logger.info("API usage file is from a previous UTC day, starting from zero")
+            return
+        usage = data.get("usage", {})
+        for key, key_id in self.key_ids.items():
+            self.daily_counts[key] = int(usage.get(key_id, 0))
+        logger.info(f"API usage restored: {self.total_used()}/{self.total_capacity()} requests used today")
+
+    def _save(self):
+        """Günlük kullanımı atomik olarak dosyaya yaz"""
+        if not self.usage_path:
+            return
+        data = {
+            "day": self.day,
+            "date": self._format(self.day * self.DAY_MS)[:10],
+            "usage": {self.key_ids[key]: count for key, count in self.daily_counts.items()},
+        }
+        tmp_path = f"{self.usage_path}.tmp"
+        self._last_save_ms = self.now_ms()
+        self._dirty = False
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.usage_path)
+        except OSError as e:
+            logger.warning(f"Could not write API usage file {self.usage_path}: {e}")
+
+    def flush(self):
+        """Yazılmamış kullanım varsa dosyaya yaz (kapanışta çağrılır)"""
+        if self._dirty:
+            self._save()
+
+    def roll_day(self):
+        """UTC gün sınırı geçildiyse günlük sayaçları sıfırla"""
+        day = self._utc_day()
+        if day != self.day:
+            logger.info(f"UTC day changed, resetting daily API usage ({self.total_used()} used yesterday)")
+            self.day = day
+            self.daily_counts = {key: 0 for key in self.api_keys}
+            self._save()
+
+    def remaining(self, key: str) -> int:
+        """Key'in bugün kalan istek hakkı"""
+        return max(0, self.daily_limit - self.daily_counts[key])
+
+    def total_used(self) -> int:
+        return sum(self.daily_counts.values())
+
+    def total_capacity(self) -> int:
+        return self.daily_limit * len(self.api_keys)
+
+    def _record(self, key: str, credits: int = 1):
+        """İsteği say, dosyaya yaz (en fazla save_interval'da bir) ve kota projeksiyonunu kontrol et"""
+        now_ms = self.now_ms()
+        self.daily_counts[key] += credits
+        self.session_counts[key] += credits
+        self._recent.extend([now_ms] * credits)
+        self._dirty = True
+        if now_ms - self._last_save_ms >= self.save_interval_ms:
+            self._save()
+
+        exhaustion_ms = self.projected_exhaustion()
+        if exhaustion_ms is not None and now_ms - self._last_warning_ms >= self.WARNING_INTERVAL_MS:
+            self._last_warning_ms = now_ms
+            logger.warning(
+                f"API quota projected to run out at {self._format(exhaustion_ms)} UTC "
+                f"({self.total_used()}/{self.total_capacity()} used, resets at {self._format((self.day + 1) * self.DAY_MS)} UTC)"
+            )
+
+    async def acquire(self, credits: int = 1, keys: Optional[Sequence[str]] = None) -> Optional[str]:
+        """İstek için key seç (gerekirse dakikalık token için bekle)
+
+        Args:
+            credits: İsteğin harcayacağı kredi (batch isteklerde sembol sayısı)
+            keys: Seçimin yapılacağı key alt kümesi (varsayılan tüm key'ler)
+        Returns:
+            Seçilen key ya da key'lerin günlük kotası bittiyse None
+        """
+        self.roll_day()
+        pool = self.api_keys if keys is None else keys
+        candidates = sorted(
+            (key for key in pool if self.remaining(key) >= credits),
+            key=lambda k: (-self.remaining(k), -self.rate_limiters[k].available())
+        )
+        if not candidates:
+            logger.error(
+                f"Daily API quota exhausted for all {len(pool)} keys, "
+                f"resets at {self._format((self.day + 1) * self.DAY_MS)} UTC"
+            )
+            return None
+
+        for key in candidates:
+            if self.rate_limiters[key].try_acquire(credits):
+                self._record(key, credits)
+                return key
+
+        # Hiçbir key'de dakikalık token yok - en çok hakkı kalan key için bekle
+        key = candidates[0]
+        await self.rate_limiters[key].acquire(credits)
+        self._record(key, credits)
+        return key
+
+    def request_rate(self) -> float:
+        """Son bir saatteki istek hızı (istek / saniye)"""
+        now_ms = self.now_ms()
+        while self._recent and now_ms - self._recent[0] > self.RATE_WINDOW_MS:
+            self._recent.popleft()
+        if not self._recent:
+            return 0.0
+        # Başlangıçtaki kısa patlama hızı şişirmesin diye en az 10 dakikalık pencere
+        span_ms = max(now_ms - self._recent[0], self.RATE_WINDOW_MS // 6)
+        return len(self._recent) / (span_ms / 1000)
+
+    def projected_exhaustion(self) -> Optional[int]:
+        """Mevcut hızla toplam günlük kotanın biteceği zaman (epoch ms)
+
+        Kota gün sınırından (sıfırlanma) önce bitmeyecekse None döner.
+        """
+        remaining = self.total_capacity() - self.total_used()
+        now_ms = self.now_ms()
+        if remaining <= 0:
+            return now_ms
+        rate = self.request_rate()
+        if rate <= 0:
+            return None
+        exhaustion_ms = now_ms + int(remaining / rate * 1000)
+        if exhaustion_ms >= (self.day + 1) * self.DAY_MS:
+            return None
+        return exhaustion_ms
+
+    def usage_report(self) -> Dict[str, Dict]:
+        """Key bazında günlük kullanım (log / mesaj için)"""
+        return {
+            f"API key {i}": {
+                "used": self.daily_counts[key],
+                "remaining": self.remaining(key),
+                "session": self.session_counts[key],
+            }
+            for i, key in enumerate(self.api_keys, 1)
+        }
+
+    @staticmethod
+    def _format(timestamp_ms: int) -> str:
+        return datetime.fromtimestamp(timestamp_ms / 1000, tz=pytz.UTC).strftime('%Y-%m-%d %H:%M')
+
+
 class ExchangeClient:
     """Exchange API base class - Twelve Data veya başka kaynaklardan veri çekmek için"""
 
-    async def get_klines(self, symbol: str, interval: str, limit: int = 101) -> List[List]:
+    # True: wait_for_update veri olayında erken döner ya da kendi saatini yönetir
+    # (streaming, replay); False: ana döngü sadece scheduler'ın deadline timer'ıyla uyur
+    pushes_updates = False
+
+    async def get_klines(self, symbol: str, interval: str, limit: int = 101) -> KlineFrame:
         """Mum verilerini al - Alt sınıflar implement etmeli"""
         raise NotImplementedError("Subclass must implement get_klines()")
 
+    async def get_klines_batch(self, symbols: List[str], interval: str, limit: int = 101) -> Dict[str, KlineFrame]:
+        """Birden fazla sembolün mumlarını eşzamanlı al (sembol -> KlineFrame)
+
+        TwelveDataClient'ta eşzamanlı get_klines çağrıları tek HTTP isteğinde birleştirilir.
+        """
+        frames = await asyncio.gather(*(self.get_klines(symbol, interval, limit) for symbol in symbols))
+        return dict(zip(symbols, frames))
+
+    async def latest_closed_time(self, symbol: str, interval: str) -> Optional[int]:
+        """Son kapanmış mumun close_time'ı (ms) - ucuz hazırlık kontrolü (hata/veri yoksa None)
+
+        Finalize retry'ında tam seri yerine bu kullanılır; tam/delta indirme ancak
+        beklenen mum sağlayıcıda oluşunca yapılır. Varsayılan: son 2 mum.
+        """
+        frame = await self.get_klines(symbol, interval, 2)
+        if len(frame) < 2:
+            return None
+        return int(frame.close_time[-2])
+
+    async def wait_for_update(self, timeout: float):
+        """Yeni veri gelene ya da timeout dolana kadar bekle
+
+        Polling client'larda sadece bekler; StreamingClient mum kapanınca erken döner.
+        """
+        await asyncio.sleep(timeout)
+
     async def close(self):
         """Client kapatma - Alt sınıflar implement etmeli"""
         pass
@@ -85,48 +489,157 @@ class TwelveDataClient(ExchangeClient):
         "1d": "1day"
     }
     
-    def __init__(self, api_keys: list):
+    # Delta fetch: depodaki son mum (kapanmamış olabilir) ve bir öncekini tekrar çek
+    DELTA_OVERLAP = 2
+
+    def __init__(self, api_keys: list, store: Optional[CandleStore] = None,
+                 batch_window: float = TWELVE_DATA_BATCH_WINDOW, base_url: str = TWELVE_DATA_BASE_URL,
+                 key_scheduler: Optional[ApiKeyScheduler] = None):
         """Twelve Data Client initialize with multiple API keys
         
         Args:
             api_keys: List of Twelve Data API keys for rotation
+            store: Kalıcı mum deposu - verilirse sadece eksik kuyruk indirilir (delta fetch)
+            batch_window: Eşzamanlı isteklerin birleştirilmesi için bekleme (saniye, 0: kapalı)
+            base_url: API adresi (yerel stand-in için tools/td_standin.py)
+            key_scheduler: Özel kota ayarlı scheduler (yük testi vb., varsayılan config limitleri).
+                Birden fazla client aynı scheduler'ı paylaşabilir; her client yalnızca
+                kendi api_keys alt kümesini kullanır (örn. hedge kaynağı ayrı key'lere sabitlenir)
         """
         if not api_keys or not isinstance(api_keys, list):
             raise ValueError("api_keys must be a non-empty list")
+        if key_scheduler is not None and not set(api_keys) <= set(key_scheduler.api_keys):
+            raise ValueError("api_keys must be a subset of the key scheduler's keys")
         
         self.api_keys = api_keys
-        self.current_key_index = 0
-        self.base_url = "https://api.twelvedata.com"
+        self.base_url = base_url.rstrip("/")
         self.client = httpx.AsyncClient(timeout=30.0)
-        self.request_counts = {key: 0 for key in api_keys}  # Her key için istek sayacı
+        # Key seçimi: dakikalık + günlük kota (kullanım restart'ta korunur)
+        self.key_scheduler = key_scheduler or ApiKeyScheduler(api_keys)
+        self.request_counts = self.key_scheduler.session_counts  # Her key için istek sayacı
+        self.store = store
+        self.downloaded_candles = 0  # API'den indirilen toplam mum sayısı
+        # Request coalescing: batch_window içindeki aynı interval istekleri tek çağrıda
+        self.batch_window = batch_window
+        self._pending_batches: Dict[str, Dict[str, List]] = {}  # interval -> symbol -> [(limit, future)]
+        self._flush_tasks = set()
         
         logger.info(f"TwelveDataClient initialized with {len(api_keys)} API keys")
-        logger.info(f"Total daily capacity: {len(api_keys) * 800} requests")
+        logger.info(f"Total daily capacity: {self.key_scheduler.total_capacity()} requests")
     
-    def _get_next_api_key(self) -> str:
-        """Round-robin ile sıradaki API key'i döndür"""
-        key = self.api_keys[self.current_key_index]
-        self.request_counts[key] += 1
-        self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
-        return key
-        
-    async def get_klines(self, symbol: str, interval: str, limit: int = 101) -> List[List]:
-        """Twelve Data'dan mum verilerini al ve bot formatına çevir
+    async def get_klines(self, symbol: str, interval: str, limit: int = 101) -> KlineFrame:
+        """Twelve Data'dan mum verilerini al ve kolon bazlı KlineFrame'e çevir
+
+        Depo (store) varsa geçmiş diskten okunur, API'den sadece son kayıtlı mumdan
+        sonraki eksik kuyruk (küçük outputsize) indirilir ve depoyla birleştirilir.
         
         Returns:
-            List[List]: Her mum [open_time, open, high, low, close, volume, close_time, ...]
+            KlineFrame: En eskiden en yeniye sıralı mumlar (hata durumunda boş frame).
+            ``frame[i]`` eski [open_time, open, high, low, close, volume, close_time, ...] satırını verir.
+        """
+        if self.store is None:
+            return await self._fetch_klines(symbol, interval, limit)
+
+        interval_ms = self._get_timeframe_ms(interval)
+        outputsize = self._delta_outputsize(symbol, interval, limit, interval_ms)
+        fresh = await self._fetch_klines(symbol, interval, outputsize)
+        if len(fresh) == 0:
+            return fresh
+
+        if outputsize < limit:
+            last_stored = self.store.last_open_time(symbol, interval)
+            if last_stored is not None and int(fresh.open_time[0]) > last_stored:
+                # Kuyruk depoyla çakışmıyor (arada boşluk var) - tam seriyi indir
+                logger.warning(f"Delta fetch gap for {symbol} {interval}, refetching {limit} candles")
+                fresh = await self._fetch_klines(symbol, interval, limit)
+                if len(fresh) == 0:
+                    return fresh
+
+        self.store.upsert(symbol, interval, fresh)
+        return self.store.load(symbol, interval, limit, interval_ms)
+
+    async def latest_closed_time(self, symbol: str, interval: str) -> Optional[int]:
+        """outputsize=2 ile hazırlık kontrolü (depoyu atlar, gelen mumlar depoya yazılır)"""
+        frame = await self._fetch_klines(symbol, interval, 2)
+        if len(frame) < 2:
+            return None
+        if self.store is not None:
+            self.store.upsert(symbol, interval, frame)
+        return int(frame.close_time[-2])
+
+    def _delta_outputsize(self, symbol: str, interval: str, limit: int, interval_ms: int) -> int:
+        """Depoda olmayan mum sayısı + çakışma payı (depo yetersizse limit)"""
+        last_stored = self.store.last_open_time(symbol, interval)
+        if last_stored is None or self.store.count(symbol, interval) < limit:
+            return limit
+        now_ms = int(time.time() * 1000)
+        missing = max(0, (now_ms - last_stored) // interval_ms)
+        return int(min(limit, missing + self.DELTA_OVERLAP))
+
+    async def _fetch_klines(self, symbol: str, interval: str, limit: int) -> KlineFrame:
+        """Tek sembol isteği - batch_window içinde gelen aynı interval istekleriyle birleştirilir
+
+        Eşzamanlı istekler (aynı interval, farklı ya da aynı semboller) tek bir
+        time_series çağrısında toplanır; her çağıran kendi limit'i kadar mum alır.
         """
+        if not self.batch_window:
+            frames = await self._request_batch([symbol], interval, limit)
+            return frames[symbol]
+
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending_batches.get(interval)
+        if batch is None:
+            batch = self._pending_batches[interval] = {}
+            task = asyncio.create_task(self._flush_batch(interval))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+        batch.setdefault(symbol, []).append((limit, future))
+        frame = await future
+        return frame[-limit:]
+
+    async def _flush_batch(self, interval: str):
+        """batch_window dolunca bekleyen istekleri tek çağrıda gönder ve sonuçları dağıt"""
+        await asyncio.sleep(self.batch_window)
+        batch = self._pending_batches.pop(interval)
+        limit = max(request_limit for requests in batch.values() for request_limit, _ in requests)
+        waiters = sum(len(requests) for requests in batch.values())
+        if waiters > 1:
+            logger.debug(f"Coalesced {waiters} requests into one {interval} call for {len(batch)} symbol(s)")
+        symbols = list(batch)
+        frames = {}
+        # Bir çağrıdaki sembol sayısı (kredi) dakikalık limiti aşamaz
+        chunk = self.key_scheduler.per_minute
+        for start in range(0, len(symbols), chunk):
+            try:
+                frames.update(await self._request_batch(symbols[start:start + chunk], interval, limit))
+            except Exception as e:
+                logger.error(f"Error in batched fetch for {interval}: {e}")
+        for symbol, requests in batch.items():
+            for _, future in requests:
+                if not future.done():
+                    future.set_result(frames.get(symbol, KlineFrame.empty()))
+
+    async def _request_batch(self, symbols: List[str], interval: str, limit: int) -> Dict[str, KlineFrame]:
+        """Birden fazla sembol için tek time_series çağrısı (symbol=A,B,C)
+
+        Twelve Data her sembol için bir kredi düşer; HTTP çağrısı ve gecikme tek olur.
+        Hata alan sembol(ler) için boş frame döner.
+        """
+        empty = {symbol: KlineFrame.empty() for symbol in symbols}
+
         # Timeframe çevir
         td_interval = self.TIMEFRAME_MAP.get(interval)
         if td_interval is None:
             logger.error(f"Unsupported timeframe: {interval}")
-            return []
+            return empty
         
         # Symbol format: Use as-is (XAU/USD for forex pairs)
-        td_symbol = symbol
+        td_symbol = ",".join(symbols)
         
-        # API request - rotation ile key seç
-        current_key = self._get_next_api_key()
+        # API request - kalan kotası en yüksek key'i seç (dakikalık limit dahil, sembol başına 1 kredi)
+        current_key = await self.key_scheduler.acquire(credits=len(symbols), keys=self.api_keys)
+        if current_key is None:
+            return empty
         url = f"{self.base_url}/time_series"
         params = {
             "symbol": td_symbol,
@@ -140,67 +653,49 @@ class TwelveDataClient(ExchangeClient):
         try:
             response = await self.client.get(url, params=params)
             response.raise_for_status()
-            data = response.json()
-            
-            # Hata kontrolü
-            if "status" in data and data["status"] == "error":
-                logger.error(f"Twelve Data API error for {symbol} {interval}: {data.get('message', 'Unknown error')}")
-                logger.error(f"Full API response: {data}")
-                return []
+            data = _loads(response.content)
             
-            if "values" not in data or not data["values"]:
-                logger.error(f"No data from Twelve Data for {symbol} {interval}")
-                logger.error(f"API response keys: {list(data.keys())}")
-                logger.error(f"Full API response: {data}")
-                return []
-            
-            # Twelve Data formatını bot formatına çevir
-            # Twelve Data: {"datetime": "2025-01-01 12:00:00", "open": "2000.00", "high": "2001.00", ...}
-            # Bot: [open_time_ms, open, high, low, close, volume, close_time_ms, ...]
-            klines = []
-            timeframe_ms = self._get_timeframe_ms(interval)
-            
-            for candle in reversed(data["values"]):  # En eskiden en yeniye sırala
-                # Datetime'ı parse et (UTC timezone)
-                dt_str = candle["datetime"]
-                # Format: "2025-01-01 12:00:00" veya "2025-01-01"
-                try:
-                    if " " in dt_str:
-                        # UTC olarak parse et
-                        dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-                        dt = dt.replace(tzinfo=pytz.UTC)
-                    else:
-                        dt = datetime.strptime(dt_str, "%Y-%m-%d")
-                        dt = dt.replace(tzinfo=pytz.UTC)
-                    
-                    open_time_ms = int(dt.timestamp() * 1000)
-                    close_time_ms = open_time_ms + timeframe_ms
-                    
-                    klines.append([
-                        open_time_ms,
-                        float(candle["open"]),
-                        float(candle["high"]),
-                        float(candle["low"]),
-                        float(candle["close"]),
-                        float(candle.get("volume", 0)),  # Forex'te volume olmayabilir
-                        close_time_ms,
-                        0,  # quote_asset_volume (Twelve Data'da yok)
-                        0,  # number_of_trades (Twelve Data'da yok)
-                        0,  # taker_buy_base (Twelve Data'da yok)
-                        0   # taker_buy_quote (Twelve Data'da yok)
-                    ])
-                except Exception as e:
-                    logger.error(f"Error parsing candle datetime '{dt_str}': {e}")
-                    continue
-            
-            return klines
+            # Hesap seviyesinde hata (kredi bitti, geçersiz key...) tüm sembolleri etkiler
+            if len(symbols) > 1 and data.get("status") == "error":
+                logger.error(f"Twelve Data API error for {td_symbol} {interval}: {data.get('message', 'Unknown error')}")
+                return empty
+
+            # Tek sembolde yanıt doğrudan seri, çoklu sembolde {symbol: seri}
+            payloads = {symbols[0]: data} if len(symbols) == 1 else data
+            return {
+                symbol: self._parse_series(symbol, interval, limit, payloads.get(symbol))
+                for symbol in symbols
+            }
             
         except httpx.HTTPStatusError as e:
             logger.error(f"Twelve Data HTTP error: {e.response.status_code} - {e.response.text}")
-            return []
+            return empty
         except Exception as e:
             logger.error(f"Error fetching Twelve Data: {e}")
-            return []
+            return empty
+
+    def _parse_series(self, symbol: str, interval: str, limit: int, data: Optional[Dict]) -> KlineFrame:
+        """Tek sembolün time_series yanıtını KlineFrame'e çevir"""
+        if not data:
+            logger.error(f"No data from Twelve Data for {symbol} {interval}")
+            return KlineFrame.empty()
+
+        # Hata kontrolü
+        if "status" in data and data["status"] == "error":
+            logger.error(f"Twelve Data API error for {symbol} {interval}: {data.get('message', 'Unknown error')}")
+            logger.error(f"Full API response: {data}")
+            return KlineFrame.empty()
+        
+        if "values" not in data or not data["values"]:
+            logger.error(f"No data from Twelve Data for {symbol} {interval}")
+            logger.error(f"API response keys: {list(data.keys())}")
+            logger.error(f"Full API response: {data}")
+            return KlineFrame.empty()
+        
+        frame = decode_time_series(data["values"], self._get_timeframe_ms(interval))
+        self.downloaded_candles += len(frame)
+        logger.debug(f"Fetched {len(frame)} candles for {symbol} {interval} (outputsize={limit})")
+        return frame
     
     def _get_timeframe_ms(self, interval: str) -> int:
         """Timeframe'i milisaniyeye çevir"""
@@ -218,22 +713,144 @@ class TwelveDataClient(ExchangeClient):
     async def close(self):
         """HTTP client'ı kapat ve istatistikleri göster"""
         await self.client.aclose()
+        self.key_scheduler.flush()
         
         # API kullanım istatistiklerini logla
         logger.info("=" * 60)
         logger.info("API Request Distribution:")
-        total_requests = sum(self.request_counts.values())
-        for i, (key, count) in enumerate(self.request_counts.items(), 1):
+        total_requests = sum(self.request_counts[key] for key in self.api_keys)
+        for i, key in enumerate(self.api_keys, 1):
+            count = self.request_counts[key]
             key_preview = f"{key[:10]}..." if len(key) > 10 else key
             percentage = (count / total_requests * 100) if total_requests > 0 else 0
             logger.info(f"  API Key {i} ({key_preview}): {count} requests ({percentage:.1f}%)")
         logger.info(f"Total requests: {total_requests}")
+        for name, usage in self.key_scheduler.usage_report().items():
+            logger.info(f"  {name} today: {usage['used']} used, {usage['remaining']} remaining")
+        logger.info(f"Total candles downloaded: {self.downloaded_candles}")
         logger.info("=" * 60)
         logger.info("Twelve Data client closed")
 
 
+class DeadlineScheduler:
+    """(kapanış zamanı, sembol, timeframe) girdilerinden oluşan öncelik kuyruğu
+
+    Yüzlerce sembol x timeframe çifti için tarama yerine heap: en yakın deadline
+    O(1), planlama / vadesi gelenleri alma O(log n). Bir çift yeniden
+    planlandığında eski girdi heap'te kalır ve alınırken atlanır (lazy deletion).
+
+    ``wait()`` en yakın deadline'a kadar ``loop.call_at`` ile (monotonic saat)
+    uyur; bu sırada daha erken bir deadline planlanırsa hemen uyanıp yeniden kurar.
+    Deadline'lar duvar saati (epoch ms) olarak tutulur, bekleme anında loop
+    saatine çevrilir.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            clock: Epoch saniye döndüren saat (replay için sanal saat verilebilir)
+        """
+        self.clock = clock
+        self._heap: List[Tuple[int, int, str, str]] = []  # (due_ms, seq, symbol, timeframe)
+        self._entries: Dict[Tuple[str, str], Tuple[int, int]] = {}  # (symbol, timeframe) -> (due_ms, seq)
+        self._seq = 0
+        self._rearm: Optional[asyncio.Event] = None
+        self._armed_due: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._entries
+
+    def due_time(self, symbol: str, timeframe: str) -> Optional[int]:
+        """Çiftin planlı deadline'ı (ms)"""
+        entry = self._entries.get((symbol, timeframe))
+        return entry[0] if entry else None
+
+    def schedule(self, symbol: str, timeframe: str, due_ms: int):
+        """Çifti due_ms'e (yeniden) planla"""
+        self._seq += 1
+        self._entries[(symbol, timeframe)] = (due_ms, self._seq)
+        heapq.heappush(self._heap, (due_ms, self._seq, symbol, timeframe))
+        # Bekleyen wait() daha geç bir deadline'a kurulduysa uyandır
+        if self._rearm is not None and (self._armed_due is None or due_ms < self._armed_due):
+            self._rearm.set()
+        # Eski girdiler birikirse heap'i sıkıştır
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(due, seq, sym, tf) for (sym, tf), (due, seq) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def cancel(self, symbol: str, timeframe: str):
+        """Çifti kuyruktan çıkar"""
+        self._entries.pop((symbol, timeframe), None)
+
+    def _prune(self):
+        """Heap'in tepesindeki geçersiz (yeniden planlanmış / iptal) girdileri at"""
+        heap = self._heap
+        while heap:
+            due_ms, seq, symbol, timeframe = heap[0]
+            if self._entries.get((symbol, timeframe)) == (due_ms, seq):
+                return
+            heapq.heappop(heap)
+
+    def next_due(self) -> Optional[int]:
+        """En yakın deadline (ms) - kuyruk boşsa None"""
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now_ms: Optional[int] = None) -> List[Tuple[str, str]]:
+        """Vadesi gelmiş çiftleri deadline sırasıyla kuyruktan al"""
+        if now_ms is None:
+            now_ms = int(self.clock() * 1000)
+        due = []
+        while True:
+            self._prune()
+            if not self._heap or self._heap[0][0] > now_ms:
+                return due
+            _, _, symbol, timeframe = heapq.heappop(self._heap)
+            del self._entries[(symbol, timeframe)]
+            due.append((symbol, timeframe))
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """En yakın deadline'a (ya da timeout'a) kadar bekle; deadline geldiyse True
+
+        Uyanma ``loop.call_at`` ile monotonic saatte kurulur (sistem saati
+        değişse de bekleme süresi kaymaz); daha erken bir deadline planlanırsa
+        timer yeniden kurulur.
+        """
+        loop = asyncio.get_running_loop()
+        give_up = loop.time() + timeout if timeout is not None else None
+        while True:
+            due_ms = self.next_due()
+            now_ms = int(self.clock() * 1000)
+            if due_ms is not None and due_ms <= now_ms:
+                return True
+            wake_at = loop.time() + (due_ms - now_ms) / 1000 if due_ms is not None else None
+            if give_up is not None and (wake_at is None or give_up < wake_at):
+                wake_at = give_up
+            if wake_at is not None and wake_at <= loop.time():
+                return False
+
+            self._rearm = asyncio.Event()
+            self._armed_due = due_ms
+            handle = loop.call_at(wake_at, self._rearm.set) if wake_at is not None else None
+            try:
+                await self._rearm.wait()
+            finally:
+                if handle is not None:
+                    handle.cancel()
+                self._rearm = None
+                self._armed_due = None
+
+
 class TimeframeScheduler:
-    """Her timeframe için mum kapanış zamanlarını takip eder"""
+    """Her timeframe için mum kapanış zamanlarını takip eder
+
+    Tek sembol içindir: ready, next_candle_close ve retry_counts timeframe
+    anahtarlıdır. Deadline'lar (sembol, timeframe) anahtarlı DeadlineScheduler'da
+    tutulur; birden fazla sembol için sembol başına bir TimeframeScheduler gerekir.
+    """
 
     # Timeframe'leri millisaniyeye çevir
     TIMEFRAME_MS = {
@@ -246,16 +863,66 @@ class TimeframeScheduler:
         "1d": 24 * 60 * 60 * 1000
     }
 
-    def __init__(self):
+    def __init__(self, close_buffer_ms: int = 5000, clock: Callable[[], float] = time.time,
+                 clock_init: bool = SCHEDULER_CLOCK_INIT, offsets_ms: Optional[Dict[str, int]] = None,
+                 retry_base_delay: float = RETRY_BASE_DELAY, retry_max_delay: float = RETRY_MAX_DELAY,
+                 retry_max_attempts: int = RETRY_MAX_ATTEMPTS):
+        """
+        Args:
+            close_buffer_ms: Mum kapanışından sonra analiz öncesi bekleme (ms) -
+                REST'te sağlayıcının mumu finalize etmesi için 5 sn, streaming'de
+                yerel mum kapanışı için birkaç yüz ms yeterli
+            clock: Epoch saniye döndüren saat (replay için sanal saat verilebilir)
+            clock_init: Kapanış zamanlarını API yerine UTC kova aritmetiğinden başlat
+            offsets_ms: Timeframe başına kova hizalama kayması (varsayılan RESAMPLE_OFFSETS_MS)
+            retry_base_delay, retry_max_delay: Bayat mum retry backoff'u (sn)
+            retry_max_attempts: Bu kadar retry'dan sonra mum atlanır
+        """
+        self.close_buffer_ms = close_buffer_ms
+        self.clock = clock
+        self.clock_init = clock_init
+        self.offsets_ms = {**RESAMPLE_OFFSETS_MS, **(offsets_ms or {})}
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.retry_max_attempts = retry_max_attempts
         self.next_candle_close = {}  # timeframe -> timestamp (ms)
+        # Kapanış + buffer deadline'ları heap'te; vadesi gelenler analiz edilene kadar ready'de kalır
+        self.deadlines = DeadlineScheduler(clock)
+        self.ready: Dict[str, None] = {}  # Sıralı küme: mumu kapanmış, henüz ilerletilmemiş timeframe'ler
+        self.symbols: Dict[str, str] = {}  # timeframe -> sembol
         self.initialized = set()
+        self.unverified = set()  # Saat aritmetiğiyle başlatılmış, sağlayıcıyla henüz doğrulanmamış
         self.retry_counts = {}  # timeframe -> retry sayısı (timestamp validation için)
+        # Bütçe planlayıcısı için geçmiş: analiz edilen mum ve toplam retry sayısı
+        self.analysis_totals = Counter()
+        self.retry_totals = Counter()
+
+    def current_candle_close(self, timeframe: str) -> int:
+        """Aktif mumun kapanışı - UTC epoch'a (+ offset) hizalı kova aritmetiği"""
+        interval_ms = self.TIMEFRAME_MS[timeframe]
+        offset_ms = self.offsets_ms.get(timeframe, 0)
+        now_ms = int(self.clock() * 1000)
+        return (now_ms - offset_ms) // interval_ms * interval_ms + offset_ms + interval_ms
 
     async def initialize(self, symbol: str, timeframe: str, exchange_client):
-        """Exchange'den aktif mumun kapanış zamanını al"""
+        """Aktif mumun kapanış zamanını belirle
+
+        clock_init açıksa API çağrısı yapılmaz: kapanış kova aritmetiğinden hesaplanır
+        ve ilk analizde ``verify_alignment`` ile sağlayıcının mumuna göre doğrulanır.
+        Aksi halde (ya da bilinmeyen timeframe'de) exchange'den son 2 mum alınır.
+        """
         if timeframe in self.initialized:
             return
 
+        self.symbols[timeframe] = symbol
+        if self.clock_init and timeframe in self.TIMEFRAME_MS:
+            current_candle_close = self.current_candle_close(timeframe)
+            self._set_close(timeframe, current_candle_close)
+            self.initialized.add(timeframe)
+            self.unverified.add(timeframe)
+            logger.info(f"Scheduler initialized for {timeframe}: next close at {self._format_timestamp(current_candle_close)} (clock)")
+            return
+
         try:
             # Son 2 mumu al
             klines = await exchange_client.get_klines(symbol, timeframe, limit=2)
@@ -265,11 +932,11 @@ class TimeframeScheduler:
 
             # Aktif mumun close time'ını kullan (1 mum gecikmeyi önle)
             # klines[-1] = Şu an aktif mum (henüz kapanmamış)
-            # klines[-1][6] = Bu mumun kapanış zamanı (gelecekteki timestamp)
-            current_candle_close = int(klines[-1][6])
+            # close_time[-1] = Bu mumun kapanış zamanı (gelecekteki timestamp)
+            current_candle_close = int(as_kline_frame(klines).close_time[-1])
 
             # İlk kontrol bu mumun kapanışında olacak
-            self.next_candle_close[timeframe] = current_candle_close
+            self._set_close(timeframe, current_candle_close)
             self.initialized.add(timeframe)
 
             logger.info(f"Scheduler initialized for {timeframe}: next close at {self._format_timestamp(current_candle_close)}")
@@ -277,27 +944,84 @@ class TimeframeScheduler:
         except Exception as e:
             logger.error(f"Error initializing scheduler for {timeframe}: {e}")
 
+    def verify_alignment(self, timeframe: str, provider_close_ms: int) -> bool:
+        """Saatle başlatılan timeframe'in kova hizasını sağlayıcının aktif mumuyla doğrula
+
+        Sağlayıcı mumu bayat olabilir (kapanışı bir kaç mum geride) - bu hizasızlık
+        sayılmaz. Kapanış kova sınırına denk gelmiyorsa (örn. 4h mumları farklı saatte
+        başlıyor) sağlayıcının kapanışı esas alınır ve False döner; bu mum analiz edilmez.
+        """
+        if timeframe not in self.unverified:
+            return True
+        self.unverified.discard(timeframe)
+
+        interval_ms = self.TIMEFRAME_MS[timeframe]
+        expected = self.next_candle_close[timeframe]
+        if (provider_close_ms - expected) % interval_ms == 0:
+            logger.debug(f"{timeframe} clock alignment verified by provider")
+            return True
+
+        self.offsets_ms[timeframe] = provider_close_ms % interval_ms
+        self._set_close(timeframe, provider_close_ms)
+        self.retry_counts[timeframe] = 0
+        logger.warning(
+            f"{timeframe} candles are not aligned to the clock (offset {self.offsets_ms[timeframe] // 60000} min), "
+            f"using provider: next close at {self._format_timestamp(provider_close_ms)}"
+        )
+        return False
+
+    def _set_close(self, timeframe: str, close_ms: int):
+        """Beklenen kapanışı ayarla ve deadline'ı (kapanış + buffer) yeniden planla"""
+        self.next_candle_close[timeframe] = close_ms
+        self.ready.pop(timeframe, None)
+        self.deadlines.schedule(self.symbols.get(timeframe, ""), timeframe, close_ms + self.close_buffer_ms)
+
+    def due_timeframes(self) -> List[str]:
+        """Mumu kapanmış (buffer dahil) ya da retry zamanı gelmiş timeframe'ler - heap'ten O(k log n)
+
+        Analiz edilene / atlanana kadar listede kalırlar; retry'a düşen timeframe
+        kendi backoff deadline'ına kadar listeden çıkar.
+        """
+        for _, timeframe in self.deadlines.pop_due(int(self.clock() * 1000)):
+            self.ready[timeframe] = None
+        return list(self.ready)
+
     def should_analyze(self, timeframe: str) -> bool:
         """Bu timeframe'in mumu kapandı mı?
 
-        5 saniye buffer ekler - Exchange'in mumu finalize etmesi ve rate limit için.
+        close_buffer_ms (varsayılan 5 sn) ekler - Exchange'in mumu finalize etmesi ve rate limit için.
         Bu, "1 mum geç sinyal" sorununu önler ve API limitlerini korur.
         """
         if timeframe not in self.next_candle_close:
             return False
+        if timeframe in self.ready:
+            return True
 
-        current_time = int(time.time() * 1000)
-        # 5 saniye buffer: Exchange'in mumu tam finalize etmesi ve rate limit koruması
-        candle_close_with_buffer = self.next_candle_close[timeframe] + 5000
-        return current_time >= candle_close_with_buffer
+        current_time = int(self.clock() * 1000)
+        # Deadline: kapanış + buffer (Exchange'in mumu tam finalize etmesi) ya da retry backoff'u
+        due_ms = self.deadlines.due_time(self.symbols.get(timeframe, ""), timeframe)
+        return due_ms is not None and current_time >= due_ms
 
     def mark_analyzed(self, timeframe: str):
         """Analiz yapıldı, bir sonraki mum kapanışını ayarla"""
         if timeframe not in self.next_candle_close:
             return
 
+        self.analysis_totals[timeframe] += 1
+        self._advance(timeframe)
+
+    def skip_candle(self, timeframe: str):
+        """Mumu analiz etmeden atla (bütçe planlayıcısı polling sıklığını düşürdüğünde)"""
+        if timeframe not in self.next_candle_close:
+            return
+
+        self._advance(timeframe)
+
+    def _advance(self, timeframe: str):
+        """Bir sonraki mum kapanışına geç"""
+
         interval_ms = self.TIMEFRAME_MS.get(timeframe, 60000)
-        self.next_candle_close[timeframe] += interval_ms
+        self._set_close(timeframe, self.next_candle_close[timeframe] + interval_ms)
         # Retry counter'ı sıfırla (yeni mum için baştan başla)
         self.retry_counts[timeframe] = 0
         logger.debug(f"{timeframe} next close: {self._format_timestamp(self.next_candle_close[timeframe])}")
@@ -305,52 +1029,51 @@ class TimeframeScheduler:
     def get_next_check_time(self) -> float:
         """En yakın mum kapanışına kalan süre (saniye)
 
-        5 saniye buffer dahil - should_analyze() ile senkronize çalışır.
+        close_buffer_ms dahil - should_analyze() / due_timeframes() ile senkronize çalışır.
+        En yakın deadline heap'in tepesinden okunur (tarama yok) ve saniyeye
+        yuvarlanmaz; uyanma kapanıştan sonra milisaniyeler içinde olur.
 
-        ⚠️ ÖZEL: Eğer herhangi bir timeframe retry durumundaysa (retry_count > 0),
-        10 saniye döndür (rate limit koruması için).
+        Retry'daki timeframe'lerin backoff deadline'ları da aynı heap'tedir; bir
+        timeframe'in retry'ı diğerlerinin zamanlamasını değiştirmez.
         """
-        # 🔥 FIX: Retry durumu kontrolü
-        # Eğer herhangi bir timeframe retry modundaysa, 10 saniye döndür (rate limit: 8 req/min)
-        for timeframe, retry_count in self.retry_counts.items():
-            if retry_count > 0:
-                logger.debug(f"Retry mode active for {timeframe} (retry {retry_count}/6), next check in 10 seconds")
-                return 10  # Rate limit aşılmaması için 10 saniye bekle
-
-        # Normal flow (retry yoksa)
-        if not self.next_candle_close:
-            return 60  # Default 60 saniye
-
-        current_time = int(time.time() * 1000)
+        next_due = self.deadlines.next_due()
+        if next_due is None:
+            return 1 if self.ready else 60  # Hepsi kapanmış: hemen kontrol et, hiç yok: 60 saniye
 
-        # 5 saniye buffer ekle (should_analyze ile aynı)
-        # Her timestamp'e 5000ms ekleyerek kontrol et
-        next_times = [
-            (t + 5000) - current_time
-            for t in self.next_candle_close.values()
-            if (t + 5000) > current_time
-        ]
+        current_time = int(self.clock() * 1000)
+        return max(0.0, (next_due - current_time) / 1000)
 
-        if not next_times:
-            return 1  # Hemen kontrol et
-
-        return max(1, min(next_times) / 1000)  # En az 1 saniye
+    def retry_delay(self, retry_count: int) -> float:
+        """retry_count. denemeden önceki bekleme (sn) - üstel backoff, RETRY_MAX_DELAY ile sınırlı"""
+        return min(self.retry_max_delay, self.retry_base_delay * 2 ** max(0, retry_count - 1))
 
     def increment_retry(self, timeframe: str) -> int:
-        """Timestamp validation retry sayısını artır ve döndür"""
+        """Timestamp validation retry sayısını artır ve döndür
+
+        Timeframe hazır listesinden çıkar ve kendi backoff deadline'ına planlanır;
+        diğer timeframe'ler bu sürede normal kapanışlarında analiz edilir.
+        """
         if timeframe not in self.retry_counts:
             self.retry_counts[timeframe] = 0
         self.retry_counts[timeframe] += 1
+        self.retry_totals[timeframe] += 1
+
+        delay = self.retry_delay(self.retry_counts[timeframe])
+        self.ready.pop(timeframe, None)
+        self.deadlines.schedule(
+            self.symbols.get(timeframe, ""), timeframe, int(self.clock() * 1000) + int(delay * 1000)
+        )
+        logger.debug(f"{timeframe} retry {self.retry_counts[timeframe]}/{self.retry_max_attempts} in {delay:.1f}s")
         return self.retry_counts[timeframe]
 
     def reset_retry(self, timeframe: str):
         """Retry counter'ı sıfırla (başarılı analiz sonrası)"""
         self.retry_counts[timeframe] = 0
 
-    def should_skip_due_to_timeout(self, timeframe: str, max_retries: int = 6) -> bool:
-        """60 saniye (6 retry x 10 saniye) geçtiyse True döndür"""
+    def should_skip_due_to_timeout(self, timeframe: str, max_retries: Optional[int] = None) -> bool:
+        """Retry hakkı (varsayılan RETRY_MAX_ATTEMPTS, ~60 saniye) bittiyse True döndür"""
         retry_count = self.retry_counts.get(timeframe, 0)
-        return retry_count >= max_retries
+        return retry_count >= (max_retries if max_retries is not None else self.retry_max_attempts)
 
     def _format_timestamp(self, timestamp_ms: int) -> str:
         """Timestamp'i okunabilir formata çevir"""
@@ -358,6 +1081,156 @@ class TimeframeScheduler:
         return dt.strftime('%Y-%m-%d %H:%M:%S')
 
 
+class RequestBudgetPlanner:
+    """Günlük API bütçesi planlayıcısı - kota bitmeden düşük öncelikli timeframe'leri kısar
+
+    Gün sonuna (00:00 UTC) kadar kalan mum kapanışlarından ve retry geçmişinden
+    beklenen istek sayısını tahmin eder. Tahmin kalan kotayı (rezerv hariç) aşarsa,
+    öncelik sırasının sonundan başlayarak:
+    1. Timeframe'i 1m serisinden türetmeye geçirir (ResamplingClient, ~0 istek)
+    2. Polling sıklığını düşürür (her N. mum kapanışında analiz, N <= max_cadence)
+    Her yeniden planlama temel konfigürasyondan başladığı için kota sıfırlanınca
+    (yeni gün) kısıtlamalar kendiliğinden kalkar.
+    """
+
+    REPLAN_INTERVAL_MS = 10 * 60 * 1000
+
+    def __init__(
+        self,
+        timeframes: List[str],
+        key_scheduler: ApiKeyScheduler,
+        scheduler: TimeframeScheduler,
+        resampler=None,
+        priority: List[str] = BUDGET_PRIORITY,
+        reserve: float = BUDGET_RESERVE,
+        max_cadence: int = BUDGET_MAX_CADENCE,
+    ):
+        """
+        Args:
+            timeframes: Analiz edilen timeframe'ler
+            key_scheduler: Kota bilgisi (kalan istek, saat)
+            scheduler: Retry geçmişi (analysis_totals / retry_totals)
+            resampler: ResamplingClient (enable/disable/can_derive) - yoksa sadece sıklık düşürülür
+            priority: Yüksekten düşüğe timeframe önceliği
+            reserve: Kotanın beklenmeyen istekler için ayrılan oranı
+            max_cadence: En düşük polling sıklığı (her N mumda bir)
+        """
+        self.timeframes = list(timeframes)
+        self.keys = key_scheduler
+        self.scheduler = scheduler
+        self.resampler = resampler
+        self.priority = [tf for tf in priority if tf in self.timeframes]
+        self.priority += [tf for tf in self.timeframes if tf not in self.priority]
+        self.reserve = reserve
+        self.max_cadence = max_cadence
+        self.baseline_derived: Set[str] = set(resampler.timeframes) if resampler is not None else set()
+        self.derived: Set[str] = set(self.baseline_derived)
+        self.cadence: Dict[str, int] = {tf: 1 for tf in self.timeframes}
+        self._last_plan_ms: Optional[int] = None
+
+    def _retry_rate(self, timeframe: str) -> float:
+        """Analiz edilen mum başına ortalama retry sayısı"""
+        analyses = self.scheduler.analysis_totals.get(timeframe, 0)
+        return self.scheduler.retry_totals.get(timeframe, 0) / analyses if analyses else 0.0
+
+    def _cost(self, timeframe: str, derived: Set[str], cadence: Dict[str, int]) -> float:
+        """Analiz edilen mum başına beklenen istek sayısı"""
+        if timeframe not in derived:
+            return 1 + self._retry_rate(timeframe)
+        # Türetilen timeframe: periyodik doğrulama + 1m aynı dakikada çekilmiyorsa 1m indirmesi
+        cost = 1 / self.resampler.verify_every if self.resampler.verify_every else 0.0
+        base = self.resampler.base_interval
+        factor = TimeframeScheduler.TIMEFRAME_MS[timeframe] // TimeframeScheduler.TIMEFRAME_MS[base]
+        if base not in self.timeframes or base in derived or factor % cadence.get(base, 1):
+            cost += 1
+        return cost
+
+    def forecast(self, derived: Optional[Set[str]] = None, cadence: Optional[Dict[str, int]] = None) -> float:
+        """Gün sonuna kadar beklenen istek sayısı"""
+        derived = self.derived if derived is None else derived
+        cadence = self.cadence if cadence is None else cadence
+        now_ms = self.keys.now_ms()
+        day_end_ms = (now_ms // ApiKeyScheduler.DAY_MS + 1) * ApiKeyScheduler.DAY_MS
+        total = 0.0
+        for timeframe in self.timeframes:
+            closes_left = (day_end_ms - now_ms) / TimeframeScheduler.TIMEFRAME_MS[timeframe]
+            total += closes_left / cadence[timeframe] * self._cost(timeframe, derived, cadence)
+        return total
+
+    def budget(self) -> float:
+        """Bugün harcanabilecek istek sayısı (rezerv hariç)"""
+        self.keys.roll_day()
+        remaining = self.keys.total_capacity() - self.keys.total_used()
+        return remaining - self.reserve * self.keys.total_capacity()
+
+    def _steps(self):
+        """Kısıtlama adımları: önce türetme, sonra sıklık - düşük öncelikliden başlayarak"""
+        for timeframe in reversed(self.priority):
+            if (self.resampler is not None and timeframe not in self.baseline_derived
+                    and self.resampler.can_derive(timeframe)):
+                yield "derive", timeframe, None
+        for timeframe in reversed(self.priority):
+            for cadence in range(2, self.max_cadence + 1):
+                yield "cadence", timeframe, cadence
+
+    def plan(self) -> Tuple[Set[str], Dict[str, int], float, float]:
+        """Bütçeye sığan en az kısıtlı planı hesapla (derived, cadence, forecast, budget)"""
+        budget = self.budget()
+        derived = set(self.baseline_derived)
+        cadence = {tf: 1 for tf in self.timeframes}
+        forecast = self.forecast(derived, cadence)
+        for action, timeframe, value in self._steps():
+            if forecast <= budget:
+                break
+            if action == "derive":
+                derived.add(timeframe)
+            else:
+                cadence[timeframe] = value
+            forecast = self.forecast(derived, cadence)
+        return derived, cadence, forecast, budget
+
+    def update(self, force: bool = False) -> bool:
+        """Gerekirse yeniden planla ve uygula, plan değiştiyse True"""
+        now_ms = self.keys.now_ms()
+        if not force and self._last_plan_ms is not None and now_ms - self._last_plan_ms < self.REPLAN_INTERVAL_MS:
+            return False
+        self._last_plan_ms = now_ms
+
+        derived, cadence, forecast, budget = self.plan()
+        if derived == self.derived and cadence == self.cadence:
+            return False
+
+        if self.resampler is not None:
+            for timeframe in derived - self.derived:
+                self.resampler.enable(timeframe)
+            for timeframe in self.derived - derived:
+                self.resampler.disable(timeframe)
+        self.derived, self.cadence = derived, cadence
+
+        if forecast > budget:
+            logger.error(f"Request budget: forecast {forecast:.0f} still exceeds budget {budget:.0f} after degrading")
+        degraded = derived != self.baseline_derived or any(value > 1 for value in cadence.values())
+        log = logger.warning if degraded else logger.info
+        log(f"Request budget: forecast {forecast:.0f} / budget {budget:.0f} requests - {self.describe()}")
+        return True
+
+    def should_poll(self, timeframe: str, close_time_ms: int) -> bool:
+        """Bu mum kapanışı analiz edilmeli mi (sıklık düşürüldüyse sadece her N. mum)"""
+        cadence = self.cadence.get(timeframe, 1)
+        if cadence <= 1:
+            return True
+        return (close_time_ms // TimeframeScheduler.TIMEFRAME_MS[timeframe]) % cadence == 0
+
+    def describe(self) -> str:
+        """Güncel planın kısa özeti"""
+        parts = []
+        for timeframe in self.timeframes:
+            mode = "derived" if timeframe in self.derived else "api"
+            cadence = self.cadence[timeframe]
+            parts.append(f"{timeframe}: {mode}" + (f" every {cadence}" if cadence > 1 else ""))
+        return ", ".join(parts)
+
+
 class SignalTracker:
     """Sinyal takibi ve tekrar önleme"""
 
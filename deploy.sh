@@ -29,8 +29,13 @@ echo "📄 Bot dosyaları kopyalanıyor..."
 cp -v main.py $BOT_DIR/
 cp -v config.py $BOT_DIR/
 cp -v indicators.py $BOT_DIR/
+cp -v klines.py $BOT_DIR/
 cp -v strategies.py $BOT_DIR/
 cp -v core.py $BOT_DIR/
+cp -v candle_store.py $BOT_DIR/
+cp -v resampler.py $BOT_DIR/
+cp -v failover.py $BOT_DIR/
+cp -v streaming.py $BOT_DIR/
 cp -v analyzer.py $BOT_DIR/
 cp -v message_builders.py $BOT_DIR/
 cp -v config.env $BOT_DIR/
@@ -0,0 +1,208 @@
+"""
+Hedged İstekler ve Failover - birden fazla veri kaynağını tek ExchangeClient arkasında birleştirme
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from config import HEDGE_PERCENTILE, HEDGE_MIN_DELAY, HEDGE_MAX_DELAY, FAILOVER_MAX_ERRORS, FAILOVER_COOLDOWN
+from core import ExchangeClient
+from klines import KlineFrame
+
+logger = logging.getLogger(__name__)
+
+
+class FailoverClient(ExchangeClient):
+    """Öncelik sıralı kaynaklara hedged istek + hata durumunda failover yapan ExchangeClient
+
+    - İstek önce sıradaki ilk sağlıklı kaynağa gider
+    - Yanıt, o kaynağın gecikme dağılımının ``percentile`` değerini aşarsa sıradaki
+      kaynağa ikinci (hedged) istek gönderilir; hangisi önce dönerse o kullanılır,
+      diğeri iptal edilir
+    - Hata / boş yanıt alınırsa beklemeden sıradaki kaynağa geçilir
+    - Art arda ``max_errors`` hata veren kaynak ``cooldown`` sn boyunca sıranın sonuna alınır
+
+    Kaynaklar farklı sağlayıcı adaptörleri ya da aynı ApiKeyScheduler'ı paylaşan,
+    farklı key alt kümelerine sabitlenmiş TwelveDataClient'lar olabilir (hedge
+    yavaş isteğin key'ine ikinci kredi harcamaz).
+    """
+
+    def __init__(
+        self,
+        sources: Dict[str, ExchangeClient],
+        percentile: float = HEDGE_PERCENTILE,
+        min_delay: float = HEDGE_MIN_DELAY,
+        max_delay: float = HEDGE_MAX_DELAY,
+        max_errors: int = FAILOVER_MAX_ERRORS,
+        cooldown: float = FAILOVER_COOLDOWN,
+        window: int = 100,
+        min_samples: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            sources: Kaynak adı -> client (öncelik sırasıyla)
+            percentile: Hedge eşiği olarak kullanılan gecikme yüzdeliği (0-1)
+            min_delay, max_delay: Hedge bekleme süresinin sınırları (sn)
+            max_errors: Kaynağın geri plana alınması için art arda hata sayısı
+            cooldown: Geri plandaki kaynağın tekrar öne alınma süresi (sn)
+            window: Yüzdelik için tutulan son başarılı gecikme sayısı
+            min_samples: Bu sayıdan az ölçümde hedge bekleme süresi max_delay'dir
+            clock: Zaman kaynağı (test için)
+        """
+        if not sources:
+            raise ValueError("sources must not be empty")
+        self.sources = dict(sources)
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_errors = max_errors
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self.clock = clock
+        self.latencies: Dict[str, deque] = {name: deque(maxlen=window) for name in self.sources}
+        self.stats: Dict[str, Dict[str, int]] = {
+            name: {"requests": 0, "errors": 0, "wins": 0, "hedges": 0, "cancelled": 0}
+            for name in self.sources
+        }
+        self._consecutive_errors = {name: 0 for name in self.sources}
+        self._demoted_until = {name: 0.0 for name in self.sources}
+
+        logger.info(
+            f"FailoverClient: {' > '.join(self.sources)} "
+            f"(hedge at p{percentile * 100:.0f}, {min_delay:.1f}-{max_delay:.1f}s)"
+        )
+
+    def ranked(self) -> list:
+        """Kaynak sırası: sağlıklılar öncelik sırasıyla, cooldown'dakiler sonda"""
+        now = self.clock()
+        healthy = [name for name in self.sources if self._demoted_until[name] <= now]
+        demoted = sorted(
+            (name for name in self.sources if self._demoted_until[name] > now),
+            key=lambda name: self._demoted_until[name]
+        )
+        return healthy + demoted
+
+    def hedge_delay(self, name: str) -> float:
+        """Kaynağın gecikme yüzdeliği (yeterli ölçüm yoksa max_delay)"""
+        samples = self.latencies[name]
+        if len(samples) < self.min_samples:
+            return self.max_delay
+        delay = float(np.quantile(np.fromiter(samples, dtype=np.float64), self.percentile))
+        return min(self.max_delay, max(self.min_delay, delay))
+
+    async def get_klines(self, symbol: str, interval: str, limit: int = 101) -> KlineFrame:
+        """Hedged / failover get_klines (tüm kaynaklar başarısızsa boş frame)"""
+        result = await self._call("get_klines", (symbol, interval, limit), lambda frame: len(frame) > 0)
+        return result if result is not None else KlineFrame.empty()
+
+    async def latest_closed_time(self, symbol: str, interval: str) -> Optional[int]:
+        """Hedged / failover hazırlık kontrolü"""
+        return await self._call("latest_closed_time", (symbol, interval), lambda value: value is not None)
+
+    async def _call(self, method: str, args: tuple, succeeded: Callable[[Any], bool]) -> Any:
+        """İsteği sıradaki kaynağa gönder; gecikirse hedge et, hata alırsa failover yap"""
+        order = self.ranked()
+        launched = []
+        pending: Dict[asyncio.Task, str] = {}
+
+        def launch() -> str:
+            name = order[len(launched)]
+            launched.append(name)
+            pending[asyncio.create_task(self._timed(name, method, args, succeeded))] = name
+            return name
+
+        last = launch()
+        try:
+            while pending:
+                more = len(launched) < len(order)
+                done, _ = await asyncio.wait(
+                    pending, timeout=self.hedge_delay(last) if more else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Yavaş yanıt - sıradaki kaynağa hedged istek
+                    self.stats[last]["hedges"] += 1
+                    logger.debug(f"Hedging {method}{args}: {last} slower than {self.hedge_delay(last):.2f}s")
+                    last = launch()
+                    continue
+
+                failed = False
+                for task in done:
+                    name = pending.pop(task)
+                    result = task.result()
+                    if result is not None and succeeded(result):
+                        self.stats[name]["wins"] += 1
+                        return result
+                    failed = True
+                if failed and len(launched) < len(order):
+                    # Hata - beklemeden sıradaki kaynağa geç
+                    last = launch()
+
+            logger.error(f"All sources failed for {method}{args}: {', '.join(launched)}")
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _timed(self, name: str, method: str, args: tuple, succeeded: Callable[[Any], bool]) -> Any:
+        """Tek kaynağa istek - gecikme ve hata istatistiklerini güncelle (hata = None)"""
+        stats = self.stats[name]
+        stats["requests"] += 1
+        start = time.perf_counter()
+        try:
+            result = await getattr(self.sources[name], method)(*args)
+        except asyncio.CancelledError:
+            stats["cancelled"] += 1
+            raise
+        except Exception as e:
+            logger.warning(f"Source {name} failed for {method}{args}: {e}")
+            result = None
+
+        if result is not None and succeeded(result):
+            self.latencies[name].append(time.perf_counter() - start)
+            self._consecutive_errors[name] = 0
+            return result
+
+        stats["errors"] += 1
+        self._consecutive_errors[name] += 1
+        if self._consecutive_errors[name] >= self.max_errors and self._demoted_until[name] <= self.clock():
+            self._demoted_until[name] = self.clock() + self.cooldown
+            logger.warning(
+                f"Source {name} demoted for {self.cooldown:.0f}s after "
+                f"{self._consecutive_errors[name]} consecutive errors"
+            )
+        return None
+
+    def describe(self) -> Dict[str, Dict]:
+        """Kaynak başına istek / hata / kazanma / hedge sayıları ve gecikme yüzdelikleri"""
+        report = {}
+        for name, stats in self.stats.items():
+            samples = np.fromiter(self.latencies[name], dtype=np.float64)
+            report[name] = dict(stats)
+            if len(samples):
+                report[name]["p50_ms"] = round(float(np.quantile(samples, 0.5)) * 1000, 1)
+                report[name]["p95_ms"] = round(float(np.quantile(samples, 0.95)) * 1000, 1)
+        return report
+
+    @property
+    def pushes_updates(self) -> bool:
+        return next(iter(self.sources.values())).pushes_updates
+
+    async def wait_for_update(self, timeout: float):
+        """İlk kaynağın bekleme davranışını kullan"""
+        await next(iter(self.sources.values())).wait_for_update(timeout)
+
+    async def close(self):
+        """İstatistikleri logla ve kaynakları (bir kez) kapat"""
+        for name, report in self.describe().items():
+            logger.info(f"Source {name}: {report}")
+        closed = set()
+        for client in self.sources.values():
+            if id(client) not in closed:
+                closed.add(id(client))
+                await client.close()
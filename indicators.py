@@ -2,17 +2,465 @@
 İndikatör Sınıfları
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from collections import Counter, defaultdict, deque
+from typing import Any, List, Dict, Optional, Tuple
+
+import numpy as np
+
+from klines import KlineFrame, OPEN, HIGH, LOW, CLOSE
+
+# Desteklenen hesaplama backend'leri
+# - "python": Orijinal saf Python döngüleri
+# - "numpy": Array tabanlı (stride/rolling) hesaplama, aynı sonuçları üretir
+BACKENDS = ("python", "numpy")
+
+
+def _validate_backend(backend: str) -> str:
+    """Backend adını doğrula"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported backend: {backend} (expected one of {BACKENDS})")
+    return backend
+
+
+def _column(klines: List[List], index: int) -> np.ndarray:
+    """Tek bir fiyat kolonunu float64 array olarak al
+
+    KlineFrame ise mevcut kolon kopyalanmadan döner; List[List] ise çıkarılır.
+    """
+    if isinstance(klines, KlineFrame):
+        return klines.column(index)
+    return np.array([k[index] for k in klines], dtype=np.float64)
+
+
+def _prices(klines: List[List], index: int) -> List[float]:
+    """Tek bir fiyat kolonunu Python float listesi olarak al (python backend)"""
+    if isinstance(klines, KlineFrame):
+        return klines.column(index).tolist()
+    return [float(k[index]) for k in klines]
+
+
+def _median_prices(klines: List[List]) -> List[float]:
+    """Median price (High + Low) / 2 listesi - KlineFrame'de cache'li kolon kullanılır"""
+    if isinstance(klines, KlineFrame):
+        return klines.median.tolist()
+    return [(float(k[2]) + float(k[3])) / 2 for k in klines]
+
+
+def _window_sum(values: np.ndarray, length: int) -> np.ndarray:
+    """Kayan pencere toplamı (values[i-length+1..i])
+
+    Toplama, Python'daki ``sum()`` ile aynı sırada (soldan sağa) yapılır;
+    böylece sonuçlar saf Python döngüsüyle bit düzeyinde aynıdır.
+    Çıktı uzunluğu: len(values) - length + 1
+    """
+    count = len(values) - length + 1
+    if count <= 0:
+        return np.empty(0, dtype=np.float64)
+    total = np.zeros(count, dtype=np.float64)
+    for offset in range(length):
+        total += values[offset:offset + count]
+    return total
+
+
+def _window_extremum(values: np.ndarray, length: int, ufunc: np.ufunc, fill: float) -> np.ndarray:
+    """Kayan pencere extremum - van Herk/Gil-Werman blok algoritması
+
+    Dizi ``length`` uzunluğunda bloklara bölünür; her blok içinde soldan
+    (prefix) ve sağdan (suffix) kümülatif extremum alınır. Her pencere en fazla
+    iki bloğa yayıldığı için sonuç = ufunc(suffix[i], prefix[i + length - 1]).
+    Maliyet pencere uzunluğundan bağımsızdır: O(n).
+    """
+    n = len(values)
+    if n < length:
+        return np.empty(0, dtype=np.float64)
+    padded_len = -(-n // length) * length
+    padded = np.full(padded_len, fill, dtype=np.float64)
+    padded[:n] = values
+    blocks = padded.reshape(-1, length)
+    prefix = ufunc.accumulate(blocks, axis=1).ravel()
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return ufunc(suffix[:n - length + 1], prefix[length - 1:n])
+
+
+def _window_max(values: np.ndarray, length: int) -> np.ndarray:
+    """Kayan pencere maksimumu (çıktı uzunluğu: len(values) - length + 1)"""
+    return _window_extremum(values, length, np.maximum, -np.inf)
+
+
+def _window_min(values: np.ndarray, length: int) -> np.ndarray:
+    """Kayan pencere minimumu (çıktı uzunluğu: len(values) - length + 1)"""
+    return _window_extremum(values, length, np.minimum, np.inf)
+
+
+def _to_list(values: np.ndarray) -> List:
+    """NaN içeren array'i None içeren Python listesine çevir (mevcut API formatı)"""
+    return [None if v != v else v for v in values.tolist()]
+
+
+class _RollingSum:
+    """Sabit uzunluklu pencere için O(1) kayan toplam (streaming)
+
+    Penceredeki sıfır olmayan eleman sayısı da tutulur; pencere tamamen
+    sıfırlardan oluştuğunda toplam tam olarak 0.0'a çekilir. Böylece
+    ekle/çıkar yuvarlama artıkları ``total != 0`` kontrollerini bozmaz.
+    """
+
+    def __init__(self, length: int):
+        self.length = length
+        self.values = deque()
+        self.total = 0.0
+        self.nonzero = 0
+
+    def push(self, value: float) -> float:
+        """Yeni değeri ekle, pencereden çıkanı düş ve güncel toplamı döndür"""
+        self.values.append(value)
+        self.total += value
+        if value != 0:
+            self.nonzero += 1
+        if len(self.values) > self.length:
+            old = self.values.popleft()
+            self.total -= old
+            if old != 0:
+                self.nonzero -= 1
+        if self.nonzero == 0:
+            self.total = 0.0
+        return self.total
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.length
+
+
+class RollingExtremum:
+    """Monotonik deque ile kayan pencere max/min (streaming form)
+
+    Her ``push`` amortize O(1)'dir: her değer deque'e en fazla bir kez girer ve
+    bir kez çıkar. Maliyet pencere uzunluğundan bağımsızdır, bu yüzden
+    ``STOCH_PERIOD_K`` veya ``WILLIAMS_R_LENGTH`` büyütülse de hesaplama yavaşlamaz.
+
+    Kullanım:
+        highest = RollingExtremum(9, "max")
+        for high in highs:
+            value = highest.push(high)  # highest.full ise pencere dolu
+    """
+
+    def __init__(self, length: int, mode: str = "max"):
+        if mode not in ("max", "min"):
+            raise ValueError(f"Unsupported mode: {mode}")
+        self.length = length
+        self.is_max = mode == "max"
+        self.reset()
+
+    def reset(self):
+        """Pencereyi boşalt"""
+        self.window = deque()  # (index, value) - değerler monoton sıralı
+        self.count = 0
+
+    def push(self, value: float) -> float:
+        """Yeni değeri ekle ve penceredeki extremum değeri döndür"""
+        window = self.window
+        if self.is_max:
+            while window and window[-1][1] <= value:
+                window.pop()
+        else:
+            while window and window[-1][1] >= value:
+                window.pop()
+        window.append((self.count, value))
+        self.count += 1
+        if window[0][0] <= self.count - 1 - self.length:
+            window.popleft()
+        return window[0][1]
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.length
+
+
+def _rolling_extremum(values: List[Optional[float]], length: int, mode: str) -> List[Optional[float]]:
+    """Batch form - ``RollingExtremum`` ile tek geçişte O(n)
+
+    None değerler pencereyi sıfırlar; içinde None bulunan pencereler için
+    sonuç None olur (tam dolu pencere şartı).
+    """
+    result = [None] * len(values)
+    tracker = RollingExtremum(length, mode)
+    for i, value in enumerate(values):
+        if value is None:
+            tracker.reset()
+            continue
+        extreme = tracker.push(value)
+        if tracker.full:
+            result[i] = extreme
+    return result
+
+
+def rolling_max(values: List[Optional[float]], length: int) -> List[Optional[float]]:
+    """values[i-length+1..i] penceresinin maksimumu (ilk length-1 eleman None)"""
+    return _rolling_extremum(values, length, "max")
+
+
+def rolling_min(values: List[Optional[float]], length: int) -> List[Optional[float]]:
+    """values[i-length+1..i] penceresinin minimumu (ilk length-1 eleman None)"""
+    return _rolling_extremum(values, length, "min")
+
+
+class _EmaState:
+    """SMA ile tohumlanan EMA (MACD._calculate_ema ile aynı formül, streaming)"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.multiplier = 2 / (period + 1)
+        self.seed = []
+        self.value = None
+
+    def push(self, value: float) -> Optional[float]:
+        if self.value is None:
+            self.seed.append(value)
+            if len(self.seed) == self.period:
+                self.value = sum(self.seed) / self.period
+                self.seed = []
+            return self.value
+        self.value = (value - self.value) * self.multiplier + self.value
+        return self.value
+
+
+def _rolling_array(values: np.ndarray, length: int, mode: str) -> np.ndarray:
+    """Kayan max/min - giriş ile aynı uzunlukta, ilk length-1 eleman NaN
+
+    Penceresinde NaN bulunan elemanlar da NaN olur (``rolling_max`` ile aynı kural).
+    """
+    result = np.full(len(values), np.nan)
+    window = _window_max(values, length) if mode == "max" else _window_min(values, length)
+    result[length - 1:length - 1 + len(window)] = window
+    return result
+
+
+def _rsi_array(closes: np.ndarray, length: int) -> np.ndarray:
+    """RSI (basit ortalama) - array kernel, ilk length eleman NaN"""
+    n = len(closes)
+    rsi_values = np.full(n, np.nan)
+    if n < length + 1:
+        return rsi_values
+    
+    changes = np.diff(closes)
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes > 0, 0.0, np.abs(changes))
+    
+    # i. mum için pencere: changes[i-length .. i-1]
+    avg_gain = _window_sum(gains, length) / length
+    avg_loss = _window_sum(losses, length) / length
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        rsi = np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + rs)))
+    rsi_values[length:] = rsi
+    return rsi_values
+
+
+def _sma_array(values: np.ndarray, period: int) -> np.ndarray:
+    """Basit hareketli ortalama - penceresinde NaN olan elemanlar NaN"""
+    result = np.full(len(values), np.nan)
+    if len(values) >= period:
+        result[period - 1:] = _window_sum(values, period) / period
+    return result
+
+
+def _ema(data: List[float], period: int) -> List[Optional[float]]:
+    """SMA ile tohumlanan EMA (ilk period-1 eleman None)"""
+    ema_values = [None] * len(data)
+    
+    if len(data) < period:
+        return ema_values
+    
+    # İlk EMA değeri SMA olarak başlar
+    sma = sum(data[:period]) / period
+    ema_values[period - 1] = sma
+    
+    # Smoothing faktörü
+    multiplier = 2 / (period + 1)
+    
+    # Sonraki EMA değerleri
+    for i in range(period, len(data)):
+        ema_values[i] = (data[i] - ema_values[i - 1]) * multiplier + ema_values[i - 1]
+    
+    return ema_values
+
+
+# IndicatorContext kaynak kolonları
+_SOURCE_COLUMNS = {"open": OPEN, "high": HIGH, "low": LOW, "close": CLOSE}
+
+
+class IndicatorContext:
+    """Tek bir kline seti için paylaşılan ara sonuçlar (küçük hesaplama grafiği)
+
+    İndikatörler ``inputs()`` ile ihtiyaç duydukları ara serileri bildirir;
+    context her düğümü kline seti başına yalnızca bir kez hesaplar ve tüm
+    tüketicilerle paylaşır. Düğüm anahtarları (tuple):
+
+    - ("open",) / ("high",) / ("low",) / ("close",): Fiyat kolonları
+    - ("median",): (High + Low) / 2
+    - ("typical",): (High + Low + Close) / 3
+    - ("rsi", length): RSI serisi
+    - ("rolling_max", source, length) / ("rolling_min", source, length):
+      Kayan extremum; source başka bir düğüm anahtarıdır (örn. ("high",), ("rsi", 5))
+    - ("ema", source, period): SMA ile tohumlanan EMA
+
+    Her düğüm hem numpy array (``array``, eksik = NaN) hem Python listesi
+    (``values``, eksik = None) olarak okunabilir; dönüşümler de cache'lenir.
+
+    Kullanım:
+        context = IndicatorContext(klines)
+        for indicator in indicators:
+            context.register(indicator)
+            indicator.calculate(klines, context=context)
+        context.report()  # Hangi ara sonuçların paylaşıldığı
+    """
+
+    def __init__(self, klines: List[List]):
+        self.klines = klines
+        self._arrays: Dict[Tuple, np.ndarray] = {}
+        self._lists: Dict[Tuple, List] = {}
+        self.requests = Counter()  # düğüm -> indikatörlerden gelen istek sayısı
+        self.consumers = defaultdict(list)  # düğüm -> inputs() ile bildiren indikatörler
+
+    def register(self, indicator: "IIndicator"):
+        """İndikatörün bildirdiği girdileri kaydet (rapor için)"""
+        name = type(indicator).__name__
+        for key in indicator.inputs():
+            self.consumers[key].append(name)
+
+    def array(self, key: Tuple) -> np.ndarray:
+        """Düğümü numpy array olarak döndür (eksik değerler NaN)"""
+        self.requests[key] += 1
+        return self._array(key)
+
+    def values(self, key: Tuple) -> List[Optional[float]]:
+        """Düğümü Python listesi olarak döndür (eksik değerler None)"""
+        self.requests[key] += 1
+        return self._values(key)
+
+    def _array(self, key: Tuple) -> np.ndarray:
+        if key not in self._arrays:
+            if key not in self._lists:
+                self._compute(key)
+            if key not in self._arrays:
+                self._arrays[key] = np.array(
+                    [np.nan if v is None else v for v in self._lists[key]], dtype=np.float64
+                )
+        return self._arrays[key]
+
+    def _values(self, key: Tuple) -> List[Optional[float]]:
+        if key not in self._lists:
+            if key not in self._arrays:
+                self._compute(key)
+            if key not in self._lists:
+                self._lists[key] = _to_list(self._arrays[key])
+        return self._lists[key]
+
+    def _compute(self, key: Tuple):
+        kind = key[0]
+        if kind in _SOURCE_COLUMNS:
+            self._arrays[key] = _column(self.klines, _SOURCE_COLUMNS[kind])
+        elif kind == "median":
+            if isinstance(self.klines, KlineFrame):
+                self._arrays[key] = self.klines.median
+            else:
+                self._arrays[key] = (self._array(("high",)) + self._array(("low",))) / 2
+        elif kind == "typical":
+            if isinstance(self.klines, KlineFrame):
+                self._arrays[key] = self.klines.typical
+            else:
+                self._arrays[key] = (
+                    self._array(("high",)) + self._array(("low",)) + self._array(("close",))
+                ) / 3
+        elif kind == "rsi":
+            self._arrays[key] = _rsi_array(self._array(("close",)), key[1])
+        elif kind in ("rolling_max", "rolling_min"):
+            mode = "max" if kind == "rolling_max" else "min"
+            self._arrays[key] = _rolling_array(self._array(key[1]), key[2], mode)
+        elif kind == "ema":
+            self._lists[key] = _ema(self._values(key[1]), key[2])
+        else:
+            raise KeyError(f"Unknown indicator context node: {key}")
+
+    @staticmethod
+    def describe(key: Tuple) -> str:
+        """Düğüm anahtarını okunabilir hale getir: ("rolling_max", ("high",), 9) -> rolling_max(high,9)"""
+        if len(key) == 1:
+            return key[0]
+        args = [IndicatorContext.describe(a) if isinstance(a, tuple) else str(a) for a in key[1:]]
+        return f"{key[0]}({','.join(args)})"
+
+    def report(self) -> Dict[str, Any]:
+        """Paylaşım raporu
+
+        Returns:
+            Dict:
+            - nodes: Hesaplanan ara sonuç sayısı
+            - requests: İndikatörlerden gelen toplam istek
+            - saved: Tekrar hesaplanmayan (cache'ten verilen) istek sayısı
+            - shared: Birden fazla indikatörün bildirdiği düğümler -> tüketiciler
+        """
+        return {
+            "nodes": len(set(self._arrays) | set(self._lists)),
+            "requests": sum(self.requests.values()),
+            "saved": sum(count - 1 for count in self.requests.values() if count > 1),
+            "shared": {
+                self.describe(key): names
+                for key, names in self.consumers.items() if len(names) > 1
+            },
+        }
 
 
 class IIndicator(ABC):
-    """İndikatör interface - Tüm indikatörler bunu implement etmeli"""
+    """İndikatör interface - Tüm indikatörler bunu implement etmeli
+
+    Batch API: ``calculate(klines)`` tüm geçmişi hesaplar.
+    Streaming API: ``update(candle)`` her KAPANMIŞ mumda bir kez çağrılır ve
+    yalnızca en yeni değeri üretir. Aynı mumlar sırayla ``update``'e verildiğinde
+    son değer, ``calculate(klines)`` çıktısının son elemanıyla aynıdır
+    (kayan toplamlar nedeniyle float yuvarlama toleransı ~1e-9 içinde).
+
+    Paylaşılan ara sonuçlar: ``calculate(klines, context=IndicatorContext(klines))``
+    verildiğinde ``inputs()`` ile bildirilen seriler context'ten alınır.
+    """
 
     @abstractmethod
-    def calculate(self, klines: List[List]) -> List[float]:
+    def calculate(self, klines: List[List], context: Optional[IndicatorContext] = None) -> List[float]:
         """İndikatör değerlerini hesapla"""
         pass
 
+    def inputs(self) -> List[Tuple]:
+        """IndicatorContext'ten kullanılan ara seri anahtarları"""
+        return []
+
+    def calculate_arrays(self, klines: List[List], context: Optional[IndicatorContext] = None) -> Dict[str, np.ndarray]:
+        """calculate() serilerini float64 array olarak döndür (None -> NaN)
+
+        Vektörel oylama / backtest içindir; bar bazında Python döngüsü gerektirmez.
+        """
+        return {
+            key: np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            for key, values in self.calculate(klines, context=context).items()
+            if isinstance(values, list)
+        }
+
+    def update(self, candle: List) -> Dict[str, Optional[float]]:
+        """Yeni kapanmış mumu işle ve en güncel değerleri döndür - Alt sınıflar implement etmeli"""
+        raise NotImplementedError("Subclass must implement update()")
+
+    def reset(self):
+        """Streaming state'i sıfırla"""
+        pass
+
+    def warm_up(self, klines: List[List]) -> Dict[str, Optional[float]]:
+        """Streaming state'i geçmiş mumlarla doldur ve son değerleri döndür"""
+        self.reset()
+        latest = {}
+        for candle in klines:
+            latest = self.update(candle)
+        return latest
+
 
 class ChandeMomentumOscillator(IIndicator):
     """Chande Momentum Oscillator (CMO)
@@ -27,16 +475,30 @@ class ChandeMomentumOscillator(IIndicator):
     - CMO < -50: Güçlü aşağı momentum (oversold bölgesi)
     """
     
-    def __init__(self, length: int = 14, use_low: bool = True):
+    def __init__(self, length: int = 14, use_low: bool = True, backend: str = "python"):
+        """
+        Args:
+            length: CMO periyodu
+            use_low: True ise low, False ise close fiyatları kullanılır
+            backend: Hesaplama backend'i ("python" veya "numpy")
+        """
         self.length = length
         self.use_low = use_low
+        self.backend = _validate_backend(backend)
+        self.reset()
     
-    def calculate(self, klines: List[List]) -> Dict[str, List]:
+    def inputs(self) -> List[Tuple]:
+        return [("low",) if self.use_low else ("close",)]
+    
+    def calculate(self, klines: List[List], context: Optional[IndicatorContext] = None) -> Dict[str, List]:
         """CMO değerlerini hesapla
         
         Returns:
             Dict with 'cmo' key containing CMO values
         """
+        if self.backend == "numpy":
+            return self._calculate_numpy(klines, context)
+        
         n = len(klines)
         cmo_values = [None] * n
         
@@ -44,10 +506,12 @@ class ChandeMomentumOscillator(IIndicator):
             return {"cmo": cmo_values}
         
         # use_low=True ise low fiyatlarını, False ise close fiyatlarını kullan
-        if self.use_low:
-            prices = [float(k[3]) for k in klines]  # Low fiyatları (index 3)
+        if context is not None:
+            prices = context.values(self.inputs()[0])
+        elif self.use_low:
+            prices = _prices(klines, 3)  # Low fiyatları (index 3)
         else:
-            prices = [float(k[4]) for k in klines]  # Close fiyatları (index 4)
+            prices = _prices(klines, 4)  # Close fiyatları (index 4)
         
         for i in range(self.length, n):
             sum_up = 0.0
@@ -68,6 +532,56 @@ class ChandeMomentumOscillator(IIndicator):
                 cmo_values[i] = 0.0
         
         return {"cmo": cmo_values}
+    
+    def _calculate_numpy(self, klines: List[List], context: Optional[IndicatorContext] = None) -> Dict[str, List]:
+        """CMO - array tabanlı hesaplama (kayan pencere toplamları)"""
+        n = len(klines)
+        cmo_values = np.full(n, np.nan)
+        
+        if n < self.length + 1:
+            return {"cmo": _to_list(cmo_values)}
+        
+        context = context if context is not None else IndicatorContext(klines)
+        prices = context.array(self.inputs()[0])
+        changes = np.diff(prices)
+        ups = np.where(changes > 0, changes, 0.0)
+        downs = np.where(changes < 0, -changes, 0.0)
+        
+        # i. mum için pencere: changes[i-length .. i-1]
+        sum_up = _window_sum(ups, self.length)
+        sum_down = _window_sum(downs, self.length)
+        total = sum_up + sum_down
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cmo = np.where(total != 0, 100 * ((sum_up - sum_down) / total), 0.0)
+        cmo_values[self.length:] = cmo
+        
+        return {"cmo": _to_list(cmo_values)}
+    
+    def reset(self):
+        """Streaming state'i sıfırla"""
+        self._prev_price = None
+        self._sum_up = _RollingSum(self.length)
+        self._sum_down = _RollingSum(self.length)
+    
+    def update(self, candle: List) -> Dict[str, Optional[float]]:
+        """Yeni kapanmış mum ile CMO'yu O(1) güncelle"""
+        price = float(candle[3]) if self.use_low else float(candle[4])
+        prev_price = self._prev_price
+        self._prev_price = price
+        if prev_price is None:
+            return {"cmo": None}
+        
+        change = price - prev_price
+        sum_up = self._sum_up.push(change if change > 0 else 0.0)
+        sum_down = self._sum_down.push(abs(change) if change < 0 else 0.0)
+        if not self._sum_up.full:
+            return {"cmo": None}
+        
+        total = sum_up + sum_down
+        if total != 0:
+            return {"cmo": 100 * ((sum_up - sum_down) / total)}
+        return {"cmo": 0.0}
 
 
 class StochasticOscillator(IIndicator):
@@ -87,23 +601,42 @@ class StochasticOscillator(IIndicator):
     - %K crosses below %D: Satım sinyali
     """
     
-    def __init__(self, period_k: int = 9, smooth_k: int = 3, smooth_d: int = 3):
+    def __init__(
+        self, 
+        period_k: int = 9, 
+        smooth_k: int = 3, 
+        smooth_d: int = 3, 
+        backend: str = "python"
+    ):
         """
         Args:
             period_k: %K periyodu (genellikle 14 veya 9)
             smooth_k: %K'yı smooth etmek için kullanılan periyot
             smooth_d: %D'yi hesaplamak için %K'nın smooth periyodu
+            backend: Hesaplama backend'i ("python" veya "numpy")
         """
         self.period_k = period_k
         self.smooth_k = smooth_k
         self.smooth_d = smooth_d
+        self.backend = _validate_backend(backend)
+        self.reset()
+    
+    def inputs(self) -> List[Tuple]:
+        return [
+            ("close",),
+            ("rolling_max", ("high",), self.period_k),
+            ("rolling_min", ("low",), self.period_k),
+        ]
     
-    def calculate(self, klines: List[List]) -> Dict[str, List]:
+    def calculate(self, klines: List[List], context: Optional[IndicatorContext] = None) -> Dict[str, List]:
         """Stochastic değerlerini hesapla
         
         Returns:
             Dict with 'stoch_k' and 'stoch_d' keys containing Stochastic values
         """
+        if self.backend == "numpy":
+            return self._calculate_numpy(klines, context)
+        
         n = len(klines)
         stoch_k_raw = [None] * n
         stoch_k_smooth = [None] * n
@@ -112,14 +645,23 @@ class StochasticOscillator(IIndicator):
         if n < self.period_k:
             return {"stoch_k": stoch_k_smooth, "stoch_d": stoch_d}
         
-        highs = [float(k[2]) for k in klines]
-        lows = [float(k[3]) for k in klines]
-        closes = [float(k[4]) for k in klines]
+        # Pencere extremumları tek geçişte (O(n))
+        if context is not None:
+            close_key, high_key, low_key = self.inputs()
+            closes = context.values(close_key)
+            period_highs = context.values(high_key)
+            period_lows = context.values(low_key)
+        else:
+            highs = _prices(klines, 2)
+            lows = _prices(klines, 3)
+            closes = _prices(klines, 4)
+            period_highs = rolling_max(highs, self.period_k)
+            period_lows = rolling_min(lows, self.period_k)
         
         # 1. Önce raw %K hesapla
         for i in range(self.period_k - 1, n):
-            period_high = max(highs[i - self.period_k + 1:i + 1])
-            period_low = min(lows[i - self.period_k + 1:i + 1])
+            period_high = period_highs[i]
+            period_low = period_lows[i]
             
             if period_high - period_low != 0:
                 stoch_k_raw[i] = 100 * ((closes[i] - period_low) / (period_high - period_low))
@@ -139,6 +681,71 @@ class StochasticOscillator(IIndicator):
                 stoch_d[i] = sum(valid_k) / self.smooth_d
         
         return {"stoch_k": stoch_k_smooth, "stoch_d": stoch_d}
+    
+    def _calculate_numpy(self, klines: List[List], context: Optional[IndicatorContext] = None) -> Dict[str, List]:
+        """Stochastic - array tabanlı hesaplama (rolling max/min + kayan SMA)"""
+        n = len(klines)
+        stoch_k_smooth = np.full(n, np.nan)
+        stoch_d = np.full(n, np.nan)
+        
+        if n < self.period_k:
+            return {"stoch_k": _to_list(stoch_k_smooth), "stoch_d": _to_list(stoch_d)}
+        
+        context = context if context is not None else IndicatorContext(klines)
+        close_key, high_key, low_key = self.inputs()
+        closes = context.array(close_key)
+        
+        # 1. Raw %K (period_k - 1 indeksinden itibaren geçerli)
+        period_high = context.array(high_key)[self.period_k - 1:]
+        period_low = context.array(low_key)[self.period_k - 1:]
+        price_range = period_high - period_low
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stoch_k_raw = np.where(
+                price_range != 0,
+                100 * ((closes[self.period_k - 1:] - period_low) / price_range),
+                50.0
+            )
+        
+        # 2. %K smooth (smooth_k periyotlu SMA)
+        k_smooth = _window_sum(stoch_k_raw, self.smooth_k) / self.smooth_k
+        k_start = self.period_k + self.smooth_k - 2
+        stoch_k_smooth[k_start:k_start + len(k_smooth)] = k_smooth
+        
+        # 3. %D (%K'nın smooth_d periyotlu SMA'sı)
+        d_values = _window_sum(k_smooth, self.smooth_d) / self.smooth_d
+        d_start = k_start + self.smooth_d - 1
+        stoch_d[d_start:d_start + len(d_values)] = d_values
+        
+        return {"stoch_k": _to_list(stoch_k_smooth), "stoch_d": _to_list(stoch_d)}
+    
+    def reset(self):
+        """Streaming state'i sıfırla"""
+        self._highest = RollingExtremum(self.period_k, "max")
+        self._lowest = RollingExtremum(self.period_k, "min")
+        self._k_sum = _RollingSum(self.smooth_k)
+        self._d_sum = _RollingSum(self.smooth_d)
+    
+    def update(self, candle: List) -> Dict[str, Optional[float]]:
+        """Yeni kapanmış mum ile %K/%D'yi güncelle (amortize O(1))"""
+        period_high = self._highest.push(float(candle[2]))
+        period_low = self._lowest.push(float(candle[3]))
+        if not self._highest.full:
+            return {"stoch_k": None, "stoch_d": None}
+        
+        close = float(candle[4])
+        if period_high - period_low != 0:
+            raw_k = 100 * ((close - period_low) / (period_high - period_low))
+        else:
+            raw_k = 50.0
+        
+        k_total = self._k_sum.push(raw_k)
+        if not self._k_sum.full:
+            return {"stoch_k": None, "stoch_d": None}
+        stoch_k = k_total / self.smooth_k
+        
+        d_total = self._d_sum.push(stoch_k)
+        stoch_d = d_total / self.smooth_d if self._d_sum.full else None
+        return {"stoch_k": stoch_k, "stoch_d": stoch_d}
 
 
 class RelativeStrengthIndex(IIndicator):
@@ -160,26 +767,38 @@ class RelativeStrengthIndex(IIndicator):
     - RSI < 15: Çok güçlü aşırı satım
     """
     
-    def __init__(self, length: int = 14):
+    def __init__(self, length: int = 14, backend: str = "python"):
         """
         Args:
             length: RSI hesaplama periyodu
+            backend: Hesaplama backend'i ("python" veya "numpy")
         """
         self.length = length
+        self.backend = _validate_backend(backend)
+        self.reset()
     
-    def calculate(self, klines: List[List]) -> Dict[str, List]:
+    def inputs(self) -> List[Tuple]:
+        return [("rsi", self.length)]
+    
+    def calculate(self, klines: List[List], context: Optional[IndicatorContext] = None) -> Dict[str, List]:
         """RSI değerlerini hesapla (Standart RSI - Basit Ortalama)
         
         Returns:
             Dict with 'rsi' key containing RSI values
         """
+        if context is not None:
+            # RSI serisi context düğümüdür (StochasticRSI ile paylaşılabilir)
+            return {"rsi": list(context.values(("rsi", self.length)))}
+        if self.backend == "numpy":
+            return self._calculate_numpy(klines)
+        
         n = len(klines)
         rsi_values = [None] * n
         
         if n < self.length + 1:
             return {"rsi": rsi_values}
         
-        closes = [float(k[4]) for k in klines]
+        closes = _prices(klines, 4)
         
         # RSI hesaplama için rolling window kullan
         for i in range(self.length, n):
@@ -210,6 +829,37 @@ class RelativeStrengthIndex(IIndicator):
                 rsi_values[i] = 100 - (100 / (1 + rs))
         
         return {"rsi": rsi_values}
+    
+    def _calculate_numpy(self, klines: List[List]) -> Dict[str, List]:
+        """RSI - array tabanlı hesaplama (kayan pencere toplamları)"""
+        return {"rsi": _to_list(_rsi_array(_column(klines, 4), self.length))}
+    
+    def reset(self):
+        """Streaming state'i sıfırla"""
+        self._prev_close = None
+        self._gains = _RollingSum(self.length)
+        self._losses = _RollingSum(self.length)
+    
+    def update(self, candle: List) -> Dict[str, Optional[float]]:
+        """Yeni kapanmış mum ile RSI'ı O(1) güncelle"""
+        close = float(candle[4])
+        prev_close = self._prev_close
+        self._prev_close = close
+        if prev_close is None:
+            return {"rsi": None}
+        
+        change = close - prev_close
+        gain_total = self._gains.push(change if change > 0 else 0.0)
+        loss_total = self._losses.push(0.0 if change > 0 else abs(change))
+        if not self._gains.full:
+            return {"rsi": None}
+        
+        avg_gain = gain_total / self.length
+        avg_loss = loss_total / self.length
+        if avg_loss == 0:
+            return {"rsi": 100.0}
+        rs = avg_gain / avg_loss
+        return {"rsi": 100 - (100 / (1 + rs))}
 
 
 class MACD(IIndicator):
@@ -245,28 +895,16 @@ class MACD(IIndicator):
         self.fast_length = fast_length
         self.slow_length = slow_length
         self.signal_length = signal_length
+        self.reset()
     
     def _calculate_ema(self, data: List[float], period: int) -> List[float]:
         """EMA hesapla"""
-        ema_values = [None] * len(data)
-        
-        if len(data) < period:
-            return ema_values
-        
-        # İlk EMA değeri SMA olarak başlar
-        sma = sum(data[:period]) / period
-        ema_values[period - 1] = sma
-        
-        # Smoothing faktörü
-        multiplier = 2 / (period + 1)
-        
-        # Sonraki EMA değerleri
-        for i in range(period, len(data)):
-            ema_values[i] = (data[i] - ema_values[i - 1]) * multiplier + ema_values[i - 1]
-        
-        return ema_values
+        return _ema(data, period)
     
-    def calculate(self, klines: List[List]) -> Dict[str, List]:
+    def inputs(self) -> List[Tuple]:
+        return [("ema", ("close",), self.fast_length), ("ema", ("close",), self.slow_length)]
+    
+    def calculate(self, klines: List[List], context: Optional[IndicatorContext] = None) -> Dict[str, List]:
         """MACD değerlerini hesapla
         
         Returns:
@@ -280,12 +918,15 @@ class MACD(IIndicator):
         if n < self.slow_length:
             return {"macd": macd_line, "signal": signal_line, "histogram": histogram}
         
-        # Close fiyatları (source)
-        closes = [float(k[4]) for k in klines]
-        
-        # Fast ve Slow EMA'ları hesapla
-        fast_ema = self._calculate_ema(closes, self.fast_length)
-        slow_ema = self._calculate_ema(closes, self.slow_length)
+        # Fast ve Slow EMA'ları hesapla (source: close)
+        if context is not None:
+            fast_key, slow_key = self.inputs()
+            fast_ema = context.values(fast_key)
+            slow_ema = context.values(slow_key)
+        else:
+            closes = _prices(klines, 4)
+            fast_ema = self._calculate_ema(closes, self.fast_length)
+            slow_ema = self._calculate_ema(closes, self.slow_length)
         
         # MACD Line = Fast EMA - Slow EMA
         for i in range(n):
@@ -320,6 +961,25 @@ class MACD(IIndicator):
             "signal": signal_line,
             "histogram": histogram
         }
+    
+    def reset(self):
+        """Streaming state'i sıfırla"""
+        self._fast_ema = _EmaState(self.fast_length)
+        self._slow_ema = _EmaState(self.slow_length)
+        self._signal_ema = _EmaState(self.signal_length)
+    
+    def update(self, candle: List) -> Dict[str, Optional[float]]:
+        """Yeni kapanmış mum ile MACD/Signal/Histogram'ı O(1) güncelle"""
+        close = float(candle[4])
+        fast = self._fast_ema.push(close)
+        slow = self._slow_ema.push(close)
+        if fast is None or slow is None:
+            return {"macd": None, "signal": None, "histogram": None}
+        
+        macd_value = fast - slow
+        signal_value = self._signal_ema.push(macd_value)
+        histogram_value = macd_value - signal_value if signal_value is not None else None
+        return {"macd": macd_value, "signal": signal_value, "histogram": histogram_value}
 
 
 class StochasticRSI(IIndicator):
@@ -348,7 +1008,8 @@ class StochasticRSI(IIndicator):
         length_rsi: int = 14, 
         length_stoch: int = 14, 
         smooth_k: int = 3, 
-        smooth_d: int = 3
+        smooth_d: int = 3,
+        backend: str = "python"
     ):
         """
         Args:
@@ -356,7 +1017,9 @@ class StochasticRSI(IIndicator):
             length_stoch: Stochastic hesaplama periyodu (RSI değerleri üzerinde)
             smooth_k: %K smooth periyodu
             smooth_d: %D smooth periyodu
+            backend: "python" veya "numpy"
         """
+        self.backend = _validate_backend(backend)
         self.length_rsi = length_rsi
         self.length_stoch = length_stoch
         self.smooth_k = smooth_k
@@ -364,6 +1027,7 @@ class StochasticRSI(IIndicator):
         
         # RSI hesaplayıcı
         self.rsi_calculator = RelativeStrengthIndex(length=length_rsi)
+        self.reset()
     
     def _smooth_values(self, values: List[float], period: int) -> List[float]:
         """Değerleri SMA ile smooth et"""
@@ -384,12 +1048,23 @@ class StochasticRSI(IIndicator):
         
         return smoothed
     
-    def calculate(self, klines: List[List]) -> Dict[str, List]:
+    def inputs(self) -> List[Tuple]:
+        rsi_key = ("rsi", self.length_rsi)
+        return [
+            rsi_key,
+            ("rolling_max", rsi_key, self.length_stoch),
+            ("rolling_min", rsi_key, self.length_stoch),
+        ]
+    
+    def calculate(self, klines: List[List], context: Optional[IndicatorContext] = None) -> Dict[str, List]:
         """Stochastic RSI değerlerini hesapla
         
         Returns:
             Dict with 'stoch_rsi_k', 'stoch_rsi_d' keys
         """
+        if self.backend == "numpy":
+            return self._calculate_numpy(klines, context)
+        
         n = len(klines)
         stoch_rsi_raw = [None] * n
         stoch_rsi_k = [None] * n
@@ -402,20 +1077,22 @@ class StochasticRSI(IIndicator):
             }
         
         # 1. RSI değerlerini hesapla
-        rsi_result = self.rsi_calculator.calculate(klines)
-        rsi_values = rsi_result["rsi"]
-        
         # 2. RSI değerleri üzerinde Stochastic hesapla
+        # Son length_stoch RSI değerinin max/min'i (None içeren pencereler None döner)
+        if context is not None:
+            rsi_key, max_key, min_key = self.inputs()
+            rsi_values = context.values(rsi_key)
+            rsi_maxs = context.values(max_key)
+            rsi_mins = context.values(min_key)
+        else:
+            rsi_values = self.rsi_calculator.calculate(klines)["rsi"]
+            rsi_maxs = rolling_max(rsi_values, self.length_stoch)
+            rsi_mins = rolling_min(rsi_values, self.length_stoch)
+        
         for i in range(self.length_stoch - 1, n):
-            # Son length_stoch kadar RSI değerini al
-            window_rsi = []
-            for j in range(i - self.length_stoch + 1, i + 1):
-                if rsi_values[j] is not None:
-                    window_rsi.append(rsi_values[j])
-            
-            if len(window_rsi) == self.length_stoch:
-                rsi_min = min(window_rsi)
-                rsi_max = max(window_rsi)
+            if rsi_maxs[i] is not None:
+                rsi_min = rsi_mins[i]
+                rsi_max = rsi_maxs[i]
                 
                 if rsi_max - rsi_min != 0:
                     # Stochastic formülü
@@ -433,6 +1110,61 @@ class StochasticRSI(IIndicator):
             "stoch_rsi_k": stoch_rsi_k,
             "stoch_rsi_d": stoch_rsi_d
         }
+    
+    def _calculate_numpy(self, klines: List[List], context: Optional[IndicatorContext] = None) -> Dict[str, List]:
+        """Stochastic RSI - array tabanlı hesaplama (RSI + rolling max/min + kayan SMA)"""
+        n = len(klines)
+        if n < self.length_rsi + self.length_stoch:
+            return {"stoch_rsi_k": [None] * n, "stoch_rsi_d": [None] * n}
+        
+        context = context if context is not None else IndicatorContext(klines)
+        rsi_key, max_key, min_key = self.inputs()
+        rsi_values = context.array(rsi_key)
+        rsi_max = context.array(max_key)
+        rsi_min = context.array(min_key)
+        
+        rsi_range = rsi_max - rsi_min
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Flat durumda ortada tut (50); NaN pencereler NaN kalır
+            stoch_rsi_raw = np.where(rsi_range != 0, ((rsi_values - rsi_min) / rsi_range) * 100, 50.0)
+        stoch_rsi_raw[np.isnan(rsi_range)] = np.nan
+        
+        stoch_rsi_k = _sma_array(stoch_rsi_raw, self.smooth_k)
+        stoch_rsi_d = _sma_array(stoch_rsi_k, self.smooth_d)
+        return {"stoch_rsi_k": _to_list(stoch_rsi_k), "stoch_rsi_d": _to_list(stoch_rsi_d)}
+    
+    def reset(self):
+        """Streaming state'i sıfırla"""
+        self.rsi_calculator.reset()
+        self._rsi_max = RollingExtremum(self.length_stoch, "max")
+        self._rsi_min = RollingExtremum(self.length_stoch, "min")
+        self._k_sum = _RollingSum(self.smooth_k)
+        self._d_sum = _RollingSum(self.smooth_d)
+    
+    def update(self, candle: List) -> Dict[str, Optional[float]]:
+        """Yeni kapanmış mum ile Stochastic RSI %K/%D'yi güncelle (amortize O(1))"""
+        rsi_value = self.rsi_calculator.update(candle)["rsi"]
+        if rsi_value is None:
+            return {"stoch_rsi_k": None, "stoch_rsi_d": None}
+        
+        rsi_max = self._rsi_max.push(rsi_value)
+        rsi_min = self._rsi_min.push(rsi_value)
+        if not self._rsi_max.full:
+            return {"stoch_rsi_k": None, "stoch_rsi_d": None}
+        
+        if rsi_max - rsi_min != 0:
+            raw = ((rsi_value - rsi_min) / (rsi_max - rsi_min)) * 100
+        else:
+            raw = 50.0
+        
+        k_total = self._k_sum.push(raw)
+        if not self._k_sum.full:
+            return {"stoch_rsi_k": None, "stoch_rsi_d": None}
+        stoch_rsi_k = k_total / self.smooth_k
+        
+        d_total = self._d_sum.push(stoch_rsi_k)
+        stoch_rsi_d = d_total / self.smooth_d if self._d_sum.full else None
+        return {"stoch_rsi_k": stoch_rsi_k, "stoch_rsi_d": stoch_rsi_d}
 
 
 class WilliamsR(IIndicator):
@@ -453,37 +1185,55 @@ class WilliamsR(IIndicator):
     Not: Williams %R değerleri negatiftir (-100 ile 0 arası)
     """
     
-    def __init__(self, length: int = 14):
+    def __init__(self, length: int = 14, backend: str = "python"):
         """
         Args:
             length: Williams %R hesaplama periyodu (varsayılan: 14)
+            backend: Hesaplama backend'i ("python" veya "numpy")
         """
         self.length = length
+        self.backend = _validate_backend(backend)
+        self.reset()
+    
+    def inputs(self) -> List[Tuple]:
+        return [
+            ("close",),
+            ("rolling_max", ("high",), self.length),
+            ("rolling_min", ("low",), self.length),
+        ]
     
-    def calculate(self, klines: List[List]) -> Dict[str, List]:
+    def calculate(self, klines: List[List], context: Optional[IndicatorContext] = None) -> Dict[str, List]:
         """Williams %R değerlerini hesapla
         
         Returns:
             Dict with 'williams_r' key containing Williams %R values
         """
+        if self.backend == "numpy":
+            return self._calculate_numpy(klines, context)
+        
         n = len(klines)
         williams_r_values = [None] * n
         
         if n < self.length:
             return {"williams_r": williams_r_values}
         
-        # High, Low, Close fiyatlarını al
-        highs = [float(k[2]) for k in klines]    # High fiyatları (index 2)
-        lows = [float(k[3]) for k in klines]     # Low fiyatları (index 3)
-        closes = [float(k[4]) for k in klines]   # Close fiyatları (index 4)
+        # Son 'length' periyot için highest high ve lowest low (tek geçişte O(n))
+        if context is not None:
+            close_key, high_key, low_key = self.inputs()
+            closes = context.values(close_key)
+            highest_highs = context.values(high_key)
+            lowest_lows = context.values(low_key)
+        else:
+            # High, Low, Close fiyatlarını al
+            highs = _prices(klines, 2)    # High fiyatları (index 2)
+            lows = _prices(klines, 3)     # Low fiyatları (index 3)
+            closes = _prices(klines, 4)   # Close fiyatları (index 4)
+            highest_highs = rolling_max(highs, self.length)
+            lowest_lows = rolling_min(lows, self.length)
         
         for i in range(self.length - 1, n):
-            # Son 'length' periyot için highest high ve lowest low bul
-            period_highs = highs[i - self.length + 1:i + 1]
-            period_lows = lows[i - self.length + 1:i + 1]
-            
-            highest_high = max(period_highs)
-            lowest_low = min(period_lows)
+            highest_high = highest_highs[i]
+            lowest_low = lowest_lows[i]
             current_close = closes[i]
             
             # Williams %R hesapla
@@ -494,6 +1244,47 @@ class WilliamsR(IIndicator):
                 williams_r_values[i] = -50.0  # Orta değer ata
         
         return {"williams_r": williams_r_values}
+    
+    def _calculate_numpy(self, klines: List[List], context: Optional[IndicatorContext] = None) -> Dict[str, List]:
+        """Williams %R - array tabanlı hesaplama (rolling max/min)"""
+        n = len(klines)
+        williams_r_values = np.full(n, np.nan)
+        
+        if n < self.length:
+            return {"williams_r": _to_list(williams_r_values)}
+        
+        context = context if context is not None else IndicatorContext(klines)
+        close_key, high_key, low_key = self.inputs()
+        highest_high = context.array(high_key)[self.length - 1:]
+        lowest_low = context.array(low_key)[self.length - 1:]
+        current_close = context.array(close_key)[self.length - 1:]
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            williams_r = np.where(
+                highest_high != lowest_low,
+                ((highest_high - current_close) / (highest_high - lowest_low)) * -100,
+                -50.0
+            )
+        williams_r_values[self.length - 1:] = williams_r
+        
+        return {"williams_r": _to_list(williams_r_values)}
+    
+    def reset(self):
+        """Streaming state'i sıfırla"""
+        self._highest = RollingExtremum(self.length, "max")
+        self._lowest = RollingExtremum(self.length, "min")
+    
+    def update(self, candle: List) -> Dict[str, Optional[float]]:
+        """Yeni kapanmış mum ile Williams %R'yi güncelle (amortize O(1))"""
+        highest_high = self._highest.push(float(candle[2]))
+        lowest_low = self._lowest.push(float(candle[3]))
+        if not self._highest.full:
+            return {"williams_r": None}
+        
+        current_close = float(candle[4])
+        if highest_high != lowest_low:
+            return {"williams_r": ((highest_high - current_close) / (highest_high - lowest_low)) * -100}
+        return {"williams_r": -50.0}
 
 
 class FisherTransform(IIndicator):
@@ -525,8 +1316,16 @@ class FisherTransform(IIndicator):
             length: Fisher Transform hesaplama periyodu (varsayılan: 10)
         """
         self.length = length
+        self.reset()
+    
+    def inputs(self) -> List[Tuple]:
+        return [
+            ("median",),
+            ("rolling_max", ("median",), self.length),
+            ("rolling_min", ("median",), self.length),
+        ]
     
-    def calculate(self, klines: List[List]) -> Dict[str, List]:
+    def calculate(self, klines: List[List], context: Optional[IndicatorContext] = None) -> Dict[str, List]:
         """Fisher Transform değerlerini hesapla
         
         Returns:
@@ -541,21 +1340,24 @@ class FisherTransform(IIndicator):
         if n < self.length:
             return {"fisher": fisher_values, "trigger": trigger_values}
         
-        # High, Low fiyatlarını al
-        highs = [float(k[2]) for k in klines]    # High fiyatları (index 2)
-        lows = [float(k[3]) for k in klines]     # Low fiyatları (index 3)
-        
         # Value1 = (High + Low) / 2 (típical price)
-        value1 = [(highs[i] + lows[i]) / 2 for i in range(n)]
+        # MinL ve MaxH (son 'length' periyot için, tek geçişte O(n))
+        if context is not None:
+            median_key, max_key, min_key = self.inputs()
+            value1 = context.values(median_key)
+            max_values = context.values(max_key)
+            min_values = context.values(min_key)
+        else:
+            value1 = _median_prices(klines)
+            min_values = rolling_min(value1, self.length)
+            max_values = rolling_max(value1, self.length)
         
         # Value3 için smoothing değişkeni
         value3_prev = 0.0
         
         for i in range(self.length - 1, n):
-            # MinL ve MaxH hesapla (son 'length' periyot için)
-            period_values = value1[i - self.length + 1:i + 1]
-            min_l = min(period_values)
-            max_h = max(period_values)
+            min_l = min_values[i]
+            max_h = max_values[i]
             
             # Value2 hesapla
             if max_h != min_l:  # Sıfıra bölme kontrolü
@@ -592,6 +1394,46 @@ class FisherTransform(IIndicator):
             value3_prev = value3
         
         return {"fisher": fisher_values, "trigger": trigger_values}
+    
+    def reset(self):
+        """Streaming state'i sıfırla"""
+        self._max_h = RollingExtremum(self.length, "max")
+        self._min_l = RollingExtremum(self.length, "min")
+        self._value3_prev = None
+        self._fisher_prev = None
+    
+    def update(self, candle: List) -> Dict[str, Optional[float]]:
+        """Yeni kapanmış mum ile Fisher/Trigger'ı güncelle (amortize O(1))"""
+        import math
+        
+        value1 = (float(candle[2]) + float(candle[3])) / 2
+        max_h = self._max_h.push(value1)
+        min_l = self._min_l.push(value1)
+        if not self._max_h.full:
+            return {"fisher": None, "trigger": None}
+        
+        if max_h != min_l:
+            value2 = 2 * ((value1 - min_l) / (max_h - min_l) - 0.5)
+        else:
+            value2 = 0.0
+        value2 = max(-0.999, min(0.999, value2))
+        
+        # İlk değer: value3 = value2, trigger = fisher
+        if self._value3_prev is None:
+            value3 = value2
+        else:
+            value3 = 0.33 * value2 + 0.67 * self._value3_prev
+        value3 = max(-0.999, min(0.999, value3))
+        
+        try:
+            fisher = 0.5 * math.log((1 + value3) / (1 - value3))
+        except (ValueError, ZeroDivisionError):
+            fisher = 0.0
+        
+        trigger = self._fisher_prev if self._fisher_prev is not None else fisher
+        self._value3_prev = value3
+        self._fisher_prev = fisher
+        return {"fisher": fisher, "trigger": trigger}
 
 
 class CoralTrend(IIndicator):
@@ -624,8 +1466,12 @@ class CoralTrend(IIndicator):
         """
         self.period = period
         self.multiplier = multiplier
+        self.reset()
+    
+    def inputs(self) -> List[Tuple]:
+        return [("high",), ("low",), ("close",), ("median",)]
     
-    def calculate(self, klines: List[List]) -> Dict[str, List]:
+    def calculate(self, klines: List[List], context: Optional[IndicatorContext] = None) -> Dict[str, List]:
         """Coral Trend değerlerini hesapla
         
         Returns:
@@ -638,10 +1484,14 @@ class CoralTrend(IIndicator):
         if n < self.period + 1:
             return {"coral": coral_values, "trend": trend_values}
         
-        # High, Low, Close fiyatlarını al
-        highs = [float(k[2]) for k in klines]    # High fiyatları (index 2)
-        lows = [float(k[3]) for k in klines]     # Low fiyatları (index 3)
-        closes = [float(k[4]) for k in klines]   # Close fiyatları (index 4)
+        # High, Low, Close ve median fiyatlarını al
+        if context is not None:
+            highs, lows, closes, medians = [context.values(key) for key in self.inputs()]
+        else:
+            highs = _prices(klines, 2)    # High fiyatları (index 2)
+            lows = _prices(klines, 3)     # Low fiyatları (index 3)
+            closes = _prices(klines, 4)   # Close fiyatları (index 4)
+            medians = _median_prices(klines)
         
         # True Range hesapla
         true_ranges = [0.0] * n
@@ -668,7 +1518,7 @@ class CoralTrend(IIndicator):
         
         for i in range(self.period, n):
             # i1 = (High + Low) / 2 (median price)
-            i1 = (highs[i] + lows[i]) / 2
+            i1 = medians[i]
             
             # i2 = ATR
             i2 = atr_values[i]
@@ -711,3 +1561,61 @@ class CoralTrend(IIndicator):
             ema2_prev = coral
         
         return {"coral": coral_values, "trend": trend_values}
+    
+    def reset(self):
+        """Streaming state'i sıfırla"""
+        self._index = 0
+        self._prev_close = None
+        self._true_ranges = []  # İlk ATR (SMA) için biriken true range'ler
+        self._atr = None
+        self._ema1_prev = None
+        self._ema2_prev = None
+    
+    def update(self, candle: List) -> Dict[str, Optional[float]]:
+        """Yeni kapanmış mum ile Coral/Trend'i O(1) güncelle"""
+        high = float(candle[2])
+        low = float(candle[3])
+        close = float(candle[4])
+        index = self._index
+        self._index += 1
+        prev_close = self._prev_close
+        self._prev_close = close
+        if prev_close is None:
+            return {"coral": None, "trend": None}
+        
+        true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        alpha = 2.0 / (self.period + 1)
+        
+        # ATR: İlk değer basit ortalama, sonrası EMA
+        if index < self.period:
+            self._true_ranges.append(true_range)
+            return {"coral": None, "trend": None}
+        if index == self.period:
+            self._true_ranges.append(true_range)
+            self._atr = sum(self._true_ranges) / self.period
+            self._true_ranges = []
+        else:
+            self._atr = alpha * true_range + (1 - alpha) * self._atr
+        
+        i1 = (high + low) / 2
+        i3 = i1 + (self._atr * self.multiplier)
+        i4 = i1 - (self._atr * self.multiplier)
+        
+        if index == self.period:
+            i5 = i1
+            coral = i1
+        else:
+            i5 = alpha * i1 + (1 - alpha) * self._ema1_prev
+            i6 = i3 if i5 > self._ema1_prev else i4
+            coral = alpha * i6 + (1 - alpha) * self._ema2_prev
+        
+        if close > coral:
+            trend = 1
+        elif close < coral:
+            trend = -1
+        else:
+            trend = 0
+        
+        self._ema1_prev = i5
+        self._ema2_prev = coral
+        return {"coral": coral, "trend": trend}
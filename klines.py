@@ -0,0 +1,185 @@
+"""
+Kolon Tabanlı Mum Konteyneri (KlineFrame)
+"""
+from typing import Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+# Eski List[List] formatındaki kolon indeksleri
+# [open_time, open, high, low, close, volume, close_time, quote_volume, trades, taker_base, taker_quote]
+OPEN_TIME = 0
+OPEN = 1
+HIGH = 2
+LOW = 3
+CLOSE = 4
+VOLUME = 5
+CLOSE_TIME = 6
+ROW_WIDTH = 11
+
+
+class KlineFrame:
+    """Mum verisini kolon bazında, ardışık numpy array'lerde tutar
+
+    Kolonlar:
+    - open_time, close_time: int64 (ms)
+    - open, high, low, close, volume: float64
+
+    Türetilmiş kolonlar (median = (H+L)/2, typical = (H+L+C)/3) ilk erişimde
+    bir kez hesaplanır ve cache'lenir.
+
+    Geriye dönük uyumluluk: ``frame[i]`` eski 11 elemanlı satırı (list) döndürür,
+    böylece ``klines[-1][6]`` veya ``k[4]`` kullanan kod değişmeden çalışır.
+    Slice (``frame[10:]``) kopya değil, aynı array'ler üzerinde view döndürür.
+    """
+
+    __slots__ = (
+        "open_time", "open", "high", "low", "close", "volume", "close_time",
+        "_median", "_typical"
+    )
+
+    def __init__(
+        self,
+        open_time: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: Optional[np.ndarray] = None,
+        close_time: Optional[np.ndarray] = None,
+        interval_ms: Optional[int] = None,
+    ):
+        """
+        Args:
+            open_time: Mum açılış zamanları (ms)
+            open, high, low, close: Fiyat kolonları
+            volume: Hacim kolonu (yoksa sıfır)
+            close_time: Mum kapanış zamanları (ms) - verilmezse open_time + interval_ms
+            interval_ms: Timeframe süresi (close_time türetmek için)
+        """
+        self.open_time = np.asarray(open_time, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        n = len(self.open_time)
+        if volume is None:
+            volume = np.zeros(n, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        if close_time is None:
+            if interval_ms is None:
+                raise ValueError("close_time or interval_ms is required")
+            close_time = self.open_time + interval_ms
+        self.close_time = np.asarray(close_time, dtype=np.int64)
+        self._median = None
+        self._typical = None
+
+        for name in ("open", "high", "low", "close", "volume", "close_time"):
+            if len(getattr(self, name)) != n:
+                raise ValueError(f"Column length mismatch: {name}")
+
+    @classmethod
+    def empty(cls) -> "KlineFrame":
+        """Boş frame"""
+        return cls(
+            np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), np.empty(0), np.empty(0),
+            close_time=np.empty(0, dtype=np.int64)
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence]) -> "KlineFrame":
+        """Eski List[List] formatından frame oluştur"""
+        if not rows:
+            return cls.empty()
+        return cls(
+            open_time=[int(r[OPEN_TIME]) for r in rows],
+            open=[float(r[OPEN]) for r in rows],
+            high=[float(r[HIGH]) for r in rows],
+            low=[float(r[LOW]) for r in rows],
+            close=[float(r[CLOSE]) for r in rows],
+            volume=[float(r[VOLUME]) for r in rows],
+            close_time=[int(r[CLOSE_TIME]) for r in rows],
+        )
+
+    @property
+    def median(self) -> np.ndarray:
+        """Median price (High + Low) / 2 - cache'li"""
+        if self._median is None:
+            self._median = (self.high + self.low) / 2
+        return self._median
+
+    @property
+    def typical(self) -> np.ndarray:
+        """Typical price (High + Low + Close) / 3 - cache'li"""
+        if self._typical is None:
+            self._typical = (self.high + self.low + self.close) / 3
+        return self._typical
+
+    def column(self, index: int) -> np.ndarray:
+        """Eski satır indeksine karşılık gelen kolonu döndür (kopya yok)"""
+        columns = {
+            OPEN_TIME: self.open_time,
+            OPEN: self.open,
+            HIGH: self.high,
+            LOW: self.low,
+            CLOSE: self.close,
+            VOLUME: self.volume,
+            CLOSE_TIME: self.close_time,
+        }
+        if index in columns:
+            return columns[index]
+        if 0 <= index < ROW_WIDTH:
+            # Twelve Data'da olmayan kolonlar (quote volume, trades, taker...) sıfır
+            return np.zeros(len(self), dtype=np.float64)
+        raise IndexError(f"Kline column index out of range: {index}")
+
+    def row(self, i: int) -> List:
+        """Tek mumu eski formatta (11 elemanlı list) döndür"""
+        return [
+            int(self.open_time[i]),
+            float(self.open[i]),
+            float(self.high[i]),
+            float(self.low[i]),
+            float(self.close[i]),
+            float(self.volume[i]),
+            int(self.close_time[i]),
+            0,  # quote_asset_volume
+            0,  # number_of_trades
+            0,  # taker_buy_base
+            0   # taker_buy_quote
+        ]
+
+    def to_rows(self) -> List[List]:
+        """Tüm frame'i eski List[List] formatına çevir"""
+        return [self.row(i) for i in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+    def __getitem__(self, key: Union[int, slice]):
+        if isinstance(key, slice):
+            return KlineFrame(
+                self.open_time[key], self.open[key], self.high[key], self.low[key],
+                self.close[key], self.volume[key], self.close_time[key]
+            )
+        n = len(self)
+        if key < 0:
+            key += n
+        if not 0 <= key < n:
+            raise IndexError("KlineFrame index out of range")
+        return self.row(key)
+
+    def __iter__(self) -> Iterator[List]:
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def __repr__(self) -> str:
+        return f"KlineFrame(len={len(self)})"
+
+
+def as_kline_frame(klines: Union[KlineFrame, Sequence[Sequence], None]) -> KlineFrame:
+    """KlineFrame veya List[List] girdiyi KlineFrame'e çevir (frame ise aynen döner)"""
+    if isinstance(klines, KlineFrame):
+        return klines
+    if not klines:
+        return KlineFrame.empty()
+    return KlineFrame.from_rows(klines)
@@ -6,6 +6,7 @@ Sinyaller Telegram üzerinden gönderilir.
 """
 import asyncio
 import logging
+from typing import Callable, Optional, Sequence
 from config import (
     TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TARGET_SYMBOL, TIMEFRAMES,
     CMO_LENGTH, TWELVE_DATA_API_KEYS,
@@ -13,25 +14,109 @@ from config import (
     RSI_LENGTH,
     MACD_FAST_LENGTH, MACD_SLOW_LENGTH, MACD_SIGNAL_LENGTH,
     STOCH_RSI_LENGTH_RSI, STOCH_RSI_LENGTH_STOCH, STOCH_RSI_SMOOTH_K, STOCH_RSI_SMOOTH_D,
-    WILLIAMS_R_LENGTH, FISHER_LENGTH, CORAL_PERIOD, CORAL_MULTIPLIER
+    WILLIAMS_R_LENGTH, FISHER_LENGTH, CORAL_PERIOD, CORAL_MULTIPLIER,
+    INDICATOR_BACKEND, CANDLE_STORE_PATH, CANDLE_STORE_MAX_ROWS, RESAMPLE_TIMEFRAMES,
+    STREAMING_ENABLED, STREAM_CLOSE_GRACE_MS, HEDGE_REQUESTS_ENABLED
 )
-from core import TwelveDataClient, TimeframeScheduler, SignalTracker, TelegramNotifier
+from candle_store import CandleStore
+from core import ExchangeClient, ApiKeyScheduler, TwelveDataClient, TimeframeScheduler, SignalTracker, TelegramNotifier, RequestBudgetPlanner
+from failover import FailoverClient
+from resampler import ResamplingClient
+from streaming import StreamingClient
 from indicators import ChandeMomentumOscillator, StochasticOscillator, RelativeStrengthIndex, MACD, StochasticRSI, WilliamsR, FisherTransform, CoralTrend
 from strategies import MajorityVoteStrategy
 from analyzer import CryptoAnalyzer
 
-# Logging konfigürasyonu
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("cmo_bot_xauusd.log")
-    ]
-)
 logger = logging.getLogger(__name__)
 
 
+async def initialize_scheduler(scheduler: TimeframeScheduler, exchange: ExchangeClient,
+                               timeframes: Sequence[str] = TIMEFRAMES, symbol: str = TARGET_SYMBOL):
+    """Tüm timeframe'ler için aktif mumun kapanış zamanını al"""
+    logger.info("Initializing scheduler for all timeframes...")
+    for timeframe in timeframes:
+        await scheduler.initialize(symbol, timeframe, exchange)
+    logger.info("Scheduler initialization completed")
+
+
+async def run_loop(
+    exchange: ExchangeClient,
+    analyzer: CryptoAnalyzer,
+    scheduler: TimeframeScheduler,
+    planner: Optional[RequestBudgetPlanner] = None,
+    timeframes: Sequence[str] = TIMEFRAMES,
+    should_stop: Optional[Callable[[], bool]] = None,
+):
+    """Analiz döngüsü - mum kapanışlarını bekle, hazır timeframe'leri analiz et
+
+    Bekleme scheduler'ın deadline heap'iyle (``loop.call_at``) yapılır; push eden
+    client'larda ``exchange.wait_for_update`` ikinci tetikleyicidir (StreamingClient mum
+    kapanınca uyandırır, replay.py'deki ReplayExchangeClient sanal saati ileri alır).
+    ``should_stop`` True dönünce döngü biter (canlıda verilmez).
+    """
+    while should_stop is None or not should_stop():
+        # Günlük bütçeyi kontrol et (gerekirse düşük öncelikli timeframe'ler kısılır)
+        if planner is not None:
+            planner.update()
+
+        # Mumu kapanan timeframe'ler (deadline heap'inden, tarama yok)
+        ready_timeframes = []
+        for timeframe in scheduler.due_timeframes():
+            if timeframe in timeframes:
+                if planner is not None and not planner.should_poll(timeframe, scheduler.next_candle_close[timeframe]):
+                    scheduler.skip_candle(timeframe)
+                    logger.info(f"Candle closed for {timeframe}, skipped by request budget")
+                    continue
+                ready_timeframes.append(timeframe)
+                logger.info(f"Candle closed for {timeframe}")
+
+        # Hazır timeframe'ler varsa analiz et
+        if ready_timeframes:
+            logger.info(f"Analyzing timeframes: {ready_timeframes}")
+
+            # Kısa ve uzun vadeli timeframe'leri ayır
+            short_term = [tf for tf in ready_timeframes if tf in ["1m", "5m", "15m", "1h"]]
+            long_term = [tf for tf in ready_timeframes if tf in ["4h"]]
+
+            # Kısa ve uzun vadeli analiz eşzamanlı (istekler client'taki rate limiter ile sıraya girer)
+            batches = []
+            if short_term:
+                batches.append(analyzer.analyze_short_term_batch(short_term))
+            if long_term:
+                batches.append(analyzer.analyze_long_term_batch(long_term))
+
+            for successfully_analyzed in await asyncio.gather(*batches):
+                for timeframe in successfully_analyzed:
+                    scheduler.mark_analyzed(timeframe)
+                    logger.debug(f"Marked {timeframe} as analyzed")
+
+        # En yakın mum kapanışına kadar bekle (streaming'de mum kapanınca hemen uyanır)
+        wait_time = scheduler.get_next_check_time()
+        logger.debug(f"Next check in {wait_time:.1f} seconds")
+        await wait_next(exchange, scheduler, wait_time)
+
+
+async def wait_next(exchange: ExchangeClient, scheduler: TimeframeScheduler, wait_time: float):
+    """Deadline timer'ı ile (varsa) exchange'in veri olayından hangisi önce gelirse
+
+    Deadline varken timer ona kurulur (timeout verilmez, daha erken deadline
+    planlanırsa yeniden kurulur); heap boşsa wait_time kadar beklenir.
+    """
+    timeout = wait_time if scheduler.deadlines.next_due() is None else None
+    if not exchange.pushes_updates:
+        await scheduler.deadlines.wait(timeout)
+        return
+
+    timer = asyncio.create_task(scheduler.deadlines.wait(timeout))
+    update = asyncio.create_task(exchange.wait_for_update(wait_time))
+    try:
+        await asyncio.wait((timer, update), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (timer, update):
+            task.cancel()
+        await asyncio.gather(timer, update, return_exceptions=True)
+
+
 async def main():
     """Ana fonksiyon - Botu başlatır ve sürekli döngüde çalıştırır"""
 
@@ -44,23 +129,47 @@ async def main():
         logger.error("No Twelve Data API keys found in .env file")
         return
 
+    # Kalıcı mum deposu - sadece eksik mumlar indirilir
+    store = CandleStore(CANDLE_STORE_PATH, max_rows=CANDLE_STORE_MAX_ROWS) if CANDLE_STORE_PATH else None
+
+    # Hedged istekler: yavaş yanıtta ikinci istek diğer key'lerle gönderilir, ilk dönen kullanılır.
+    # Key'ler ikiye bölünür (kota takibi ve depo ortak) - hedge yavaş key'e ikinci kredi harcamaz
+    hedging = HEDGE_REQUESTS_ENABLED and len(TWELVE_DATA_API_KEYS) > 1
+    primary_keys = TWELVE_DATA_API_KEYS[0::2] if hedging else TWELVE_DATA_API_KEYS
+    key_scheduler = ApiKeyScheduler(TWELVE_DATA_API_KEYS)
+
     # Twelve Data Client oluştur - Multiple API keys ile
-    exchange = TwelveDataClient(api_keys=TWELVE_DATA_API_KEYS)
+    twelve_data = TwelveDataClient(api_keys=primary_keys, store=store, key_scheduler=key_scheduler)
     logger.info(f"Twelve Data client initialized with {len(TWELVE_DATA_API_KEYS)} API key(s)")
-    logger.info(f"Total daily capacity: {len(TWELVE_DATA_API_KEYS) * 800} requests/day")
+    logger.info(f"Total daily capacity: {twelve_data.key_scheduler.total_capacity()} requests/day")
+
+    source = twelve_data
+    if hedging:
+        hedge = TwelveDataClient(api_keys=TWELVE_DATA_API_KEYS[1::2], store=store, key_scheduler=key_scheduler)
+        source = FailoverClient({"twelve_data": twelve_data, "twelve_data_hedge": hedge})
+
+    # Streaming: 1m mumlar WebSocket fiyat akışından yerelde oluşturulur (REST sadece geçmiş için)
+    if STREAMING_ENABLED:
+        source = StreamingClient(TWELVE_DATA_API_KEYS[0], [TARGET_SYMBOL], history_client=source)
+        await source.start()
+
+    # Üst timeframe'leri ortak 1m serisinden türet (bütçe aşılırsa planlayıcı yenilerini ekler)
+    exchange = ResamplingClient(source, timeframes=RESAMPLE_TIMEFRAMES, store=store)
 
     # İndikatörler oluştur
-    cmo_indicator = ChandeMomentumOscillator(length=CMO_LENGTH, use_low=True)
+    logger.info(f"Indicator backend: {INDICATOR_BACKEND}")
+    cmo_indicator = ChandeMomentumOscillator(length=CMO_LENGTH, use_low=True, backend=INDICATOR_BACKEND)
     logger.info(f"CMO Indicator initialized with length={CMO_LENGTH}, use_low=True")
     
     stoch_indicator = StochasticOscillator(
         period_k=STOCH_PERIOD_K,
         smooth_k=STOCH_SMOOTH_K,
-        smooth_d=STOCH_SMOOTH_D
+        smooth_d=STOCH_SMOOTH_D,
+        backend=INDICATOR_BACKEND
     )
     logger.info(f"Stochastic Indicator initialized with K={STOCH_PERIOD_K}, smoothK={STOCH_SMOOTH_K}, smoothD={STOCH_SMOOTH_D}")
     
-    rsi_indicator = RelativeStrengthIndex(length=RSI_LENGTH)
+    rsi_indicator = RelativeStrengthIndex(length=RSI_LENGTH, backend=INDICATOR_BACKEND)
     logger.info(f"RSI Indicator initialized with length={RSI_LENGTH}")
     
     macd_indicator = MACD(
@@ -74,11 +183,12 @@ async def main():
         length_rsi=STOCH_RSI_LENGTH_RSI,
         length_stoch=STOCH_RSI_LENGTH_STOCH,
         smooth_k=STOCH_RSI_SMOOTH_K,
-        smooth_d=STOCH_RSI_SMOOTH_D
+        smooth_d=STOCH_RSI_SMOOTH_D,
+        backend=INDICATOR_BACKEND
     )
     logger.info(f"Stochastic RSI Indicator initialized with lengthRSI={STOCH_RSI_LENGTH_RSI}, lengthStoch={STOCH_RSI_LENGTH_STOCH}, smoothK={STOCH_RSI_SMOOTH_K}, smoothD={STOCH_RSI_SMOOTH_D}")
     
-    williams_r_indicator = WilliamsR(length=WILLIAMS_R_LENGTH)
+    williams_r_indicator = WilliamsR(length=WILLIAMS_R_LENGTH, backend=INDICATOR_BACKEND)
     logger.info(f"Williams %R Indicator initialized with length={WILLIAMS_R_LENGTH}")
     
     fisher_indicator = FisherTransform(length=FISHER_LENGTH)
@@ -101,7 +211,8 @@ async def main():
 
     tracker = SignalTracker()
     notifier = TelegramNotifier(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
-    scheduler = TimeframeScheduler()
+    scheduler = TimeframeScheduler(close_buffer_ms=STREAM_CLOSE_GRACE_MS) if STREAMING_ENABLED else TimeframeScheduler()
+    planner = RequestBudgetPlanner(TIMEFRAMES, twelve_data.key_scheduler, scheduler, resampler=exchange)
 
     # Ana analyzer'ı oluştur (Dependency Injection)
     analyzer = CryptoAnalyzer(
@@ -115,11 +226,7 @@ async def main():
     )
 
     try:
-        # Scheduler'ı başlat - Tüm timeframe'ler
-        logger.info("Initializing scheduler for all timeframes...")
-        for timeframe in TIMEFRAMES:
-            await scheduler.initialize(TARGET_SYMBOL, timeframe, exchange)
-        logger.info("Scheduler initialization completed")
+        await initialize_scheduler(scheduler, exchange)
 
         # Başlangıç mesajı gönder
         from datetime import datetime
@@ -140,40 +247,7 @@ async def main():
         logger.info("Startup message sent to Telegram")
 
         # Sonsuz analiz döngüsü - her timeframe için mum kapanışlarını kontrol et
-        while True:
-            # Tüm timeframe'leri kontrol et
-            ready_timeframes = []
-            for timeframe in TIMEFRAMES:
-                if scheduler.should_analyze(timeframe):
-                    ready_timeframes.append(timeframe)
-                    logger.info(f"Candle closed for {timeframe}")
-
-            # Hazır timeframe'ler varsa analiz et
-            if ready_timeframes:
-                logger.info(f"Analyzing timeframes: {ready_timeframes}")
-                
-                # Kısa ve uzun vadeli timeframe'leri ayır
-                short_term = [tf for tf in ready_timeframes if tf in ["1m", "5m", "15m", "1h"]]
-                long_term = [tf for tf in ready_timeframes if tf in ["4h"]]
-                
-                # Kısa vadeli analiz
-                if short_term:
-                    successfully_analyzed = await analyzer.analyze_short_term_batch(short_term)
-                    for timeframe in successfully_analyzed:
-                        scheduler.mark_analyzed(timeframe)
-                        logger.debug(f"Marked {timeframe} as analyzed")
-                
-                # Uzun vadeli analiz
-                if long_term:
-                    successfully_analyzed = await analyzer.analyze_long_term_batch(long_term)
-                    for timeframe in successfully_analyzed:
-                        scheduler.mark_analyzed(timeframe)
-                        logger.debug(f"Marked {timeframe} as analyzed")
-
-            # En yakın mum kapanışına kadar bekle
-            wait_time = scheduler.get_next_check_time()
-            logger.debug(f"Next check in {wait_time:.1f} seconds")
-            await asyncio.sleep(wait_time)
+        await run_loop(exchange, analyzer, scheduler, planner)
 
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
@@ -183,7 +257,18 @@ async def main():
     finally:
         await exchange.close()
         await notifier.close()
+        if store is not None:
+            store.close()
 
 
 if __name__ == "__main__":
+    # Logging konfigürasyonu (replay.py main'i import ettiğinde log dosyası açılmaz)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler("cmo_bot_xauusd.log")
+        ]
+    )
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Parametre Optimizasyonu - config.py strateji parametreleri için grid / random search
+
+Her parametre kombinasyonu backtest.py'deki vektörel simülasyonla değerlendirilir.
+Kombinasyonlar process pool'a dağıtılır; her worker process şunları cache'ler:
+
+- Timeframe başına tek IndicatorContext (RSI serisi, rolling max/min, EMA gibi ara sonuçlar)
+- İndikatör çıktıları (indikatörün uzunluk parametreleri anahtarıyla)
+- Oy serileri (uzunluk + eşik parametreleri anahtarıyla)
+
+Böylece örneğin yalnızca RSI_OVERBOUGHT değişen kombinasyonlar indikatörleri yeniden
+hesaplamaz, MINIMUM_VOTE_THRESHOLD değişimi yalnızca final_signals'i tekrarlar.
+
+Walk-forward (--folds N): Veri N+1 eşit parçaya bölünür; k. fold'da eğitim [0, k+1),
+test k+1. parçadır (genişleyen pencere). İndikatörler tüm seri üzerinde bir kez
+hesaplanır (nedensel oldukları için ileriye bakma yoktur), trade'ler parça içinde
+simüle edilir. Her fold'da en iyi kombinasyon yalnızca eğitim penceresine göre seçilir
+ve sonucu bir sonraki (görülmemiş) test parçasında raporlanır; out-of-sample sonuç bu
+seçimlerin test parçalarının birleşimidir. Kombinasyon tablosu eğitim (in-sample)
+metriğine göre sıralanır - test metriğiyle seçim yapılmaz.
+
+Kullanım:
+    python optimizer.py --csv 1m=data/xauusd_1m.csv \\
+        --param CMO_LENGTH=9,13,21 --param RSI_OVERBOUGHT=70:80:5 \\
+        --param MINIMUM_VOTE_THRESHOLD=3:5 --folds 4 --out results.csv
+    (walk-forward seçimleri: results_walk_forward.csv)
+"""
+import argparse
+import csv
+import itertools
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import INDICATOR_BACKEND, MIN_KLINES, MIN_KLINES_PER_TIMEFRAME
+from backtest import DEFAULT_PARAMS, build_strategy, load_frames, trade_metrics
+from indicators import IndicatorContext
+from klines import KlineFrame
+from strategies import VOTE_BUY, VOTE_NEUTRAL, VOTE_SELL, final_signals
+
+logger = logging.getLogger(__name__)
+
+# Oy kuralı -> (indikatör çıktısını belirleyen parametreler, oyu belirleyen eşikler)
+RULE_PARAMS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "cmo": (("CMO_LENGTH",), ("CMO_OVERSOLD", "CMO_OVERBOUGHT")),
+    "stoch": (("STOCH_PERIOD_K", "STOCH_SMOOTH_K", "STOCH_SMOOTH_D"), ("STOCH_OVERSOLD", "STOCH_OVERBOUGHT")),
+    "rsi": (("RSI_LENGTH",), ("RSI_OVERSOLD", "RSI_OVERBOUGHT")),
+    "macd": (("MACD_FAST_LENGTH", "MACD_SLOW_LENGTH", "MACD_SIGNAL_LENGTH"), ()),
+    "stoch_rsi": (
+        ("STOCH_RSI_LENGTH_RSI", "STOCH_RSI_LENGTH_STOCH", "STOCH_RSI_SMOOTH_K", "STOCH_RSI_SMOOTH_D"),
+        ("STOCH_RSI_OVERSOLD", "STOCH_RSI_OVERBOUGHT")
+    ),
+    "williams_r": (("WILLIAMS_R_LENGTH",), ("WILLIAMS_R_OVERSOLD", "WILLIAMS_R_OVERBOUGHT")),
+    "fisher": (("FISHER_LENGTH",), ("FISHER_BULLISH_THRESHOLD", "FISHER_BEARISH_THRESHOLD")),
+    "coral": (("CORAL_PERIOD", "CORAL_MULTIPLIER"), ()),
+}
+
+# Raporlanan metrikler
+METRICS = ("sent_signals", "hit_rate", "total_pnl", "avg_pnl", "total_return_pct", "max_drawdown")
+
+Split = Tuple[str, int, int]  # (ad, başlangıç, bitiş)
+
+# Worker process state'i (_init_worker ile doldurulur)
+_worker: Dict = {}
+
+
+def parse_values(spec: str) -> List[float]:
+    """Parametre değer listesini çözümle
+
+    "9,13,21" -> [9, 13, 21]; "70:80:5" -> [70, 75, 80] (bitiş dahil, adım varsayılan 1)
+    """
+    if ":" in spec:
+        parts = spec.split(":")
+        start, stop = float(parts[0]), float(parts[1])
+        step = float(parts[2]) if len(parts) > 2 else 1.0
+        count = int(round((stop - start) / step)) + 1
+        values = [round(start + i * step, 10) for i in range(count)]
+    else:
+        values = [float(v) for v in spec.split(",") if v.strip()]
+    if all(float(v).is_integer() for v in values):
+        return [int(v) for v in values]
+    return values
+
+
+def parameter_grid(space: Dict[str, Sequence]) -> List[Dict[str, float]]:
+    """Tüm kombinasyonlar (grid search)"""
+    names = list(space)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(space[n] for n in names))]
+
+
+def random_combinations(space: Dict[str, Sequence], samples: int, seed: int = 0) -> List[Dict[str, float]]:
+    """Grid'den tekrarsız rastgele örnekler (random search)"""
+    total = 1
+    for values in space.values():
+        total *= len(values)
+    if samples >= total:
+        return parameter_grid(space)
+
+    rng = random.Random(seed)
+    names = list(space)
+    seen = set()
+    combos = []
+    while len(combos) < samples:
+        combo = tuple(rng.choice(space[n]) for n in names)
+        if combo not in seen:
+            seen.add(combo)
+            combos.append(dict(zip(names, combo)))
+    # Ortak parametreli kombinasyonlar art arda gelsin (worker cache isabeti)
+    combos.sort(key=lambda c: tuple(c[n] for n in names))
+    return combos
+
+
+def walk_forward_splits(n: int, folds: int, start: int = 0) -> List[Tuple[Split, Split]]:
+    """Genişleyen pencereli walk-forward bölümleri
+
+    Args:
+        n: Bar sayısı
+        folds: Fold sayısı (0 ise tek "all" bölümü)
+        start: İlk geçerli bar (ısınma süresi sonrası)
+
+    Returns:
+        [(train, test), ...] - her biri (ad, başlangıç, bitiş)
+    """
+    if folds <= 0:
+        return [(("all", start, n), ("all", start, n))]
+    segment = (n - start) // (folds + 1)
+    if segment <= 0:
+        raise ValueError(f"Not enough bars ({n}) for {folds} walk-forward folds")
+    splits = []
+    for k in range(folds):
+        train_end = start + (k + 1) * segment
+        test_end = n if k == folds - 1 else train_end + segment
+        splits.append(((f"train{k}", start, train_end), (f"test{k}", train_end, test_end)))
+    return splits
+
+
+def _init_worker(frames: Dict[str, KlineFrame], folds: int, backend: str):
+    """Worker process state'ini hazırla (process başına bir kez)"""
+    _worker.clear()
+    _worker["frames"] = frames
+    _worker["folds"] = folds
+    _worker["backend"] = backend
+    _worker["contexts"] = {tf: IndicatorContext(frame) for tf, frame in frames.items()}
+    _worker["arrays"] = {}
+    _worker["votes"] = {}
+
+
+def _rule_votes(timeframe: str, rule, params: Dict[str, float]) -> np.ndarray:
+    """Kuralın oy serisi - parametre anahtarıyla cache'li"""
+    indicator_params, vote_params = RULE_PARAMS[rule.name]
+    array_key = (timeframe, rule.name) + tuple(params[p] for p in indicator_params)
+    vote_key = array_key + tuple(params[p] for p in vote_params)
+
+    votes = _worker["votes"].get(vote_key)
+    if votes is None:
+        arrays = _worker["arrays"].get(array_key)
+        if arrays is None:
+            arrays = rule.indicator.calculate_arrays(
+                _worker["frames"][timeframe], context=_worker["contexts"][timeframe]
+            )
+            _worker["arrays"][array_key] = arrays
+        votes = rule.vote_series(arrays)
+        _worker["votes"][vote_key] = votes
+    return votes
+
+
+def _summarize(metrics: List[Dict]) -> Dict[str, float]:
+    """Fold metriklerini birleştir (toplamlar toplanır, oranlar trade ağırlıklı)"""
+    trades = sum(m["sent_signals"] for m in metrics)
+    wins = sum(m["wins"] for m in metrics)
+    total_pnl = sum(m["total_pnl"] for m in metrics)
+    return {
+        "sent_signals": trades,
+        "hit_rate": wins / trades if trades else 0.0,
+        "total_pnl": total_pnl,
+        "avg_pnl": total_pnl / trades if trades else 0.0,
+        "total_return_pct": sum(m["total_return_pct"] for m in metrics),
+        "max_drawdown": max((m["max_drawdown"] for m in metrics), default=0.0),
+    }
+
+
+def _fold_metrics(metrics: Dict) -> Dict[str, float]:
+    """trade_metrics çıktısının skaler kısmı (process'ler arası taşınır)"""
+    return {key: metrics[key] for key in METRICS + ("wins",)}
+
+
+def evaluate(combo: Dict[str, float]) -> List[Dict]:
+    """Tek kombinasyonu tüm timeframe'lerde değerlendir (worker içinde çalışır)
+
+    Walk-forward'da satırın "folds" alanı fold başına (eğitim, test) metriklerini taşır.
+    """
+    params = {**DEFAULT_PARAMS, **combo}
+    strategy = build_strategy(_worker["backend"], params)
+    rows = []
+    for timeframe, frame in _worker["frames"].items():
+        matrix = np.vstack([_rule_votes(timeframe, rule, params) for rule in strategy.rules])
+        buy_votes = (matrix == VOTE_BUY).sum(axis=0)
+        sell_votes = (matrix == VOTE_SELL).sum(axis=0)
+        signal = final_signals(buy_votes, sell_votes, strategy.vote_threshold)
+
+        # Canlıdaki minimum mum kontrolü: ilk min_required mumda analiz yapılmaz
+        min_required = MIN_KLINES_PER_TIMEFRAME.get(timeframe, MIN_KLINES)
+        signal[:min_required] = VOTE_NEUTRAL
+
+        train, test = [], []
+        for (_, train_start, train_end), (_, test_start, test_end) in walk_forward_splits(
+            len(frame), _worker["folds"], start=min_required
+        ):
+            train.append(_fold_metrics(trade_metrics(signal[train_start:train_end], frame.close[train_start:train_end])))
+            test.append(_fold_metrics(trade_metrics(signal[test_start:test_end], frame.close[test_start:test_end])))
+
+        row = {"timeframe": timeframe, **combo}
+        if _worker["folds"] > 0:
+            row.update({f"train_{k}": v for k, v in _summarize(train).items()})
+            row.update({f"test_{k}": v for k, v in _summarize(test).items()})
+            row["folds"] = list(zip(train, test))
+        else:
+            row.update(_summarize(test))
+        rows.append(row)
+    return rows
+
+
+def walk_forward(rows: List[Dict], names: Sequence[str], metric: str) -> List[Dict]:
+    """Fold başına eğitim penceresinde en iyi kombinasyonu seç, sonraki test parçasında raporla
+
+    Args:
+        rows: "folds" alanı olan evaluate() satırları
+        names: Parametre isimleri
+        metric: Seçim metriği (örn. total_pnl) - yalnızca eğitim metrikleri kullanılır
+
+    Returns:
+        Timeframe x fold satırları (seçilen parametreler, train_<metric>, test_* metrikleri)
+        + timeframe başına "oos" özet satırı (seçimlerin test parçalarının birleşimi)
+    """
+    selections = []
+    timeframes = list(dict.fromkeys(row["timeframe"] for row in rows))
+    for timeframe in timeframes:
+        tf_rows = [row for row in rows if row["timeframe"] == timeframe]
+        chosen = []
+        for fold in range(len(tf_rows[0]["folds"])):
+            best = max(tf_rows, key=lambda row: row["folds"][fold][0][metric])
+            train, test = best["folds"][fold]
+            chosen.append(test)
+            selections.append({
+                "timeframe": timeframe, "fold": fold,
+                **{name: best[name] for name in names},
+                f"train_{metric}": train[metric],
+                **{f"test_{k}": v for k, v in _summarize([test]).items()},
+            })
+        selections.append({
+            "timeframe": timeframe, "fold": "oos",
+            **{name: "" for name in names},
+            f"train_{metric}": "",
+            **{f"test_{k}": v for k, v in _summarize(chosen).items()},
+        })
+    return selections
+
+
+def optimize(
+    frames: Dict[str, KlineFrame],
+    combos: List[Dict[str, float]],
+    folds: int = 0,
+    workers: Optional[int] = None,
+    backend: str = INDICATOR_BACKEND,
+    rank_by: Optional[str] = None
+) -> Tuple[List[Dict], List[Dict]]:
+    """Kombinasyonları paralel değerlendir ve sırala
+
+    Args:
+        frames: timeframe -> KlineFrame
+        combos: Parametre kombinasyonları (config.py isimleriyle)
+        folds: Walk-forward fold sayısı (0: tüm veri tek parça)
+        workers: Process sayısı (varsayılan CPU sayısı, 1: aynı process)
+        backend: İndikatör backend'i
+        rank_by: Sıralama metriği (varsayılan total_pnl / train_total_pnl); walk-forward
+            seçimi bu metriğin eğitim değerine göre yapılır
+
+    Returns:
+        (satırlar, walk-forward seçimleri)
+        Satırlar: timeframe, rank, parametreler, metrikler (timeframe içinde sıralı)
+        Walk-forward seçimleri: walk_forward() çıktısı (folds=0 ise boş)
+    """
+    for combo in combos:
+        unknown = set(combo) - set(DEFAULT_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown strategy parameter(s): {', '.join(sorted(unknown))}")
+
+    workers = workers or os.cpu_count() or 1
+    rank_by = rank_by or ("train_total_pnl" if folds > 0 else "total_pnl")
+    started = time.perf_counter()
+
+    if workers == 1:
+        _init_worker(frames, folds, backend)
+        batches = [evaluate(combo) for combo in combos]
+    else:
+        chunksize = max(1, len(combos) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(frames, folds, backend)
+        ) as pool:
+            batches = list(pool.map(evaluate, combos, chunksize=chunksize))
+
+    rows = [row for batch in batches for row in batch]
+    selections = []
+    if folds > 0:
+        names = list(dict.fromkeys(name for combo in combos for name in combo))
+        metric = rank_by.split("_", 1)[1] if rank_by.startswith(("train_", "test_")) else rank_by
+        selections = walk_forward(rows, names, metric)
+        for row in rows:
+            del row["folds"]
+
+    ranked = []
+    for timeframe in frames:
+        tf_rows = sorted(
+            (row for row in rows if row["timeframe"] == timeframe),
+            key=lambda row: row[rank_by], reverse=True
+        )
+        for rank, row in enumerate(tf_rows, start=1):
+            ranked.append({"rank": rank, **row})
+
+    logger.info(
+        f"Evaluated {len(combos)} combinations x {len(frames)} timeframe(s) "
+        f"with {workers} worker(s) in {time.perf_counter() - started:.1f}s"
+    )
+    return ranked, selections
+
+
+def write_results(rows: List[Dict], path: str):
+    """Sıralı sonuç tablosunu CSV'ye yaz"""
+    if not rows:
+        return
+    fieldnames = list(rows[0].keys())
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({
+                key: f"{value:.6g}" if isinstance(value, float) else value
+                for key, value in row.items()
+            })
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="MajorityVoteStrategy parametre optimizasyonu")
+    parser.add_argument("--csv", action="append", required=True, metavar="TF=PATH",
+                        help="Timeframe ve CSV dosyası (örn. 1m=data/xauusd_1m.csv)")
+    parser.add_argument("--param", action="append", required=True, metavar="NAME=VALUES",
+                        help="Parametre değerleri: 9,13,21 veya başlangıç:bitiş[:adım]")
+    parser.add_argument("--samples", type=int, default=0, help="Random search örnek sayısı (0: tam grid)")
+    parser.add_argument("--seed", type=int, default=0, help="Random search seed")
+    parser.add_argument("--folds", type=int, default=0, help="Walk-forward fold sayısı")
+    parser.add_argument("--workers", type=int, default=None, help="Process sayısı")
+    parser.add_argument("--backend", default=INDICATOR_BACKEND, help="İndikatör backend'i")
+    parser.add_argument("--rank-by", default=None,
+                        help="Sıralama / walk-forward seçim metriği (örn. train_hit_rate)")
+    parser.add_argument("--out", default="optimizer_results.csv", help="Sonuç CSV dosyası")
+    parser.add_argument("--top", type=int, default=10, help="Ekrana yazdırılacak satır sayısı")
+    parser.add_argument("--resample", default="", metavar="TF,TF",
+                        help="1m CSV'den türetilecek timeframe'ler (örn. 5m,15m,1h,4h)")
+    args = parser.parse_args(argv)
+
+    frames = load_frames(args.csv, [tf for tf in args.resample.split(",") if tf])
+
+    space = {}
+    for item in args.param:
+        name, spec = item.split("=", 1)
+        space[name.strip()] = parse_values(spec)
+
+    combos = random_combinations(space, args.samples, args.seed) if args.samples else parameter_grid(space)
+    rows, selections = optimize(frames, combos, args.folds, args.workers, args.backend, args.rank_by)
+    write_results(rows, args.out)
+
+    rank_by = args.rank_by or ("train_total_pnl" if args.folds > 0 else "total_pnl")
+    for row in rows:
+        if row["rank"] <= args.top:
+            params = ", ".join(f"{name}={row[name]}" for name in space)
+            print(f"{row['timeframe']:<4} #{row['rank']:<3} {rank_by}={row[rank_by]:.2f}  {params}")
+    print(f"Results written to {args.out}")
+
+    if selections:
+        wf_out = f"{os.path.splitext(args.out)[0]}_walk_forward.csv"
+        write_results(selections, wf_out)
+        print("Walk-forward (parameters chosen on train, scored on the next test segment):")
+        for row in selections:
+            if row["fold"] == "oos":
+                print(f"{row['timeframe']:<4} out-of-sample: {row['test_sent_signals']} trades, "
+                      f"total_pnl={row['test_total_pnl']:.2f}, hit_rate={row['test_hit_rate']:.2f}")
+            else:
+                params = ", ".join(f"{name}={row[name]}" for name in space)
+                print(f"{row['timeframe']:<4} fold {row['fold']}: test_total_pnl={row['test_total_pnl']:.2f}  {params}")
+        print(f"Walk-forward selections written to {wf_out}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    main()
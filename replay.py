@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Replay - kayıtlı mumlarla tüm bot döngüsünü sanal saatte hızlandırılmış çalıştırma
+
+main.py'deki analiz döngüsü (TimeframeScheduler, CryptoAnalyzer batch'leri,
+SignalTracker, mesaj builder'ları) gerçek API ve Telegram yerine
+``ReplayExchangeClient`` ve ``ReplayNotifier`` ile çalıştırılır. Döngü mum kapanışını
+beklerken sanal saat ileri alınır; bir haftalık piyasa zamanı saniyeler içinde
+işlenir. Tekrarlanabilir uçtan uca throughput / gecikme benchmark'ı ve profil için.
+
+Görünürlük: t anında açılış zamanı <= t olan 1m mumlar görünür; üst timeframe'ler
+görünen 1m mumlardan türetilir (aktif mum o ana kadarki dakikalardan oluşur).
+
+Kullanım:
+    python replay.py --csv 1m=data/xauusd_1m.csv --days 7
+    python replay.py --synthetic --days 7 --profile replay.prof
+"""
+import argparse
+import asyncio
+import cProfile
+import logging
+import pstats
+import time
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backtest import build_strategy, load_frames
+from config import (
+    TARGET_SYMBOL, TIMEFRAMES, MIN_KLINES, MIN_KLINES_PER_TIMEFRAME, RESAMPLE_OFFSETS_MS,
+    LAZY_VOTE_EVALUATION, INDICATOR_BACKEND
+)
+from core import ExchangeClient, TimeframeScheduler, SignalTracker
+from analyzer import CryptoAnalyzer
+from klines import KlineFrame
+from main import initialize_scheduler, run_loop
+from resampler import resample
+
+logger = logging.getLogger(__name__)
+
+MINUTE_MS = 60 * 1000
+BASE_PRICES = {"XAU/USD": 2000.0}
+
+
+def synthetic_minutes(symbol: str, start_ms: int, count: int, seed: int = 0) -> KlineFrame:
+    """Sembole özgü tekrarlanabilir random-walk 1m serisi"""
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()) + seed)
+    base = BASE_PRICES.get(symbol, 100.0)
+    close = base * np.exp(np.cumsum(rng.normal(0, 0.0003, count)))
+    open_ = np.r_[base, close[:-1]]
+    spread = base * np.abs(rng.normal(0, 0.0002, (2, count)))
+    return KlineFrame(
+        start_ms + np.arange(count, dtype=np.int64) * MINUTE_MS,
+        open_, np.maximum(open_, close) + spread[0], np.minimum(open_, close) - spread[1], close,
+        interval_ms=MINUTE_MS
+    )
+
+
+def warmup_ms(timeframes: Sequence[str] = TIMEFRAMES) -> int:
+    """İlk analizde her timeframe'in minimum mum sayısını karşılayacak geçmiş süresi"""
+    return max(
+        (MIN_KLINES_PER_TIMEFRAME.get(tf, MIN_KLINES) + 2) * TimeframeScheduler.TIMEFRAME_MS[tf]
+        for tf in timeframes
+    )
+
+
+class VirtualClock:
+    """Elle ilerletilen saat (epoch saniye)"""
+
+    def __init__(self, start: float):
+        self.now = float(start)
+
+    def time(self) -> float:
+        return self.now
+
+    def now_ms(self) -> int:
+        return int(self.now * 1000)
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class ReplayExchangeClient(ExchangeClient):
+    """Kayıtlı mumları sanal saate göre sunan ExchangeClient
+
+    ``frames["1m"]`` temel seridir; frames'te olmayan timeframe'ler görünen 1m
+    mumlarından türetilir. ``wait_for_update`` gerçekten beklemez, saati ileri alır.
+    """
+
+    pushes_updates = True  # Bekleme sanal saati ilerletir, deadline timer'ından önce döner
+
+    def __init__(self, frames: Dict[str, KlineFrame], clock: VirtualClock, symbol: str = TARGET_SYMBOL):
+        """
+        Args:
+            frames: Timeframe -> eskiden yeniye mumlar ("1m" zorunlu)
+            clock: Sanal saat
+            symbol: Sunulan sembol
+        """
+        if "1m" not in frames:
+            raise ValueError("Replay requires a 1m series")
+        self.frames = frames
+        self.base = frames["1m"]
+        self.clock = clock
+        self.symbol = symbol
+        self.requests = 0
+        self.waits = 0
+        self.busy: List[float] = []  # İki bekleme arasındaki işlem süreleri (duvar saati, sn)
+        self._last_wake = time.perf_counter()
+
+    @property
+    def end_ms(self) -> int:
+        """Son mumun kapanışı"""
+        return int(self.base.close_time[-1])
+
+    async def get_klines(self, symbol: str, interval: str, limit: int = 101) -> KlineFrame:
+        """Sanal saatte görünen son limit mum (aktif mum dahil)"""
+        self.requests += 1
+        if symbol != self.symbol or interval not in TimeframeScheduler.TIMEFRAME_MS:
+            return KlineFrame.empty()
+        now_ms = self.clock.now_ms()
+        frame = self.frames.get(interval)
+        if frame is not None:
+            end = int(np.searchsorted(frame.open_time, now_ms, side="right"))
+            return frame[max(0, end - limit):end]
+
+        interval_ms = TimeframeScheduler.TIMEFRAME_MS[interval]
+        end = int(np.searchsorted(self.base.open_time, now_ms, side="right"))
+        tail = self.base[max(0, end - (limit + 1) * (interval_ms // MINUTE_MS)):end]
+        return resample(tail, interval_ms, RESAMPLE_OFFSETS_MS.get(interval, 0))[-limit:]
+
+    async def wait_for_update(self, timeout: float):
+        """Saati ileri al (gerçek bekleme yok)"""
+        now = time.perf_counter()
+        self.busy.append(now - self._last_wake)
+        self.waits += 1
+        self.clock.advance(timeout)
+        await asyncio.sleep(0)
+        self._last_wake = time.perf_counter()
+
+
+class ReplayNotifier:
+    """Telegram yerine mesajları bellekte toplar"""
+
+    def __init__(self):
+        self.messages: List[str] = []
+
+    async def send_message(self, message: str):
+        self.messages.append(message)
+
+    async def close(self):
+        pass
+
+
+async def run_replay(
+    frames: Dict[str, KlineFrame],
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
+    timeframes: Sequence[str] = TIMEFRAMES,
+    symbol: str = TARGET_SYMBOL,
+    backend: str = INDICATOR_BACKEND,
+) -> Dict:
+    """main.py döngüsünü [start_ms, end_ms) sanal zaman aralığında çalıştır, rapor döndür"""
+    base = frames["1m"]
+    start_ms = start_ms if start_ms is not None else int(base.open_time[0]) + warmup_ms(timeframes)
+    clock = VirtualClock(start_ms / 1000)
+    exchange = ReplayExchangeClient(frames, clock, symbol)
+    end_ms = min(end_ms or exchange.end_ms, exchange.end_ms)
+    if start_ms >= end_ms:
+        raise ValueError("Not enough data after warm-up")
+
+    scheduler = TimeframeScheduler(clock=clock.time)
+    notifier = ReplayNotifier()
+    analyzer = CryptoAnalyzer(
+        exchange_client=exchange,
+        indicator=None,
+        strategy=build_strategy(backend, lazy=LAZY_VOTE_EVALUATION),
+        signal_tracker=SignalTracker(),
+        notifier=notifier,
+        scheduler=scheduler,
+        symbol=symbol
+    )
+
+    wall_start = time.perf_counter()
+    await initialize_scheduler(scheduler, exchange, timeframes, symbol)
+    exchange.busy.clear()
+    await run_loop(exchange, analyzer, scheduler, timeframes=timeframes,
+                   should_stop=lambda: clock.now_ms() >= end_ms)
+    wall = time.perf_counter() - wall_start
+
+    busy = np.array(exchange.busy)
+    # Analiz yapılan iterasyonlar (boş kontroller ~0 sürer)
+    working = np.sort(busy)[-sum(scheduler.analysis_totals.values()):] if len(busy) else busy
+    return {
+        "simulated_hours": (clock.now_ms() - start_ms) / 3_600_000,
+        "wall_seconds": wall,
+        "speedup": (clock.now_ms() - start_ms) / 1000 / wall if wall else float("inf"),
+        "loop_iterations": exchange.waits,
+        "analyses": dict(scheduler.analysis_totals),
+        "retries": dict(scheduler.retry_totals),
+        "get_klines_calls": exchange.requests,
+        "messages": len(notifier.messages),
+        "iteration_ms": {
+            "p50": float(np.quantile(working, 0.5)) * 1000 if len(working) else 0.0,
+            "p99": float(np.quantile(working, 0.99)) * 1000 if len(working) else 0.0,
+            "max": float(working.max()) * 1000 if len(working) else 0.0,
+        },
+    }
+
+
+def format_report(report: Dict) -> str:
+    """Replay raporunu tablo olarak yaz"""
+    analyses = report["analyses"]
+    total = sum(analyses.values())
+    lines = [
+        f"Simulated {report['simulated_hours']:.1f} h in {report['wall_seconds']:.2f} s "
+        f"({report['speedup']:.0f}x real time)",
+        f"Loop iterations: {report['loop_iterations']}, get_klines calls: {report['get_klines_calls']}, "
+        f"messages: {report['messages']}",
+        f"Analyses: {total} ({total / report['wall_seconds']:.0f}/s) - "
+        + ", ".join(f"{tf}: {count}" for tf, count in analyses.items()),
+        "Busy iteration ms: " + ", ".join(f"{name} {value:.2f}" for name, value in report["iteration_ms"].items()),
+    ]
+    if report["retries"]:
+        lines.append(f"Retries: {report['retries']}")
+    if report["messages"] == 0 and total:
+        lines.append("WARNING: notifier received no messages - SignalTracker / message builders were not exercised")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Sanal saatte hızlandırılmış uçtan uca bot replay'i")
+    parser.add_argument("--csv", action="append", default=[], metavar="TF=PATH",
+                        help="Mum CSV'si (1m zorunlu, diğer timeframe'ler verilmezse 1m'den türetilir)")
+    parser.add_argument("--synthetic", action="store_true", help="CSV yerine sentetik random-walk veri")
+    parser.add_argument("--days", type=float, default=7, help="Replay edilecek piyasa zamanı (gün, warm-up hariç)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", default=INDICATOR_BACKEND, help="İndikatör backend'i")
+    parser.add_argument("--profile", default=None, metavar="PATH", help="cProfile çıktısı (en pahalı 20 fonksiyon yazdırılır)")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.synthetic:
+        minutes = int((warmup_ms() + args.days * 86_400_000) // MINUTE_MS) + 1
+        start = (int(time.time() * 1000) // 86_400_000 - 60) * 86_400_000
+        frames = {"1m": synthetic_minutes(TARGET_SYMBOL, start, minutes, args.seed)}
+    elif args.csv:
+        frames = load_frames(args.csv)
+    else:
+        parser.error("--csv 1m=PATH or --synthetic is required")
+
+    start_ms = int(frames["1m"].open_time[0]) + warmup_ms()
+    end_ms = start_ms + int(args.days * 86_400_000)
+    replay = run_replay(frames, start_ms, end_ms, backend=args.backend)
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        report = profiler.runcall(asyncio.run, replay)
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+    else:
+        report = asyncio.run(replay)
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Timeframe Resampling - Üst timeframe mumlarını 1m serisinden türetme
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from candle_store import CandleStore
+from config import RESAMPLE_TIMEFRAMES, RESAMPLE_OFFSETS_MS, RESAMPLE_VERIFY_EVERY
+from core import ExchangeClient, TimeframeScheduler
+from klines import KlineFrame
+
+logger = logging.getLogger(__name__)
+
+# Twelve Data time_series outputsize üst sınırı
+MAX_OUTPUTSIZE = 5000
+
+
+def bucket_start(open_time: np.ndarray, interval_ms: int, offset_ms: int = 0) -> np.ndarray:
+    """Her mumun ait olduğu üst timeframe mumunun açılış zamanı (UTC epoch'a hizalı)"""
+    return (open_time - offset_ms) // interval_ms * interval_ms + offset_ms
+
+
+def resample(frame: KlineFrame, interval_ms: int, offset_ms: int = 0, drop_partial_first: bool = True) -> KlineFrame:
+    """Eskiden yeniye sıralı alt timeframe mumlarını OHLC olarak üst timeframe'e topla
+
+    open = ilk açılış, high = en yüksek, low = en düşük, close = son kapanış, volume = toplam.
+    Kovalar UTC epoch'a (+ offset_ms) hizalanır; örn. 1h kovaları her saat başında,
+    offset_ms=0 ile 4h kovaları 00:00, 04:00, ... UTC'de başlar.
+
+    Kısmi mumlar:
+    - Son kova aktif (henüz kapanmamış) mumdur ve API çıktısındaki gibi korunur;
+      alt seride o kovanın sadece kapanmış + aktif dakikaları vardır.
+    - Seri bir kovanın ortasından başlıyorsa ilk kova eksik açılış içerir;
+      drop_partial_first=True ile atılır.
+    """
+    n = len(frame)
+    if n == 0:
+        return KlineFrame.empty()
+
+    buckets = bucket_start(frame.open_time, interval_ms, offset_ms)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+
+    result = KlineFrame(
+        buckets[starts],
+        frame.open[starts],
+        np.maximum.reduceat(frame.high, starts),
+        np.minimum.reduceat(frame.low, starts),
+        frame.close[ends],
+        np.add.reduceat(frame.volume, starts),
+        interval_ms=interval_ms,
+    )
+    if drop_partial_first and frame.open_time[0] != buckets[0]:
+        return result[1:]
+    return result
+
+
+class ResamplingClient(ExchangeClient):
+    """Üst timeframe'leri tek bir 1m serisinden türeten ExchangeClient sarmalayıcısı
+
+    Aynı dakika içindeki tüm istekler (1m analizi + 5m/15m/1h/4h) tek bir 1m
+    indirmesini paylaşır; saat başında 5 yerine 1 API çağrısı yapılır.
+
+    Depo (store) verilirse türetilen seri depoda biriktirilir: 100+ mumluk geçmiş
+    bir kez sağlayıcıdan alınır (seed), sonrasında sadece 1m penceresinden gelen
+    yeni mumlar eklenir. Depo yoksa türetme yalnızca gereken 1m penceresi
+    MAX_OUTPUTSIZE'a sığıyorsa yapılır, aksi halde istek sağlayıcıya iletilir.
+
+    Her ``verify_every`` türetmede bir, son kapanmış mum sağlayıcının mumu ile
+    karşılaştırılır; fark varsa uyarı loglanır ve sağlayıcı değeri depoya yazılır.
+    """
+
+    def __init__(
+        self,
+        client: ExchangeClient,
+        timeframes: Sequence[str] = RESAMPLE_TIMEFRAMES,
+        base_interval: str = "1m",
+        offsets_ms: Optional[Dict[str, int]] = None,
+        store: Optional[CandleStore] = None,
+        verify_every: int = RESAMPLE_VERIFY_EVERY,
+        tolerance: float = 1e-6,
+    ):
+        """
+        Args:
+            client: Asıl veri kaynağı (TwelveDataClient)
+            timeframes: 1m'den türetilecek timeframe'ler
+            base_interval: Türetmenin yapıldığı alt timeframe
+            offsets_ms: Timeframe başına kova hizalama kayması (ms)
+            store: Türetilen serilerin biriktirildiği kalıcı depo
+            verify_every: Kaç türetmede bir sağlayıcı ile doğrulama yapılacağı (0: kapalı)
+            tolerance: Doğrulamada kabul edilen göreli fiyat farkı
+        """
+        self.client = client
+        self.base_interval = base_interval
+        self.base_ms = TimeframeScheduler.TIMEFRAME_MS[base_interval]
+        self.timeframes = {
+            tf: TimeframeScheduler.TIMEFRAME_MS[tf]
+            for tf in timeframes
+            if tf in TimeframeScheduler.TIMEFRAME_MS and tf != base_interval
+        }
+        self.offsets_ms = {**RESAMPLE_OFFSETS_MS, **(offsets_ms or {})}
+        self.store = store
+        self.verify_every = verify_every
+        self.tolerance = tolerance
+        self._update_window()
+        self._base: Dict[str, KlineFrame] = {}  # symbol -> son 1m penceresi
+        self._base_locks: Dict[str, asyncio.Lock] = {}  # Eşzamanlı istekler tek indirmeyi beklesin
+        self._builds: Dict[str, int] = {tf: 0 for tf in self.timeframes}
+        self.stats = {"base_fetches": 0, "derived": 0, "seeded": 0, "verified": 0, "mismatches": 0}
+
+        logger.info(
+            f"ResamplingClient: {', '.join(self.timeframes)} derived from {base_interval} "
+            f"(window {self.base_limit} candles, verify every {verify_every})"
+        )
+
+    def _update_window(self):
+        """1m pencere boyu: en büyük kovanın tamamı + bir önceki kova her zaman pencerede olsun"""
+        factors = [ms // self.base_ms for ms in self.timeframes.values()] or [1]
+        self.base_limit = min(MAX_OUTPUTSIZE, 2 * max(factors) + 1)
+
+    def can_derive(self, timeframe: str) -> bool:
+        """Timeframe base_interval'dan türetilebilir mi (tam katı olmalı)"""
+        interval_ms = TimeframeScheduler.TIMEFRAME_MS.get(timeframe)
+        return (
+            timeframe != self.base_interval
+            and interval_ms is not None
+            and interval_ms % self.base_ms == 0
+        )
+
+    def enable(self, timeframe: str):
+        """Timeframe'i türetilenlere ekle (bütçe planlayıcısı)"""
+        if timeframe in self.timeframes or not self.can_derive(timeframe):
+            return
+        self.timeframes[timeframe] = TimeframeScheduler.TIMEFRAME_MS[timeframe]
+        self._builds.setdefault(timeframe, 0)
+        self._update_window()
+        logger.info(f"{timeframe} is now derived from {self.base_interval}")
+
+    def disable(self, timeframe: str):
+        """Timeframe'i tekrar sağlayıcıdan çek"""
+        if self.timeframes.pop(timeframe, None) is not None:
+            self._update_window()
+            logger.info(f"{timeframe} is fetched from the provider again")
+
+    async def get_klines(self, symbol: str, interval: str, limit: int = 101) -> KlineFrame:
+        """1m ve türetilen timeframe'ler ortak 1m penceresinden, diğerleri sağlayıcıdan"""
+        if interval == self.base_interval:
+            base = await self._base_frame(symbol, limit)
+            return base[-limit:]
+        if interval not in self.timeframes:
+            return await self.client.get_klines(symbol, interval, limit)
+        if self.store is None:
+            return await self._derive_window(symbol, interval, limit)
+        return await self._derive_stored(symbol, interval, limit)
+
+    async def latest_closed_time(self, symbol: str, interval: str) -> Optional[int]:
+        """Türetilen timeframe'lerde hazırlık 1m serisinden kontrol edilir
+
+        Üst mum, son kapanmış 1m mumu kovasının sonuna ulaşınca tamamlanmıştır.
+        Bu dakikanın 1m penceresi zaten indirildiyse yeni istek yapılmaz.
+        """
+        if interval not in self.timeframes and interval != self.base_interval:
+            return await self.client.latest_closed_time(symbol, interval)
+
+        cached = self._base.get(symbol)
+        current_open = int(time.time() * 1000) // self.base_ms * self.base_ms
+        if cached is not None and len(cached) >= 2 and int(cached.open_time[-1]) >= current_open:
+            base_closed = int(cached.close_time[-2])
+        else:
+            base_closed = await self.client.latest_closed_time(symbol, self.base_interval)
+        if base_closed is None or interval == self.base_interval:
+            return base_closed
+        interval_ms = self.timeframes[interval]
+        return int(bucket_start(np.int64(base_closed), interval_ms, self.offsets_ms.get(interval, 0)))
+
+    async def _base_frame(self, symbol: str, limit: int) -> KlineFrame:
+        """Bu dakikanın 1m penceresi (aynı dakikada tekrar indirilmez)"""
+        lock = self._base_locks.setdefault(symbol, asyncio.Lock())
+        async with lock:
+            cached = self._base.get(symbol)
+            current_open = int(time.time() * 1000) // self.base_ms * self.base_ms
+            if cached is not None and len(cached) >= limit and int(cached.open_time[-1]) >= current_open:
+                return cached
+
+            frame = await self.client.get_klines(symbol, self.base_interval, max(limit, self.base_limit))
+            self.stats["base_fetches"] += 1
+            if len(frame) > 0:
+                self._base[symbol] = frame
+            return frame
+
+    async def _derive_window(self, symbol: str, interval: str, limit: int) -> KlineFrame:
+        """Depo yokken: limit mumu tek bir 1m penceresinden türet"""
+        interval_ms = self.timeframes[interval]
+        needed = (limit + 1) * (interval_ms // self.base_ms)
+        if needed > MAX_OUTPUTSIZE:
+            return await self.client.get_klines(symbol, interval, limit)
+
+        base = await self._base_frame(symbol, needed)
+        bars = resample(base, interval_ms, self.offsets_ms.get(interval, 0))
+        if len(bars) < limit:
+            return await self.client.get_klines(symbol, interval, limit)
+        self.stats["derived"] += 1
+        await self._maybe_verify(symbol, interval, bars)
+        return bars[-limit:]
+
+    async def _derive_stored(self, symbol: str, interval: str, limit: int) -> KlineFrame:
+        """Depolu mod: yeni mumları 1m penceresinden türetip depodaki seriye ekle"""
+        interval_ms = self.timeframes[interval]
+        base = await self._base_frame(symbol, self.base_limit)
+        bars = resample(base, interval_ms, self.offsets_ms.get(interval, 0))
+
+        last_stored = self.store.last_open_time(symbol, interval)
+        contiguous = (
+            len(bars) > 0
+            and last_stored is not None
+            and last_stored >= int(bars.open_time[0]) - interval_ms
+            and self.store.count(symbol, interval) >= limit
+        )
+        if not contiguous:
+            # Geçmiş yok / yetersiz ya da arada boşluk var (örn. hafta sonu) - sağlayıcıdan seed
+            frame = await self.client.get_klines(symbol, interval, limit)
+            self.stats["seeded"] += 1
+            if len(frame) > 0:
+                self.store.upsert(symbol, interval, frame)
+            logger.info(f"Seeded {interval} history for {symbol} from provider ({len(frame)} candles)")
+            return frame
+
+        self.store.upsert(symbol, interval, bars)
+        self.stats["derived"] += 1
+        await self._maybe_verify(symbol, interval, bars)
+        return self.store.load(symbol, interval, limit, interval_ms)
+
+    async def _maybe_verify(self, symbol: str, interval: str, bars: KlineFrame):
+        """Periyodik olarak son kapanmış türetilmiş mumu sağlayıcı ile karşılaştır"""
+        if not self.verify_every or len(bars) < 2:
+            return
+        self._builds[interval] += 1
+        if self._builds[interval] % self.verify_every:
+            return
+
+        reference = await self.client.get_klines(symbol, interval, 3)
+        if len(reference) < 2:
+            return
+        self.stats["verified"] += 1
+        # Son kapanmış mum (aktif mum hariç)
+        ref_time = int(reference.open_time[-2])
+        idx = np.flatnonzero(bars.open_time == ref_time)
+        if len(idx) == 0:
+            logger.warning(f"Resample verify {symbol} {interval}: no derived candle at {ref_time}")
+            return
+        i = int(idx[0])
+        derived = np.array([bars.open[i], bars.high[i], bars.low[i], bars.close[i]])
+        expected = np.array([reference.open[-2], reference.high[-2], reference.low[-2], reference.close[-2]])
+        if np.any(np.abs(derived - expected) > self.tolerance * np.abs(expected)):
+            self.stats["mismatches"] += 1
+            logger.warning(
+                f"Resample verify {symbol} {interval} mismatch at {ref_time}: "
+                f"derived OHLC {derived.tolist()} vs provider {expected.tolist()}"
+            )
+            if self.store is not None:
+                self.store.upsert(symbol, interval, reference[:-1])
+
+    @property
+    def pushes_updates(self) -> bool:
+        return self.client.pushes_updates
+
+    async def wait_for_update(self, timeout: float):
+        """Asıl client'ın veri bekleme davranışını kullan (StreamingClient mum kapanışında uyandırır)"""
+        await self.client.wait_for_update(timeout)
+
+    async def close(self):
+        """İstatistikleri logla ve asıl client'ı kapat"""
+        logger.info(f"Resampling stats: {self.stats}")
+        await self.client.close()
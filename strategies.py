@@ -1,8 +1,12 @@
 """
 Strateji Sınıfları
 """
+import logging
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
 from config import (
     CMO_OVERBOUGHT, CMO_OVERSOLD, 
     STOCH_OVERBOUGHT, STOCH_OVERSOLD,
@@ -10,19 +14,201 @@ from config import (
     STOCH_RSI_OVERBOUGHT, STOCH_RSI_OVERSOLD,
     WILLIAMS_R_OVERBOUGHT, WILLIAMS_R_OVERSOLD,
     FISHER_BULLISH_THRESHOLD, FISHER_BEARISH_THRESHOLD,
-    MINIMUM_VOTE_THRESHOLD
+    MINIMUM_VOTE_THRESHOLD, LAZY_VOTE_EVALUATION
 )
-from indicators import ChandeMomentumOscillator, StochasticOscillator, RelativeStrengthIndex, MACD, StochasticRSI, WilliamsR, FisherTransform, CoralTrend
+from indicators import ChandeMomentumOscillator, StochasticOscillator, RelativeStrengthIndex, MACD, StochasticRSI, WilliamsR, FisherTransform, CoralTrend, IIndicator, IndicatorContext
+
+logger = logging.getLogger(__name__)
+
+# Vektörel oy kodları (int8)
+VOTE_BUY = 1
+VOTE_SELL = -1
+VOTE_NEUTRAL = 0
+VOTE_CODES = {"BUY": VOTE_BUY, "SELL": VOTE_SELL, "NEUTRAL": VOTE_NEUTRAL}
+VOTE_NAMES = {code: name for name, code in VOTE_CODES.items()}
 
 
 class IStrategy(ABC):
     """Strateji interface - Tüm stratejiler bunu implement etmeli"""
 
     @abstractmethod
-    def analyze(self, indicator_values: List[float], klines: List[List]) -> str:
-        """Sinyal analizi yap: BUY, SELL veya NEUTRAL döner"""
+    def analyze(self, indicator_values: Optional[Dict], klines: List[List]) -> Tuple[str, Dict[str, Any]]:
+        """Sinyal analizi yap: (BUY/SELL/NEUTRAL, context) döner"""
         pass
 
+    def complete(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Eksik bırakılan detayları tamamla (mesaj gönderilmeden önce çağrılır)"""
+        return context
+
+
+Vote = str  # "BUY" | "SELL" | "NEUTRAL"
+VoteSeries = Callable[[Dict[str, np.ndarray]], np.ndarray]  # array'ler -> int8 oy serisi
+
+
+class VoteRule:
+    """Tek indikatörün oylamaya katılım kuralı
+
+    Args:
+        name: Oylamadaki anahtar (örn. "cmo") - vote_breakdown'da bu isimle görünür
+        indicator: Hesaplanacak indikatör (IIndicator)
+        vote: (calculate() sonucu, mum indeksi) -> "BUY" / "SELL" / "NEUTRAL"
+        exports: context["indicators"] anahtarı -> calculate() sonuç anahtarı
+                 (None verilirse sonuç dict'inin tamamı konur)
+        vote_series: Aynı kuralın vektörel hali (calculate_arrays() -> int8 seri);
+                     verilmezse ``vote`` her bar için tek tek çağrılır
+
+    Yeni indikatör eklemek için tek bir kural yeterlidir, örn. docs/CCI.md'deki
+    üç mumluk CCI pattern'i:
+
+        def cci_vote(values, idx):
+            curr, prev1, prev2 = (values["cci"][idx - k] for k in range(3))
+            ...
+        strategy.add_rule(VoteRule("cci", cci_indicator, cci_vote, {"cci": "cci"}))
+    """
+
+    def __init__(
+        self,
+        name: str,
+        indicator: IIndicator,
+        vote: Callable[[Dict[str, List], int], Vote],
+        exports: Dict[str, Optional[str]],
+        vote_series: Optional[VoteSeries] = None
+    ):
+        self.name = name
+        self.indicator = indicator
+        self.vote = vote
+        self.exports = exports
+        self.vote_series = vote_series
+        self.cost: Optional[float] = None  # Ölçülen calculate() süresi (sn, EMA)
+
+    def measure(self, elapsed: float):
+        """calculate() süresini maliyet ortalamasına ekle"""
+        self.cost = elapsed if self.cost is None else 0.8 * self.cost + 0.2 * elapsed
+
+    def export(self, values: Dict[str, List]) -> Dict[str, Any]:
+        """calculate() sonucunu context["indicators"] formatına çevir"""
+        return {
+            key: values if source is None else values[source]
+            for key, source in self.exports.items()
+        }
+
+
+def _select(buy: np.ndarray, sell: np.ndarray) -> np.ndarray:
+    """BUY koşulu önceliklidir (tekil kurallardaki if/elif sırası)"""
+    return np.where(buy, VOTE_BUY, np.where(sell, VOTE_SELL, VOTE_NEUTRAL)).astype(np.int8)
+
+
+def threshold_votes(key: str, oversold: float, overbought: float) -> VoteSeries:
+    """threshold_vote'un vektörel hali (NaN -> NEUTRAL)"""
+    def votes(arrays: Dict[str, np.ndarray]) -> np.ndarray:
+        values = arrays[key]
+        return _select(values < oversold, values > overbought)
+    return votes
+
+
+def cross_votes(line_key: str, signal_key: str) -> VoteSeries:
+    """cross_vote'un vektörel hali"""
+    def votes(arrays: Dict[str, np.ndarray]) -> np.ndarray:
+        line = arrays[line_key]
+        signal = arrays[signal_key]
+        return _select(line > signal, line < signal)
+    return votes
+
+
+def fisher_votes(bullish: float, bearish: float) -> VoteSeries:
+    """fisher_vote'un vektörel hali"""
+    def votes(arrays: Dict[str, np.ndarray]) -> np.ndarray:
+        fisher = arrays["fisher"]
+        trigger = arrays["trigger"]
+        return _select(
+            (fisher > trigger) & (fisher > bearish),
+            (fisher < trigger) & (fisher < bullish)
+        )
+    return votes
+
+
+def trend_votes(arrays: Dict[str, np.ndarray]) -> np.ndarray:
+    """trend_vote'un vektörel hali"""
+    trend = arrays["trend"]
+    return _select(trend == 1, trend == -1)
+
+
+def final_signals(buy_votes: np.ndarray, sell_votes: np.ndarray,
+                  threshold: int = MINIMUM_VOTE_THRESHOLD) -> np.ndarray:
+    """Bar bazında majority vote kararı (int8: 1 BUY, -1 SELL, 0 NEUTRAL)
+
+    Oy sayıları bir kez hesaplanıp farklı eşiklerle tekrar kullanılabilir.
+    """
+    return _select(buy_votes >= threshold, sell_votes >= threshold)
+
+
+def threshold_vote(key: str, oversold: float, overbought: float) -> Callable[[Dict[str, List], int], Vote]:
+    """Osilatör kuralı: oversold altı BUY, overbought üstü SELL"""
+    def vote(values: Dict[str, List], idx: int) -> Vote:
+        value = values[key][idx]
+        if value is None:
+            return "NEUTRAL"
+        if value < oversold:
+            return "BUY"
+        if value > overbought:
+            return "SELL"
+        return "NEUTRAL"
+    return vote
+
+
+def cross_vote(line_key: str, signal_key: str) -> Callable[[Dict[str, List], int], Vote]:
+    """Kesişim kuralı: line > signal BUY, line < signal SELL"""
+    def vote(values: Dict[str, List], idx: int) -> Vote:
+        line = values[line_key][idx]
+        signal = values[signal_key][idx]
+        if line is None or signal is None:
+            return "NEUTRAL"
+        if line > signal:
+            return "BUY"
+        if line < signal:
+            return "SELL"
+        return "NEUTRAL"
+    return vote
+
+
+def fisher_vote(bullish: float, bearish: float) -> Callable[[Dict[str, List], int], Vote]:
+    """Fisher kuralı: trigger kesişimi + eşik filtresi"""
+    def vote(values: Dict[str, List], idx: int) -> Vote:
+        fisher_val = values["fisher"][idx]
+        fisher_trigger = values["trigger"][idx]
+        if fisher_val is None or fisher_trigger is None:
+            return "NEUTRAL"
+        if fisher_val > fisher_trigger and fisher_val > bearish:
+            return "BUY"
+        if fisher_val < fisher_trigger and fisher_val < bullish:
+            return "SELL"
+        return "NEUTRAL"
+    return vote
+
+
+def trend_vote(values: Dict[str, List], idx: int) -> Vote:
+    """Coral kuralı: trend 1 BUY, -1 SELL"""
+    trend = values["trend"][idx]
+    if trend == 1:
+        return "BUY"
+    if trend == -1:
+        return "SELL"
+    return "NEUTRAL"
+
+
+# Oy kurallarının varsayılan eşikleri (config.py isimleriyle) - thresholds ile override edilebilir
+DEFAULT_THRESHOLDS: Dict[str, float] = {
+    "CMO_OVERSOLD": CMO_OVERSOLD, "CMO_OVERBOUGHT": CMO_OVERBOUGHT,
+    "STOCH_OVERSOLD": STOCH_OVERSOLD, "STOCH_OVERBOUGHT": STOCH_OVERBOUGHT,
+    "RSI_OVERSOLD": RSI_OVERSOLD, "RSI_OVERBOUGHT": RSI_OVERBOUGHT,
+    "STOCH_RSI_OVERSOLD": STOCH_RSI_OVERSOLD, "STOCH_RSI_OVERBOUGHT": STOCH_RSI_OVERBOUGHT,
+    "WILLIAMS_R_OVERSOLD": WILLIAMS_R_OVERSOLD, "WILLIAMS_R_OVERBOUGHT": WILLIAMS_R_OVERBOUGHT,
+    "FISHER_BULLISH_THRESHOLD": FISHER_BULLISH_THRESHOLD,
+    "FISHER_BEARISH_THRESHOLD": FISHER_BEARISH_THRESHOLD,
+    "MINIMUM_VOTE_THRESHOLD": MINIMUM_VOTE_THRESHOLD,
+}
+
+
 class MajorityVoteStrategy(IStrategy):
     """8 İndikatör Majority Vote (Çoğunluk Oylaması) Stratejisi
     
@@ -35,6 +221,15 @@ class MajorityVoteStrategy(IStrategy):
     - NEUTRAL: Yukarıdaki koşullar sağlanmazsa
     
     Örnek: 5 BUY, 1 SELL, 2 NEUTRAL → BUY sinyali (5 ≥ 4)
+
+    Her indikatör bir VoteRule ile kayıtlıdır ve analiz başına yalnızca bir kez
+    hesaplanır; sonuçlar context["indicators"] ile dışarı verilir. Yeni indikatör
+    için ``add_rule`` kullanılır.
+
+    Lazy mod (lazy=True): Kurallar ölçülen maliyete göre ucuzdan pahalıya
+    değerlendirilir ve final sinyal artık değişemeyecekse durulur. Değerlendirilmeyen
+    kurallar vote_breakdown["pending"] içinde listelenir; ``complete(context)``
+    mesaj gönderilmeden önce tam dökümü üretir.
     """
 
     def __init__(
@@ -46,8 +241,19 @@ class MajorityVoteStrategy(IStrategy):
         stoch_rsi_indicator: StochasticRSI,
         williams_r_indicator: WilliamsR,
         fisher_indicator: FisherTransform,
-        coral_indicator: CoralTrend
+        coral_indicator: CoralTrend,
+        lazy: bool = LAZY_VOTE_EVALUATION,
+        thresholds: Optional[Dict[str, float]] = None
     ):
+        """
+        Args:
+            *_indicator: Oylamaya katılan indikatörler
+            lazy: Lazy (erken çıkışlı) değerlendirme
+            thresholds: DEFAULT_THRESHOLDS üzerine yazılacak eşikler (örn. {"RSI_OVERBOUGHT": 75})
+        """
+        self.lazy = lazy
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self.vote_threshold = int(self.thresholds["MINIMUM_VOTE_THRESHOLD"])
         self.cmo = cmo_indicator
         self.stoch = stoch_indicator
         self.rsi = rsi_indicator
@@ -57,172 +263,196 @@ class MajorityVoteStrategy(IStrategy):
         self.fisher = fisher_indicator
         self.coral = coral_indicator
 
-    def _get_individual_signals(self, klines: List[List]) -> Dict[str, str]:
-        """Her indikatör için bireysel BUY/SELL/NEUTRAL sinyali hesapla"""
-        signals = {}
-        curr_idx = -1
-        
-        # CMO Sinyali
-        cmo_values = self.cmo.calculate(klines)
-        if cmo_values["cmo"][curr_idx] is not None:
-            cmo_val = cmo_values["cmo"][curr_idx]
-            if cmo_val < CMO_OVERSOLD:
-                signals["cmo"] = "BUY"
-            elif cmo_val > CMO_OVERBOUGHT:
-                signals["cmo"] = "SELL"
-            else:
-                signals["cmo"] = "NEUTRAL"
-        else:
-            signals["cmo"] = "NEUTRAL"
-            
-        # Stochastic Sinyali
-        stoch_values = self.stoch.calculate(klines)
-        if stoch_values["stoch_k"][curr_idx] is not None:
-            stoch_k = stoch_values["stoch_k"][curr_idx]
-            if stoch_k < STOCH_OVERSOLD:
-                signals["stoch"] = "BUY"
-            elif stoch_k > STOCH_OVERBOUGHT:
-                signals["stoch"] = "SELL"
-            else:
-                signals["stoch"] = "NEUTRAL"
-        else:
-            signals["stoch"] = "NEUTRAL"
-            
-        # RSI Sinyali
-        rsi_values = self.rsi.calculate(klines)
-        if rsi_values["rsi"][curr_idx] is not None:
-            rsi_val = rsi_values["rsi"][curr_idx]
-            if rsi_val < RSI_OVERSOLD:
-                signals["rsi"] = "BUY"
-            elif rsi_val > RSI_OVERBOUGHT:
-                signals["rsi"] = "SELL"
-            else:
-                signals["rsi"] = "NEUTRAL"
-        else:
-            signals["rsi"] = "NEUTRAL"
-            
-        # MACD Sinyali
-        macd_values = self.macd.calculate(klines)
-        if (macd_values["macd"][curr_idx] is not None and 
-            macd_values["signal"][curr_idx] is not None):
-            macd_line = macd_values["macd"][curr_idx]
-            macd_signal = macd_values["signal"][curr_idx]
-            if macd_line > macd_signal:
-                signals["macd"] = "BUY"
-            elif macd_line < macd_signal:
-                signals["macd"] = "SELL"
-            else:
-                signals["macd"] = "NEUTRAL"
-        else:
-            signals["macd"] = "NEUTRAL"
-            
-        # Stochastic RSI Sinyali
-        stoch_rsi_values = self.stoch_rsi.calculate(klines)
-        if stoch_rsi_values["stoch_rsi_k"][curr_idx] is not None:
-            stoch_rsi_k = stoch_rsi_values["stoch_rsi_k"][curr_idx]
-            if stoch_rsi_k < STOCH_RSI_OVERSOLD:
-                signals["stoch_rsi"] = "BUY"
-            elif stoch_rsi_k > STOCH_RSI_OVERBOUGHT:
-                signals["stoch_rsi"] = "SELL"
-            else:
-                signals["stoch_rsi"] = "NEUTRAL"
-        else:
-            signals["stoch_rsi"] = "NEUTRAL"
-            
-        # Williams %R Sinyali
-        williams_r_values = self.williams_r.calculate(klines)
-        if williams_r_values["williams_r"][curr_idx] is not None:
-            williams_r_val = williams_r_values["williams_r"][curr_idx]
-            if williams_r_val < WILLIAMS_R_OVERSOLD:
-                signals["williams_r"] = "BUY"
-            elif williams_r_val > WILLIAMS_R_OVERBOUGHT:
-                signals["williams_r"] = "SELL"
-            else:
-                signals["williams_r"] = "NEUTRAL"
-        else:
-            signals["williams_r"] = "NEUTRAL"
-            
-        # Fisher Transform Sinyali
-        fisher_values = self.fisher.calculate(klines)
-        if (fisher_values["fisher"][curr_idx] is not None and 
-            fisher_values["trigger"][curr_idx] is not None):
-            fisher_val = fisher_values["fisher"][curr_idx]
-            fisher_trigger = fisher_values["trigger"][curr_idx]
-            if fisher_val > fisher_trigger and fisher_val > FISHER_BEARISH_THRESHOLD:
-                signals["fisher"] = "BUY"
-            elif fisher_val < fisher_trigger and fisher_val < FISHER_BULLISH_THRESHOLD:
-                signals["fisher"] = "SELL"
-            else:
-                signals["fisher"] = "NEUTRAL"
-        else:
-            signals["fisher"] = "NEUTRAL"
-            
-        # Coral Trend Sinyali
-        coral_values = self.coral.calculate(klines)
-        if coral_values["trend"][curr_idx] is not None:
-            coral_trend = coral_values["trend"][curr_idx]
-            if coral_trend == 1:
-                signals["coral"] = "BUY"
-            elif coral_trend == -1:
-                signals["coral"] = "SELL"
-            else:
-                signals["coral"] = "NEUTRAL"
-        else:
-            signals["coral"] = "NEUTRAL"
-            
-        return signals
-
-    def analyze(self, indicator_values: List[float], klines: List[List]) -> Tuple[str, Dict[str, Any]]:
-        # Tüm indikatörleri hesapla
-        cmo_values = self.cmo.calculate(klines)
-        stoch_values = self.stoch.calculate(klines)
-        rsi_values = self.rsi.calculate(klines)
-        macd_values = self.macd.calculate(klines)
-        stoch_rsi_values = self.stoch_rsi.calculate(klines)
-        williams_r_values = self.williams_r.calculate(klines)
-        fisher_values = self.fisher.calculate(klines)
-        coral_values = self.coral.calculate(klines)
-        
-        # Bireysel sinyalleri al
-        individual_signals = self._get_individual_signals(klines)
+        # Oy kuralları (sıra = vote_breakdown sırası)
+        t = self.thresholds
+        self.rules: List[VoteRule] = [
+            VoteRule("cmo", self.cmo, threshold_vote("cmo", t["CMO_OVERSOLD"], t["CMO_OVERBOUGHT"]),
+                     {"cmo": None},
+                     threshold_votes("cmo", t["CMO_OVERSOLD"], t["CMO_OVERBOUGHT"])),
+            VoteRule("stoch", self.stoch,
+                     threshold_vote("stoch_k", t["STOCH_OVERSOLD"], t["STOCH_OVERBOUGHT"]),
+                     {"stoch_k": "stoch_k", "stoch_d": "stoch_d"},
+                     threshold_votes("stoch_k", t["STOCH_OVERSOLD"], t["STOCH_OVERBOUGHT"])),
+            VoteRule("rsi", self.rsi, threshold_vote("rsi", t["RSI_OVERSOLD"], t["RSI_OVERBOUGHT"]),
+                     {"rsi": None},
+                     threshold_votes("rsi", t["RSI_OVERSOLD"], t["RSI_OVERBOUGHT"])),
+            VoteRule("macd", self.macd, cross_vote("macd", "signal"),
+                     {"macd": "macd", "macd_signal": "signal", "macd_histogram": "histogram"},
+                     cross_votes("macd", "signal")),
+            VoteRule("stoch_rsi", self.stoch_rsi,
+                     threshold_vote("stoch_rsi_k", t["STOCH_RSI_OVERSOLD"], t["STOCH_RSI_OVERBOUGHT"]),
+                     {"stoch_rsi_k": "stoch_rsi_k", "stoch_rsi_d": "stoch_rsi_d"},
+                     threshold_votes("stoch_rsi_k", t["STOCH_RSI_OVERSOLD"], t["STOCH_RSI_OVERBOUGHT"])),
+            VoteRule("williams_r", self.williams_r,
+                     threshold_vote("williams_r", t["WILLIAMS_R_OVERSOLD"], t["WILLIAMS_R_OVERBOUGHT"]),
+                     {"williams_r": None},
+                     threshold_votes("williams_r", t["WILLIAMS_R_OVERSOLD"], t["WILLIAMS_R_OVERBOUGHT"])),
+            VoteRule("fisher", self.fisher,
+                     fisher_vote(t["FISHER_BULLISH_THRESHOLD"], t["FISHER_BEARISH_THRESHOLD"]),
+                     {"fisher": "fisher", "fisher_trigger": "trigger"},
+                     fisher_votes(t["FISHER_BULLISH_THRESHOLD"], t["FISHER_BEARISH_THRESHOLD"])),
+            VoteRule("coral", self.coral, trend_vote,
+                     {"coral": "coral", "coral_trend": "trend"},
+                     trend_votes),
+        ]
+
+    def add_rule(self, rule: VoteRule):
+        """Oylamaya yeni indikatör ekle (aynı isimli kural varsa değiştirilir)"""
+        self.rules = [r for r in self.rules if r.name != rule.name] + [rule]
+
+    def _evaluation_order(self) -> List[VoteRule]:
+        """Ölçülmemiş kurallar önce (maliyetleri öğrenilsin), sonra ucuzdan pahalıya"""
+        return sorted(self.rules, key=lambda rule: (rule.cost is not None, rule.cost or 0.0))
+
+    @staticmethod
+    def _is_decided(buy_votes: int, sell_votes: int, remaining: int, threshold: int) -> bool:
+        """Kalan oylar ne olursa olsun final sinyal değişemez mi?"""
+        if buy_votes >= threshold:
+            return True  # BUY önceliklidir
+        buy_possible = buy_votes + remaining >= threshold
+        sell_possible = sell_votes + remaining >= threshold
+        if sell_votes >= threshold:
+            return not buy_possible
+        return not buy_possible and not sell_possible
+
+    def _evaluate(self, rule: VoteRule, state: Dict[str, Any]):
+        """Tek kuralı hesapla, oyunu ve çıktısını state'e yaz"""
+        started = time.perf_counter()
+        values = rule.indicator.calculate(state["klines"], context=state["indicator_context"])
+        rule.measure(time.perf_counter() - started)
+        state["signals"][rule.name] = rule.vote(values, -1)
+        state["indicators"].update(rule.export(values))
+
+    def _build_context(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """State'ten strateji context'ini oluştur (oylar kural sırasıyla)"""
+        individual_signals = {
+            rule.name: state["signals"][rule.name]
+            for rule in self.rules if rule.name in state["signals"]
+        }
+        pending = [rule.name for rule in self.rules if rule.name not in state["signals"]]
         
         # Oyları say
         buy_votes = sum(1 for signal in individual_signals.values() if signal == "BUY")
         sell_votes = sum(1 for signal in individual_signals.values() if signal == "SELL")
         neutral_votes = sum(1 for signal in individual_signals.values() if signal == "NEUTRAL")
         
-        # Majority vote ile karar ver
-        if buy_votes >= MINIMUM_VOTE_THRESHOLD:
+        # Majority vote ile karar ver (erken durulduysa kısmi sayılar da aynı kararı verir)
+        if buy_votes >= self.vote_threshold:
             final_signal = "BUY"
-        elif sell_votes >= MINIMUM_VOTE_THRESHOLD:
+        elif sell_votes >= self.vote_threshold:
             final_signal = "SELL"
         else:
             final_signal = "NEUTRAL"
 
-        context: Dict[str, Any] = {
+        return {
             "indicators": {
-                "cmo": cmo_values,
-                "stoch_k": stoch_values["stoch_k"],
-                "stoch_d": stoch_values["stoch_d"],
-                "rsi": rsi_values,
-                "macd": macd_values["macd"],
-                "macd_signal": macd_values["signal"],
-                "macd_histogram": macd_values["histogram"],
-                "stoch_rsi_k": stoch_rsi_values["stoch_rsi_k"],
-                "stoch_rsi_d": stoch_rsi_values["stoch_rsi_d"],
-                "williams_r": williams_r_values,
-                "fisher": fisher_values["fisher"],
-                "fisher_trigger": fisher_values["trigger"],
-                "coral": coral_values["coral"],
-                "coral_trend": coral_values["trend"]
+                key: state["indicators"][key]
+                for rule in self.rules for key in rule.exports if key in state["indicators"]
             },
             "vote_breakdown": {
                 "individual_signals": individual_signals,
                 "buy_votes": buy_votes,
                 "sell_votes": sell_votes,
                 "neutral_votes": neutral_votes,
-                "threshold": MINIMUM_VOTE_THRESHOLD,
-                "final_signal": final_signal
-            }
+                "threshold": self.vote_threshold,
+                "final_signal": final_signal,
+                "pending": pending
+            },
+            "_state": state
+        }
+
+    def analyze(self, indicator_values: Optional[Dict], klines: List[List]) -> Tuple[str, Dict[str, Any]]:
+        """Kuralları değerlendir ve majority vote kararını ver
+
+        Args:
+            indicator_values: Kullanılmaz (IStrategy uyumluluğu) - indikatörler burada hesaplanır
+            klines: Mum verisi (son eleman aktif mum)
+
+        Returns:
+            (final_signal, context) - context["indicators"] hesaplanan indikatörlerin tam
+            serisini, context["vote_breakdown"] oylama detayını içerir
+        """
+        # Ortak ara sonuçlar (RSI, median, rolling extremum, EMA) bu kline seti için bir kez hesaplanır
+        indicator_context = IndicatorContext(klines)
+        for rule in self.rules:
+            indicator_context.register(rule.indicator)
+        state = {"klines": klines, "indicator_context": indicator_context, "signals": {}, "indicators": {}}
+        
+        # Her indikatör en fazla bir kez hesaplanır, oyu ve çıktısı aynı sonuçtan alınır
+        order = self._evaluation_order() if self.lazy else self.rules
+        buy_votes = sell_votes = 0
+        for evaluated, rule in enumerate(order, start=1):
+            self._evaluate(rule, state)
+            buy_votes += state["signals"][rule.name] == "BUY"
+            sell_votes += state["signals"][rule.name] == "SELL"
+            if self.lazy and self._is_decided(buy_votes, sell_votes, len(order) - evaluated, self.vote_threshold):
+                break
+        
+        context = self._build_context(state)
+        if context["vote_breakdown"]["pending"]:
+            logger.debug(f"Vote decided early, pending: {context['vote_breakdown']['pending']}")
+        logger.debug(f"Indicator context report: {indicator_context.report()}")
+        return context["vote_breakdown"]["final_signal"], context
+
+    def complete(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Lazy modda değerlendirilmeyen kuralları hesapla ve context'i tam dökümle güncelle"""
+        state = context.get("_state")
+        if not state or not context["vote_breakdown"].get("pending"):
+            return context
+        for rule in self.rules:
+            if rule.name not in state["signals"]:
+                self._evaluate(rule, state)
+        context.update(self._build_context(state))
+        return context
+
+    def analyze_series(self, klines: List[List], threshold: Optional[int] = None) -> Dict[str, Any]:
+        """Oy kurallarını tüm barlar için tek seferde değerlendir (vektörel mod)
+
+        Backtest, SignalTracker geçmişinin doldurulması ve eşik ayarı içindir.
+        i. eleman, klines[:i+1] ile ``analyze`` çağrısının verdiği sonuçla aynıdır.
+
+        Args:
+            klines: Mum verisi
+            threshold: Majority vote eşiği (varsayılan self.vote_threshold)
+
+        Returns:
+            Dict:
+            - votes: İndikatör adı -> int8 oy serisi (1 BUY, -1 SELL, 0 NEUTRAL)
+            - buy_votes / sell_votes: Bar başına oy sayıları (int8)
+            - signal: Bar başına final sinyal (int8)
+            - threshold: Kullanılan eşik
+        """
+        threshold = self.vote_threshold if threshold is None else threshold
+        n = len(klines)
+        
+        indicator_context = IndicatorContext(klines)
+        for rule in self.rules:
+            indicator_context.register(rule.indicator)
+        
+        votes: Dict[str, np.ndarray] = {}
+        for rule in self.rules:
+            if rule.vote_series is not None:
+                arrays = rule.indicator.calculate_arrays(klines, context=indicator_context)
+                votes[rule.name] = rule.vote_series(arrays)
+            else:
+                # Vektörel hali olmayan kural: skaler kuralı bar bar uygula
+                values = rule.indicator.calculate(klines, context=indicator_context)
+                votes[rule.name] = np.array(
+                    [VOTE_CODES[rule.vote(values, i)] for i in range(n)], dtype=np.int8
+                )
+        
+        if votes:
+            matrix = np.vstack(list(votes.values()))
+            buy_votes = (matrix == VOTE_BUY).sum(axis=0).astype(np.int8)
+            sell_votes = (matrix == VOTE_SELL).sum(axis=0).astype(np.int8)
+        else:
+            buy_votes = np.zeros(n, dtype=np.int8)
+            sell_votes = np.zeros(n, dtype=np.int8)
+        
+        return {
+            "votes": votes,
+            "buy_votes": buy_votes,
+            "sell_votes": sell_votes,
+            "signal": final_signals(buy_votes, sell_votes, threshold),
+            "threshold": threshold
         }
-        return final_signal, context
\ No newline at end of file
@@ -0,0 +1,361 @@
+"""
+Streaming Fiyat Akışı - Twelve Data WebSocket istemcisi ve yerel mum oluşturucu
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import websockets
+
+from config import TWELVE_DATA_WS_URL, STREAM_HISTORY_CANDLES, STREAM_CLOSE_GRACE_MS
+from core import ExchangeClient, TimeframeScheduler
+from klines import KlineFrame
+
+logger = logging.getLogger(__name__)
+
+# Mum satırı: (open_time_ms, open, high, low, close, volume)
+Candle = Tuple[int, float, float, float, float, float]
+
+
+class CandleBuilder:
+    """Tick'lerden yerel olarak mum oluşturur (sembol başına kapanmış mumlar + aktif mum)
+
+    - Tick, aktif mumdan sonraki bir kovaya düşerse aktif mum kapanır
+    - Tick gelmese de ``close_due(now)`` ile kova sınırında mum kapatılır
+    - Tick gelmeyen aralıklar (en fazla ``fill_gaps`` mum) son fiyattan düz mumla
+      doldurulur; daha uzun boşluklar (piyasa kapalı) doldurulmaz - ``close_due``
+      de ardışık ``fill_gaps`` tick'siz mumdan sonra yer tutucu açmaz, sonraki
+      gerçek tick yeni kovayı açar
+    - Kapanmış bir mumun kovasına gelen geç tick'ler sayılır ve atılır
+    """
+
+    def __init__(self, interval_ms: int = 60 * 1000, max_candles: int = 5000, fill_gaps: int = 60):
+        """
+        Args:
+            interval_ms: Mum süresi (ms)
+            max_candles: Sembol başına tutulacak kapanmış mum sayısı
+            fill_gaps: Düz mumla doldurulacak en uzun boşluk (mum sayısı)
+        """
+        self.interval_ms = interval_ms
+        self.max_candles = max_candles
+        self.fill_gaps = fill_gaps
+        self.closed: Dict[str, deque] = {}
+        # Aktif mum: [open_time, open, high, low, close, volume, tick_count]
+        self.current: Dict[str, List] = {}
+        self.idle: Dict[str, int] = {}  # Sembol başına ardışık tick'siz (düz) kapanmış mum sayısı
+        self.late_ticks = 0
+
+    def _closed(self, symbol: str) -> deque:
+        if symbol not in self.closed:
+            self.closed[symbol] = deque(maxlen=self.max_candles)
+        return self.closed[symbol]
+
+    def seed(self, symbol: str, frame: KlineFrame):
+        """REST geçmişiyle başlat / boşluk doldur (son mum aktif mum kabul edilir)
+
+        Çakışan kapanmış mumlarda REST verisi esas alınır. Akıştaki aktif mum
+        REST'in son mumundan yeniyse korunur.
+        """
+        if len(frame) == 0:
+            return
+        rows = list(zip(
+            frame.open_time.tolist(), frame.open.tolist(), frame.high.tolist(),
+            frame.low.tolist(), frame.close.tolist(), frame.volume.tolist()
+        ))
+        closed = self._closed(symbol)
+        merged = {row[0]: row for row in closed}
+        merged.update((row[0], row) for row in rows[:-1])
+
+        last = rows[-1]
+        current = self.current.get(symbol)
+        if current is None or current[0] <= last[0]:
+            self.current[symbol] = list(last) + [1]
+        else:
+            merged[last[0]] = last
+
+        closed.clear()
+        closed.extend(merged[key] for key in sorted(merged))
+
+    def add_tick(self, symbol: str, price: float, timestamp_ms: int, volume: float = 0.0) -> List[Candle]:
+        """Tick'i aktif muma işle, kapanan mumları döndür"""
+        bucket = timestamp_ms // self.interval_ms * self.interval_ms
+        current = self.current.get(symbol)
+        if current is None or bucket >= current[0]:
+            self.idle[symbol] = 0
+        if current is None:
+            self.current[symbol] = [bucket, price, price, price, price, volume, 1]
+            return []
+        if bucket < current[0]:
+            self.late_ticks += 1
+            return []
+
+        closed = []
+        if bucket > current[0]:
+            closed = self._roll(symbol, bucket)
+            self.current[symbol] = [bucket, price, price, price, price, volume, 1]
+        elif current[6] == 0:
+            # close_due ile açılan yer tutucu mumun ilk tick'i - açılış bu fiyattır
+            current[1:7] = [price, price, price, price, volume, 1]
+        else:
+            current[2] = max(current[2], price)
+            current[3] = min(current[3], price)
+            current[4] = price
+            current[5] += volume
+            current[6] += 1
+        return closed
+
+    def close_due(self, now_ms: int) -> Dict[str, List[Candle]]:
+        """Süresi dolan aktif mumları kapat (tick beklemeden)
+
+        Yeni aktif mum son fiyattan düz bir yer tutucu olarak açılır; ilk tick
+        geldiğinde OHLC o tick'ten başlar. Ardışık tick'siz mum sayısı fill_gaps'i
+        aşarsa (piyasa kapalı) yer tutucu atılır ve yenisi açılmaz.
+        """
+        bucket = now_ms // self.interval_ms * self.interval_ms
+        result = {}
+        for symbol, current in list(self.current.items()):
+            if current[0] + self.interval_ms <= now_ms:
+                placeholder = current[6] == 0
+                # Bu kapanışla birlikte ardışık tick'siz mum sayısı (yer tutucu + doldurulacak boşluk)
+                idle = (self.idle.get(symbol, 0) if placeholder else -1) + (bucket - current[0]) // self.interval_ms
+                if idle > self.fill_gaps:
+                    if placeholder:
+                        del self.current[symbol]
+                    else:
+                        result[symbol] = self._roll(symbol, current[0] + self.interval_ms)
+                        self.current.pop(symbol, None)
+                    self.idle[symbol] = 0
+                    logger.info(f"No ticks for {symbol} beyond {self.fill_gaps} candles, waiting for the next tick")
+                    continue
+                self.idle[symbol] = idle
+                closed = self._roll(symbol, bucket)
+                last_close = closed[-1][4]
+                self.current[symbol] = [bucket, last_close, last_close, last_close, last_close, 0.0, 0]
+                result[symbol] = closed
+        return result
+
+    def _roll(self, symbol: str, new_open: int) -> List[Candle]:
+        """Aktif mumu kapat, aradaki boş mumları (fill_gaps'e kadar) düz mumla doldur"""
+        current = self.current.pop(symbol)
+        closed = [tuple(current[:6])]
+        next_open = current[0] + self.interval_ms
+        if (new_open - next_open) // self.interval_ms <= self.fill_gaps:
+            last_close = current[4]
+            while next_open < new_open:
+                closed.append((next_open, last_close, last_close, last_close, last_close, 0.0))
+                next_open += self.interval_ms
+        self._closed(symbol).extend(closed)
+        return closed
+
+    def frame(self, symbol: str) -> KlineFrame:
+        """Kapanmış mumlar + aktif mum (REST çıktısıyla aynı şekil)"""
+        rows = list(self.closed.get(symbol, ()))
+        if symbol in self.current:
+            rows.append(tuple(self.current[symbol][:6]))
+        if not rows:
+            return KlineFrame.empty()
+        data = np.array(rows, dtype=np.float64)
+        return KlineFrame(
+            data[:, 0].astype(np.int64), data[:, 1], data[:, 2], data[:, 3], data[:, 4],
+            data[:, 5], interval_ms=self.interval_ms
+        )
+
+
+class StreamingClient(ExchangeClient):
+    """Twelve Data WebSocket fiyat akışından yerel 1m mum oluşturan ExchangeClient
+
+    Protokol (wss://ws.twelvedata.com/v1/quotes/price?apikey=KEY):
+    - Gönder: {"action": "subscribe", "params": {"symbols": "XAU/USD"}}
+    - Gönder: {"action": "heartbeat"} (10 sn'de bir)
+    - Al: {"event": "price", "symbol": ..., "price": ..., "timestamp": epoch_sn}
+    - Al: {"event": "subscribe-status" | "heartbeat", "status": ...}
+
+    Mum kova sınırından ``close_grace_ms`` sonra kapatılır ve ``wait_for_update``
+    bekleyen döngü hemen uyandırılır; analiz için 5 sn buffer ve finalize retry'ı
+    gerekmez. 1m dışındaki timeframe'ler ``history_client``'a (REST) iletilir;
+    ResamplingClient ile sarıldığında üst timeframe'ler akıştaki 1m'den türetilir.
+    Başlangıçta ve her yeniden bağlanmada geçmiş REST'ten doldurulur (boşluk kalmaz).
+    """
+
+    pushes_updates = True
+
+    def __init__(
+        self,
+        api_key: str,
+        symbols: Sequence[str],
+        history_client: Optional[ExchangeClient] = None,
+        url: str = TWELVE_DATA_WS_URL,
+        interval: str = "1m",
+        history_limit: int = STREAM_HISTORY_CANDLES,
+        close_grace_ms: int = STREAM_CLOSE_GRACE_MS,
+        heartbeat_interval: float = 10.0,
+        max_backoff: float = 30.0,
+        interval_ms: Optional[int] = None,
+    ):
+        """
+        Args:
+            api_key: Twelve Data API key (WebSocket bağlantısı için)
+            symbols: Abone olunacak semboller
+            history_client: Geçmiş ve 1m dışı timeframe'ler için REST client
+            url: WebSocket adresi (test için yerel stand-in verilebilir)
+            interval: Akıştan oluşturulan timeframe
+            history_limit: Başlangıçta REST'ten alınacak mum sayısı
+            close_grace_ms: Kova sınırından sonra geç tick'ler için bekleme (ms)
+            heartbeat_interval: Heartbeat aralığı (sn)
+            max_backoff: Yeniden bağlanma bekleme üst sınırı (sn)
+            interval_ms: Mum süresi override (test için, varsayılan interval'den)
+        """
+        self.api_key = api_key
+        self.symbols = list(symbols)
+        self.history_client = history_client
+        self.url = url
+        self.interval = interval
+        self.history_limit = history_limit
+        self.close_grace_ms = close_grace_ms
+        self.heartbeat_interval = heartbeat_interval
+        self.max_backoff = max_backoff
+        self.builder = CandleBuilder(interval_ms or TimeframeScheduler.TIMEFRAME_MS[interval], max_candles=max(history_limit, 5000))
+        self.connected = asyncio.Event()
+        self._updated = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"ticks": 0, "candles": 0, "reconnects": 0, "max_close_lag_ms": 0}
+
+    async def start(self):
+        """Geçmişi doldur, akış ve kapanış zamanlayıcısını başlat"""
+        await self._backfill()
+        self._tasks = [
+            asyncio.create_task(self._run()),
+            asyncio.create_task(self._close_timer()),
+        ]
+        logger.info(f"StreamingClient started for {', '.join(self.symbols)} ({self.url})")
+
+    async def _backfill(self):
+        """REST'ten son mumları alıp builder'a işle (başlangıç / yeniden bağlanma)"""
+        if self.history_client is None:
+            return
+        for symbol in self.symbols:
+            frame = await self.history_client.get_klines(symbol, self.interval, self.history_limit)
+            self.builder.seed(symbol, frame)
+            logger.info(f"Stream history for {symbol}: {len(frame)} candles")
+
+    async def _run(self):
+        """Bağlantı döngüsü - kopunca exponential backoff ile yeniden bağlan"""
+        backoff = 1.0
+        while True:
+            try:
+                async with websockets.connect(f"{self.url}?apikey={self.api_key}") as ws:
+                    await ws.send(json.dumps({
+                        "action": "subscribe", "params": {"symbols": ",".join(self.symbols)}
+                    }))
+                    self.connected.set()
+                    backoff = 1.0
+                    heartbeat = asyncio.create_task(self._heartbeat(ws))
+                    try:
+                        await self._consume(ws)
+                    finally:
+                        heartbeat.cancel()
+                        self.connected.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Price stream disconnected: {e}")
+
+            self.stats["reconnects"] += 1
+            logger.info(f"Reconnecting price stream in {backoff:.0f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(self.max_backoff, backoff * 2)
+            try:
+                await self._backfill()
+            except Exception as e:
+                logger.error(f"Stream backfill failed: {e}")
+
+    async def _heartbeat(self, ws):
+        """Bağlantıyı canlı tut"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await ws.send(json.dumps({"action": "heartbeat"}))
+
+    async def _consume(self, ws):
+        """Gelen mesajları işle"""
+        async for message in ws:
+            event = json.loads(message)
+            kind = event.get("event")
+            if kind == "price":
+                self.stats["ticks"] += 1
+                symbol = event["symbol"]
+                closed = self.builder.add_tick(
+                    symbol, float(event["price"]), int(float(event["timestamp"]) * 1000),
+                    float(event.get("volume") or 0.0)
+                )
+                if closed:
+                    self._on_close(symbol, closed)
+            elif kind == "subscribe-status":
+                if event.get("fails"):
+                    logger.error(f"Price stream subscription failed for: {event['fails']}")
+                else:
+                    logger.info(f"Price stream subscribed: {event.get('success')}")
+            elif kind == "heartbeat":
+                logger.debug("Price stream heartbeat ok")
+            elif event.get("status") == "error":
+                logger.error(f"Price stream error: {event.get('message', event)}")
+
+    async def _close_timer(self):
+        """Her kova sınırından close_grace_ms sonra tick beklemeden mumları kapat"""
+        interval_ms = self.builder.interval_ms
+        while True:
+            now_ms = int(time.time() * 1000)
+            next_close = (now_ms // interval_ms + 1) * interval_ms + self.close_grace_ms
+            await asyncio.sleep((next_close - now_ms) / 1000)
+            for symbol, closed in self.builder.close_due(int(time.time() * 1000) - self.close_grace_ms).items():
+                self._on_close(symbol, closed)
+
+    def _on_close(self, symbol: str, closed: List[Candle]):
+        """Kapanan mum(lar)ı say ve bekleyen analiz döngüsünü uyandır"""
+        boundary = closed[-1][0] + self.builder.interval_ms
+        lag_ms = int(time.time() * 1000) - boundary
+        self.stats["candles"] += len(closed)
+        self.stats["max_close_lag_ms"] = max(self.stats["max_close_lag_ms"], lag_ms)
+        logger.debug(f"{symbol} candle closed at {boundary} (+{lag_ms} ms)")
+        self._updated.set()
+
+    async def wait_for_update(self, timeout: float):
+        """Bir mum kapanana ya da timeout dolana kadar bekle"""
+        if not self._updated.is_set():
+            try:
+                await asyncio.wait_for(self._updated.wait(), timeout)
+            except asyncio.TimeoutError:
+                return
+        self._updated.clear()
+
+    async def get_klines(self, symbol: str, interval: str, limit: int = 101) -> KlineFrame:
+        """Akış timeframe'i yerel builder'dan, diğerleri history_client'tan"""
+        if interval == self.interval and symbol in self.symbols:
+            return self.builder.frame(symbol)[-limit:]
+        if self.history_client is None:
+            logger.error(f"No history client for {symbol} {interval}")
+            return KlineFrame.empty()
+        return await self.history_client.get_klines(symbol, interval, limit)
+
+    async def latest_closed_time(self, symbol: str, interval: str) -> Optional[int]:
+        """Akış timeframe'inde API isteği yapmadan builder'dan"""
+        if interval == self.interval and symbol in self.symbols:
+            closed = self.builder.closed.get(symbol)
+            if not closed:
+                return None
+            return closed[-1][0] + self.builder.interval_ms
+        if self.history_client is None:
+            return None
+        return await self.history_client.latest_closed_time(symbol, interval)
+
+    async def close(self):
+        """Akışı durdur, istatistikleri logla ve REST client'ı kapat"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info(f"Streaming stats: {self.stats}, late ticks: {self.builder.late_ticks}")
+        if self.history_client is not None:
+            await self.history_client.close()
@@ -0,0 +1,197 @@
+"""FailoverClient - hedged istek, failover, geri plana alma ve istatistikler
+
+Kaynaklar yerel stand-in ExchangeClient'lar: gecikme, hata ve boş yanıt
+davranışı test başına ayarlanır.
+"""
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from core import ExchangeClient
+from failover import FailoverClient
+from klines import KlineFrame
+
+
+def make_frame(price: float, count: int = 3) -> KlineFrame:
+    open_time = np.arange(count, dtype=np.int64) * 60_000
+    close = np.full(count, price)
+    return KlineFrame(open_time, close, close, close, close, interval_ms=60_000)
+
+
+class StandinSource(ExchangeClient):
+    """Ayarlanabilir gecikmeli / hatalı / boş yanıt veren kaynak"""
+
+    def __init__(self, price: float, delay: float = 0.0, error: Exception = None, empty: bool = False):
+        self.price = price
+        self.delay = delay
+        self.error = error
+        self.empty = empty
+        self.calls = 0
+        self.cancelled = 0
+        self.closed = 0
+
+    async def _respond(self, value):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return value
+
+    async def get_klines(self, symbol: str, interval: str, limit: int = 101) -> KlineFrame:
+        return await self._respond(KlineFrame.empty() if self.empty else make_frame(self.price))
+
+    async def latest_closed_time(self, symbol: str, interval: str):
+        return await self._respond(None if self.empty else int(self.price))
+
+    async def close(self):
+        self.closed += 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_hedges_to_next_source_after_delay_and_cancels_loser():
+    slow = StandinSource(1.0, delay=1.0)
+    fast = StandinSource(2.0)
+    client = FailoverClient({"slow": slow, "fast": fast}, min_delay=0.01, max_delay=0.05)
+
+    async def scenario():
+        started = time.perf_counter()
+        frame = await client.get_klines("XAU/USD", "1m")
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(0)  # İptal edilen görev CancelledError'ı işlesin
+        return frame, elapsed
+
+    frame, elapsed = run(scenario())
+    assert frame.close[-1] == 2.0
+    assert 0.05 <= elapsed < 0.5
+    assert slow.cancelled == 1
+    assert client.stats["slow"]["hedges"] == 1
+    assert client.stats["slow"]["cancelled"] == 1
+    assert client.stats["fast"]["wins"] == 1
+    assert client.stats["slow"]["wins"] == 0
+
+
+def test_no_hedge_when_primary_answers_within_delay():
+    primary = StandinSource(1.0, delay=0.01)
+    backup = StandinSource(2.0)
+    client = FailoverClient({"primary": primary, "backup": backup}, min_delay=0.01, max_delay=0.5)
+
+    frame = run(client.get_klines("XAU/USD", "1m"))
+    assert frame.close[-1] == 1.0
+    assert backup.calls == 0
+    assert client.stats["primary"]["hedges"] == 0
+
+
+def test_hedge_delay_uses_latency_percentile():
+    client = FailoverClient(
+        {"a": StandinSource(1.0)}, percentile=0.9, min_delay=0.1, max_delay=5.0, min_samples=5
+    )
+    # Yeterli ölçüm yokken max_delay
+    client.latencies["a"].extend([0.2, 0.3])
+    assert client.hedge_delay("a") == 5.0
+
+    samples = [0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0, 3.0]
+    client.latencies["a"].clear()
+    client.latencies["a"].extend(samples)
+    assert client.hedge_delay("a") == pytest.approx(np.quantile(samples, 0.9))
+
+    # min_delay / max_delay sınırları
+    client.latencies["a"].clear()
+    client.latencies["a"].extend([0.001] * 10)
+    assert client.hedge_delay("a") == 0.1
+    client.latencies["a"].clear()
+    client.latencies["a"].extend([9.0] * 10)
+    assert client.hedge_delay("a") == 5.0
+
+
+@pytest.mark.parametrize("failing", [
+    StandinSource(1.0, error=RuntimeError("boom")),
+    StandinSource(1.0, empty=True),
+], ids=["error", "empty"])
+def test_fails_over_immediately_on_error_or_empty_frame(failing):
+    backup = StandinSource(2.0)
+    client = FailoverClient({"primary": failing, "backup": backup}, min_delay=1.0, max_delay=1.0)
+
+    started = time.perf_counter()
+    frame = run(client.get_klines("XAU/USD", "1m"))
+    assert time.perf_counter() - started < 0.5  # Hedge gecikmesi beklenmedi
+    assert frame.close[-1] == 2.0
+    assert client.stats["primary"]["errors"] == 1
+    assert client.stats["primary"]["hedges"] == 0
+    assert client.stats["backup"]["wins"] == 1
+
+
+def test_all_sources_failing_returns_empty_result():
+    client = FailoverClient({
+        "a": StandinSource(1.0, error=RuntimeError("down")),
+        "b": StandinSource(2.0, empty=True),
+    })
+    assert len(run(client.get_klines("XAU/USD", "1m"))) == 0
+    assert run(client.latest_closed_time("XAU/USD", "1m")) is None
+
+
+def test_demotes_after_max_errors_and_recovers_after_cooldown():
+    clock = FakeClock()
+    flaky = StandinSource(1.0, error=RuntimeError("down"))
+    backup = StandinSource(2.0)
+    client = FailoverClient(
+        {"flaky": flaky, "backup": backup}, max_errors=2, cooldown=30, clock=clock
+    )
+
+    run(client.get_klines("XAU/USD", "1m"))
+    assert client.ranked() == ["flaky", "backup"]
+    run(client.get_klines("XAU/USD", "1m"))
+    assert client.ranked() == ["backup", "flaky"]
+
+    # Geri plandayken istek önce backup'a gider, flaky çağrılmaz
+    calls = flaky.calls
+    assert run(client.get_klines("XAU/USD", "1m")).close[-1] == 2.0
+    assert flaky.calls == calls
+
+    clock.now += 31
+    assert client.ranked() == ["flaky", "backup"]
+    flaky.error = None
+    assert run(client.get_klines("XAU/USD", "1m")).close[-1] == 1.0
+
+
+def test_describe_reports_per_source_stats():
+    primary = StandinSource(1.0, error=RuntimeError("down"))
+    backup = StandinSource(2.0)
+    client = FailoverClient({"primary": primary, "backup": backup}, max_errors=10)
+
+    for _ in range(3):
+        run(client.get_klines("XAU/USD", "1m"))
+    report = client.describe()
+
+    assert report["primary"]["requests"] == 3
+    assert report["primary"]["errors"] == 3
+    assert report["primary"]["wins"] == 0
+    assert "p50_ms" not in report["primary"]
+    assert report["backup"]["requests"] == 3
+    assert report["backup"]["wins"] == 3
+    assert report["backup"]["errors"] == 0
+    assert report["backup"]["p50_ms"] >= 0
+    assert "p95_ms" in report["backup"]
+
+
+def test_close_closes_shared_source_once():
+    shared = StandinSource(1.0)
+    client = FailoverClient({"a": shared, "b": shared})
+    run(client.close())
+    assert shared.closed == 1
@@ -0,0 +1,126 @@
+"""İndikatör streaming parity - update() ile calculate() aynı değerleri üretmeli
+
+Kapanmış mumlar sırayla update()'e verilir; her adımdaki çıktı, aynı veri
+üzerinde calculate() serisinin o indeksteki değeriyle karşılaştırılır.
+"""
+import numpy as np
+import pytest
+
+from indicators import (
+    ChandeMomentumOscillator, StochasticOscillator, RelativeStrengthIndex, MACD,
+    StochasticRSI, WilliamsR, FisherTransform, CoralTrend
+)
+
+MINUTE_MS = 60_000
+TOLERANCE = dict(rel=1e-9, abs=1e-9)
+
+INDICATORS = {
+    "cmo": lambda backend: ChandeMomentumOscillator(length=14, backend=backend),
+    "cmo_close": lambda backend: ChandeMomentumOscillator(length=9, use_low=False, backend=backend),
+    "stoch": lambda backend: StochasticOscillator(backend=backend),
+    "rsi": lambda backend: RelativeStrengthIndex(length=14, backend=backend),
+    "macd": lambda backend: MACD(),
+    "stoch_rsi": lambda backend: StochasticRSI(backend=backend),
+    "williams_r": lambda backend: WilliamsR(length=14, backend=backend),
+    "fisher": lambda backend: FisherTransform(length=10),
+    "coral": lambda backend: CoralTrend(),
+}
+
+
+def make_klines(close: np.ndarray, seed: int = 0) -> list:
+    """Kapanış serisinden [open_time, open, high, low, close, volume, close_time] satırları"""
+    rng = np.random.default_rng(seed)
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 0.4, (2, len(close))))
+    high = np.maximum(open_, close) + spread[0]
+    low = np.minimum(open_, close) - spread[1]
+    return [
+        [i * MINUTE_MS, o, h, l, c, 0.0, (i + 1) * MINUTE_MS - 1]
+        for i, (o, h, l, c) in enumerate(zip(open_, high, low, close))
+    ]
+
+
+def random_walk(count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 2000.0 + np.cumsum(rng.normal(0, 1.5, count))
+
+
+def stream(indicator, klines: list) -> list:
+    """Mumları tek tek update()'e ver, her adımın çıktısını topla"""
+    indicator.reset()
+    return [indicator.update(candle) for candle in klines]
+
+
+def assert_parity(indicator, klines: list):
+    batch = indicator.calculate(klines)
+    streamed = stream(indicator, klines)
+    compared = 0
+    for i, values in enumerate(streamed):
+        for key, value in values.items():
+            series = batch.get(key)
+            if not isinstance(series, list):
+                continue
+            expected = series[i]
+            if expected is None or (isinstance(expected, float) and np.isnan(expected)):
+                assert value is None or np.isnan(value), f"{key}[{i}]: expected no value, got {value}"
+            else:
+                assert value is not None, f"{key}[{i}]: expected {expected}, got None"
+                assert value == pytest.approx(expected, **TOLERANCE), f"{key}[{i}]"
+                compared += 1
+    assert compared > 0
+
+
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+@pytest.mark.parametrize("name", list(INDICATORS))
+def test_update_matches_calculate(name, backend):
+    klines = make_klines(random_walk(400, seed=7), seed=7)
+    assert_parity(INDICATORS[name](backend), klines)
+
+
+@pytest.mark.parametrize("name", list(INDICATORS))
+def test_warm_up_returns_last_calculate_value(name):
+    klines = make_klines(random_walk(300, seed=3), seed=3)
+    indicator = INDICATORS[name]("python")
+    latest = indicator.warm_up(klines)
+    batch = indicator.calculate(klines)
+    for key, value in latest.items():
+        if isinstance(batch.get(key), list) and batch[key][-1] is not None:
+            assert value == pytest.approx(batch[key][-1], **TOLERANCE)
+
+    # warm_up sonrası update, tüm seriyle calculate'in son değerine devam eder
+    extra = make_klines(random_walk(301, seed=3), seed=3)[-1:]
+    extra[0][0], extra[0][6] = 300 * MINUTE_MS, 301 * MINUTE_MS - 1
+    updated = indicator.update(extra[0])
+    batch = indicator.calculate(klines + extra)
+    for key, value in updated.items():
+        if isinstance(batch.get(key), list) and batch[key][-1] is not None:
+            assert value == pytest.approx(batch[key][-1], **TOLERANCE)
+
+
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_cmo_and_rsi_exact_zero_after_moves(backend):
+    """Hareketli bir bölümün ardından düz pencere: kayan toplam artığı kalmamalı"""
+    close = np.r_[random_walk(60, seed=11), np.full(40, 2001.37)]
+    klines = make_klines(close, seed=11)
+    for candle in klines[60:]:
+        candle[1:5] = [2001.37] * 4  # Tamamen düz mumlar (low da sabit)
+
+    cmo = ChandeMomentumOscillator(length=14, backend=backend)
+    rsi = RelativeStrengthIndex(length=14, backend=backend)
+    cmo_stream = stream(cmo, klines)
+    rsi_stream = stream(rsi, klines)
+    cmo_batch = cmo.calculate(klines)["cmo"]
+    rsi_batch = rsi.calculate(klines)["rsi"]
+
+    # Son 14 değişimin tamamı sıfır: CMO tam 0.0, RSI kayıp yok -> tam 100.0
+    for i in range(60 + 15, len(klines)):
+        assert cmo_stream[i]["cmo"] == 0.0 and cmo_batch[i] == 0.0
+        assert rsi_stream[i]["rsi"] == 100.0 and rsi_batch[i] == 100.0
+
+    # Sadece yükselen pencere: kayıp toplamı tam 0 -> RSI tam 100.0 (öncesinde kayıplar vardı)
+    rising = np.r_[random_walk(60, seed=5), 2100.0 + np.arange(30) * 0.37]
+    klines = make_klines(rising, seed=5)
+    rsi_stream = stream(rsi, klines)
+    rsi_batch = rsi.calculate(klines)["rsi"]
+    for i in range(60 + 15, len(klines)):
+        assert rsi_stream[i]["rsi"] == 100.0 and rsi_batch[i] == 100.0
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Twelve Data yanıt çözümleme benchmark'ı - mum başına decode maliyeti
+
+JSON decode (json / orjson) ve values -> KlineFrame dönüşümü (satır satır
+strptime yolu / vektörel hızlı yol) outputsize 100 ve 5000 için ölçülür.
+
+Kullanım:
+    python tools/bench_decode.py [--sizes 100,5000] [--candles 200000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import _decode_time_series_slow, decode_time_series, orjson  # noqa: E402
+
+INTERVAL_MS = 60 * 1000
+
+
+def make_payload(count: int) -> bytes:
+    """Twelve Data time_series formatında (en yeni başta) sahte yanıt"""
+    newest = 1_735_732_800
+    values = []
+    for i in range(count):
+        price = 2000 + np.sin(i / 50) * 10
+        values.append({
+            "datetime": datetime.fromtimestamp(newest - 60 * i, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            "open": f"{price:.5f}",
+            "high": f"{price + 0.8:.5f}",
+            "low": f"{price - 0.8:.5f}",
+            "close": f"{price + 0.1:.5f}",
+        })
+    return json.dumps({"meta": {"symbol": "XAU/USD", "interval": "1min"}, "values": values, "status": "ok"}).encode()
+
+
+def per_candle_us(func, arg, count: int, budget: int) -> float:
+    """func(arg) çağrısının mum başına ortalama süresi (mikrosaniye)"""
+    repeats = max(3, budget // count)
+    func(arg)  # ısınma
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func(arg)
+    return (time.perf_counter() - start) / repeats / count * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Twelve Data decode benchmark")
+    parser.add_argument("--sizes", default="100,5000", help="outputsize değerleri")
+    parser.add_argument("--candles", type=int, default=200_000, help="Ölçüm başına toplam mum sayısı")
+    args = parser.parse_args(argv)
+
+    print(f"orjson: {'available' if orjson is not None else 'not installed'}")
+    print(f"{'outputsize':>10} {'json':>8} {'orjson':>8} {'slow':>8} {'fast':>8} {'speedup':>8}   (us/candle)")
+    for count in (int(size) for size in args.sizes.split(",")):
+        payload = make_payload(count)
+        values = json.loads(payload)["values"]
+
+        slow = _decode_time_series_slow(values[::-1], INTERVAL_MS)
+        fast = decode_time_series(values, INTERVAL_MS)
+        assert np.array_equal(slow.open_time, fast.open_time) and np.array_equal(slow.close, fast.close)
+
+        json_us = per_candle_us(json.loads, payload, count, args.candles)
+        orjson_us = per_candle_us(orjson.loads, payload, count, args.candles) if orjson is not None else float("nan")
+        slow_us = per_candle_us(lambda v: _decode_time_series_slow(v[::-1], INTERVAL_MS), values, count, args.candles)
+        fast_us = per_candle_us(lambda v: decode_time_series(v, INTERVAL_MS), values, count, args.candles)
+        print(f"{count:>10} {json_us:>8.2f} {orjson_us:>8.2f} {slow_us:>8.2f} {fast_us:>8.2f} {slow_us / fast_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
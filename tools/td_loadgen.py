@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+TwelveDataClient yük üreteci - fetch yolunun throughput ve kuyruk gecikmesini ölçer
+
+Eşzamanlı worker'lar get_klines çağırır; istek başına gecikme (rate limiter
+beklemesi, batch penceresi ve HTTP dahil), başarı oranı ve key dağılımı raporlanır.
+Varsayılan olarak stand-in aynı süreçte başlatılır (tools/td_standin.py), ``--url``
+ile çalışan bir stand-in'e bağlanılabilir. Gerçek API'ye yönlendirmeyin - kota harcar.
+
+Kullanım:
+    python tools/td_loadgen.py --requests 500 --concurrency 20 --keys 3 --rate-limit 600 \\
+        --latency-ms 80 --jitter-ms 60 --error-rate 0.01
+    python tools/td_loadgen.py --url http://127.0.0.1:8766 --duration 30
+    python tools/td_loadgen.py --symbols XAU/USD,EUR/USD,GBP/USD --batch-window 0.05  # birleştirme
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TARGET_SYMBOL, TWELVE_DATA_RATE_LIMIT_PER_MINUTE, TWELVE_DATA_BATCH_WINDOW  # noqa: E402
+from core import ApiKeyScheduler, TwelveDataClient  # noqa: E402
+
+from td_standin import StandinState, serve  # noqa: E402
+
+
+async def run_load(client: TwelveDataClient, symbols, interval: str, outputsize: int,
+                   concurrency: int, requests: int, duration: float):
+    """Worker'ları çalıştır, (gecikmeler, başarı sayacı, toplam süre) döndür"""
+    latencies = []
+    outcomes = Counter()
+    issued = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    async def worker(index: int):
+        nonlocal issued
+        while True:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            if deadline is None and issued >= requests:
+                return
+            symbol = symbols[issued % len(symbols)]
+            issued += 1
+            t0 = time.perf_counter()
+            frame = await client.get_klines(symbol, interval, outputsize)
+            latencies.append(time.perf_counter() - t0)
+            outcomes["ok" if len(frame) > 0 else "failed"] += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return np.array(latencies), outcomes, time.perf_counter() - start
+
+
+def format_report(latencies: np.ndarray, outcomes: Counter, elapsed: float, client: TwelveDataClient) -> str:
+    """Throughput, gecikme yüzdelikleri ve key dağılımı"""
+    lines = [
+        f"requests: {len(latencies)} ({outcomes['ok']} ok, {outcomes['failed']} failed) in {elapsed:.2f}s",
+        f"throughput: {len(latencies) / elapsed:.1f} req/s, {client.downloaded_candles / elapsed:.0f} candles/s",
+    ]
+    if len(latencies):
+        p50, p90, p99 = np.quantile(latencies, [0.5, 0.9, 0.99]) * 1000
+        lines.append(f"latency ms: p50 {p50:.1f}  p90 {p90:.1f}  p99 {p99:.1f}  max {latencies.max() * 1000:.1f}")
+    for i, (key, count) in enumerate(client.request_counts.items(), 1):
+        lines.append(f"  key {i}: {count} credits")
+    return "\n".join(lines)
+
+
+async def main_async(args):
+    server = None
+    url = args.url
+    if url is None:
+        state = StandinState(
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+            stale_seconds=args.stale_seconds, rate_limit=args.server_rate_limit, seed=args.seed,
+        )
+        server = serve(state, port=0)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    keys = [f"standin-key-{i}" for i in range(1, args.keys + 1)]
+    # Sadece bellekte tutulan kullanım - gerçek api_usage.json'a yazılmaz
+    scheduler = ApiKeyScheduler(keys, daily_limit=10 ** 9, per_minute=args.rate_limit, usage_path=None)
+    client = TwelveDataClient(keys, batch_window=args.batch_window, base_url=url, key_scheduler=scheduler)
+    symbols = [s for s in args.symbols.split(",") if s]
+    try:
+        latencies, outcomes, elapsed = await run_load(
+            client, symbols, args.interval, args.outputsize, args.concurrency, args.requests, args.duration
+        )
+    finally:
+        await client.client.aclose()
+        if server is not None:
+            server.shutdown()
+
+    print(f"target: {url}  concurrency {args.concurrency}, {args.keys} key(s) x {args.rate_limit}/min, "
+          f"batch window {args.batch_window}s")
+    print(format_report(latencies, outcomes, elapsed, client))
+    if server is not None:
+        print(f"server: {dict(state.stats)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TwelveDataClient load generator")
+    parser.add_argument("--url", default=None, help="Çalışan stand-in adresi (yoksa süreç içinde başlatılır)")
+    parser.add_argument("--requests", type=int, default=200, help="Toplam istek (--duration yoksa)")
+    parser.add_argument("--duration", type=float, default=0, help="Süre bazlı test (sn)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--keys", type=int, default=3, help="Sahte API key sayısı")
+    parser.add_argument("--rate-limit", type=int, default=TWELVE_DATA_RATE_LIMIT_PER_MINUTE,
+                        help="Client tarafı key başına dakikalık limit")
+    parser.add_argument("--batch-window", type=float, default=TWELVE_DATA_BATCH_WINDOW,
+                        help="İstek birleştirme penceresi (sn, varsayılan bottaki değer; çok sembolde örn. 0.05)")
+    parser.add_argument("--symbols", default=TARGET_SYMBOL)
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--outputsize", type=int, default=101)
+    # Süreç içi stand-in ayarları
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--stale-seconds", type=float, default=0)
+    parser.add_argument("--server-rate-limit", type=int, default=0, help="Sunucu tarafı key başına dakikalık kredi")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Twelve Data HTTP stand-in'i - /time_series'i kayıtlı (CSV) ya da sentetik veriden sunar
+
+Gerçek API'ye gitmeden (kota harcamadan) TwelveDataClient, key rotasyonu,
+finalize retry'ı ve rate limit davranışını denemek için:
+- Gecikme: ``--latency-ms`` + üstel dağılımlı ``--jitter-ms`` (kuyruk gecikmesi)
+- Hata: ``--error-rate`` olasılıkla HTTP 500
+- Bayat son mum: yeni dakikanın mumu sınırdan ``--stale-seconds`` sonra görünür
+  (o süre boyunca son kapanmış mum hâlâ "aktif" mum olarak döner)
+- Key başına dakikalık / günlük kredi limiti (sembol başına 1 kredi, aşılırsa
+  Twelve Data gibi gövdede code 429 ile hata)
+
+Kullanım:
+    python tools/td_standin.py --port 8766 --latency-ms 150 --jitter-ms 100 --stale-seconds 8
+    python tools/td_standin.py --csv data/xauusd_1m.csv --rate-limit 8 --keys k1,k2
+
+Bot tarafında: config.py'de TWELVE_DATA_BASE_URL = "http://127.0.0.1:8766"
+Sunucu sayaçları: GET /stats
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtest import load_csv  # noqa: E402
+from core import TimeframeScheduler, TwelveDataClient  # noqa: E402
+from klines import KlineFrame  # noqa: E402
+from replay import synthetic_minutes  # noqa: E402
+from resampler import resample  # noqa: E402
+
+MINUTE_MS = 60 * 1000
+# Twelve Data interval adı -> ms
+INTERVAL_MS = {
+    td_interval: TimeframeScheduler.TIMEFRAME_MS[interval]
+    for interval, td_interval in TwelveDataClient.TIMEFRAME_MAP.items()
+    if interval in TimeframeScheduler.TIMEFRAME_MS
+}
+
+
+class StandinState:
+    """Sunucu verisi ve sayaçları (handler thread'leri arasında paylaşılır)"""
+
+    def __init__(
+        self,
+        csv_path: Optional[str] = None,
+        history_days: float = 30,
+        horizon_days: float = 7,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0,
+        stale_seconds: float = 0,
+        rate_limit: int = 0,
+        daily_limit: int = 0,
+        keys: Optional[Sequence[str]] = None,
+        seed: int = 0,
+    ):
+        self.csv_path = csv_path
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.stale_ms = int(stale_seconds * 1000)
+        self.rate_limit = rate_limit
+        self.daily_limit = daily_limit
+        self.keys = set(keys) if keys else None
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        now_minute = int(time.time() * 1000) // MINUTE_MS * MINUTE_MS
+        self.history_minutes = int(history_days * 24 * 60)
+        self.start_ms = now_minute - self.history_minutes * MINUTE_MS
+        self.total_minutes = self.history_minutes + int(horizon_days * 24 * 60)
+        self.recorded = self._load_recorded(now_minute) if csv_path else None
+        self.series: Dict[str, KlineFrame] = {}
+        self.minute_windows: Dict[str, deque] = {}
+        self.daily_usage = Counter()
+        self.stats = Counter()
+
+    def _load_recorded(self, now_minute: int) -> KlineFrame:
+        """CSV'yi zamanda kaydır: ilk history_minutes mum geçmiş, kalanı canlı gibi açılır"""
+        frame = load_csv(self.csv_path, "1m")
+        pivot = min(len(frame) - 1, self.history_minutes)
+        shift = now_minute - int(frame.open_time[pivot])
+        return KlineFrame(
+            frame.open_time + shift, frame.open, frame.high, frame.low, frame.close, frame.volume,
+            interval_ms=MINUTE_MS
+        )
+
+    def minutes(self, symbol: str) -> KlineFrame:
+        """Sembolün tüm 1m serisi (CSV tek seri olarak her sembole sunulur)"""
+        if self.recorded is not None:
+            return self.recorded
+        if symbol not in self.series:
+            self.series[symbol] = synthetic_minutes(symbol, self.start_ms, self.total_minutes, self.seed)
+        return self.series[symbol]
+
+    def delay(self) -> float:
+        """Bu istek için yapay gecikme (sn)"""
+        jitter = self.rng.expovariate(1 / self.jitter_ms) if self.jitter_ms else 0.0
+        return (self.latency_ms + jitter) / 1000
+
+    def charge(self, apikey: str, credits: int) -> Optional[dict]:
+        """Key doğrulama + kredi düş; limit aşılırsa Twelve Data hata gövdesi döner"""
+        if self.keys is not None and apikey not in self.keys:
+            self.stats["unauthorized"] += 1
+            return {"code": 401, "message": "**apikey** parameter is incorrect or not specified.", "status": "error"}
+        now = time.time()
+        window = self.minute_windows.setdefault(apikey, deque())
+        while window and window[0] <= now - 60:
+            window.popleft()
+        if self.rate_limit and len(window) + credits > self.rate_limit:
+            self.stats["rate_limited"] += 1
+            return {
+                "code": 429,
+                "message": f"You have run out of API credits for the current minute. "
+                           f"{len(window) + credits} API credits were used, with the current limit being {self.rate_limit}.",
+                "status": "error",
+            }
+        if self.daily_limit and self.daily_usage[apikey] + credits > self.daily_limit:
+            self.stats["daily_limited"] += 1
+            return {"code": 429, "message": "You have run out of API credits for the day.", "status": "error"}
+        window.extend([now] * credits)
+        self.daily_usage[apikey] += credits
+        self.stats[f"credits:{apikey}"] += credits
+        return None
+
+    def series_payload(self, symbol: str, interval: str, outputsize: int) -> dict:
+        """Tek sembolün time_series yanıtı (en yeni başta, aktif mum dahil)"""
+        interval_ms = INTERVAL_MS.get(interval)
+        if interval_ms is None:
+            return {"code": 400, "message": f"**interval** parameter is invalid: {interval}", "status": "error"}
+
+        minutes = self.minutes(symbol)
+        # Bayat son mum: yeni dakika sınırdan stale_ms sonra görünür
+        visible_until = int(time.time() * 1000) - self.stale_ms
+        visible = minutes[:int(np.searchsorted(minutes.open_time, visible_until, side="right"))]
+        frame = visible if interval_ms == MINUTE_MS else resample(visible, interval_ms)
+        frame = frame[-outputsize:]
+        if len(frame) == 0:
+            return {"code": 400, "message": "No data is available on the specified dates.", "status": "error"}
+
+        fmt = "%Y-%m-%d" if interval_ms >= 24 * 60 * MINUTE_MS else "%Y-%m-%d %H:%M:%S"
+        values = [
+            {
+                "datetime": datetime.fromtimestamp(int(t) / 1000, tz=timezone.utc).strftime(fmt),
+                "open": f"{o:.5f}", "high": f"{h:.5f}", "low": f"{l:.5f}", "close": f"{c:.5f}",
+            }
+            for t, o, h, l, c in zip(frame.open_time, frame.open, frame.high, frame.low, frame.close)
+        ]
+        values.reverse()
+        return {
+            "meta": {"symbol": symbol, "interval": interval, "exchange_timezone": "UTC", "type": "Physical Currency"},
+            "values": values,
+            "status": "ok",
+        }
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """GET /time_series ve /stats"""
+
+    state: StandinState = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        state = self.state
+        if url.path == "/stats":
+            with state.lock:
+                return self._send(200, dict(state.stats))
+        if url.path != "/time_series":
+            return self._send(404, {"code": 404, "message": "Not found", "status": "error"})
+
+        time.sleep(state.delay())
+        with state.lock:
+            state.stats["requests"] += 1
+            if state.rng.random() < state.error_rate:
+                state.stats["errors"] += 1
+                return self._send(500, {"code": 500, "message": "Internal server error", "status": "error"})
+
+            symbols = [s.strip() for s in params.get("symbol", "").split(",") if s.strip()]
+            if not symbols:
+                return self._send(200, {"code": 400, "message": "**symbol** parameter is required", "status": "error"})
+            error = state.charge(params.get("apikey", ""), len(symbols))
+            if error is not None:
+                return self._send(200, error)
+
+            outputsize = max(1, min(5000, int(params.get("outputsize", 30))))
+            interval = params.get("interval", "1min")
+            payloads = {symbol: state.series_payload(symbol, interval, outputsize) for symbol in symbols}
+            state.stats["candles"] += sum(len(p.get("values", ())) for p in payloads.values())
+        self._send(200, payloads[symbols[0]] if len(symbols) == 1 else payloads)
+
+    def _send(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(state: StandinState, host: str = "127.0.0.1", port: int = 8766, background: bool = True) -> ThreadingHTTPServer:
+    """Stand-in'i başlat (background=True: daemon thread'de, ``server.shutdown()`` ile durdurulur)
+
+    port=0 ile boş bir port seçilir: ``server.server_address[1]``.
+    """
+    handler = type("Handler", (StandinHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    if background:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    else:
+        server.serve_forever()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Twelve Data /time_series HTTP stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--csv", default=None, help="Kayıtlı 1m CSV (yoksa sentetik veri)")
+    parser.add_argument("--history-days", type=float, default=30, help="Başlangıçta geçmişte kalan veri (gün)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Sabit gecikme")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Üstel dağılımlı ek gecikme ortalaması")
+    parser.add_argument("--error-rate", type=float, default=0, help="HTTP 500 olasılığı (0-1)")
+    parser.add_argument("--stale-seconds", type=float, default=0, help="Yeni mumun sınırdan kaç sn sonra görüneceği")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Key başına dakikalık kredi (0: limitsiz)")
+    parser.add_argument("--daily-limit", type=int, default=0, help="Key başına günlük kredi (0: limitsiz)")
+    parser.add_argument("--keys", default="", help="Kabul edilen key'ler (virgülle, boş: hepsi)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    state = StandinState(
+        csv_path=args.csv, history_days=args.history_days, latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms, error_rate=args.error_rate, stale_seconds=args.stale_seconds,
+        rate_limit=args.rate_limit, daily_limit=args.daily_limit,
+        keys=[k for k in args.keys.split(",") if k], seed=args.seed,
+    )
+    print(f"Twelve Data stand-in listening on http://{args.host}:{args.port}")
+    try:
+        serve(state, args.host, args.port, background=False)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Twelve Data WebSocket fiyat akışı stand-in'i - StreamingClient'ı yerelde test etmek için
+
+/v1/quotes/price protokolünün kullanılan kısmını uygular: subscribe,
+unsubscribe, reset, heartbeat ve abone olunan semboller için random-walk
+"price" event'leri.
+
+Kullanım:
+    python tools/ws_standin.py [--port 8765] [--tick-interval 0.2]
+
+Bot tarafında:
+    TWELVE_DATA_WS_URL = "ws://127.0.0.1:8765/v1/quotes/price"
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Dict, Set
+
+import websockets
+
+DEFAULT_PRICES = {"XAU/USD": 2000.0}
+
+
+async def serve_price_feed(host: str = "127.0.0.1", port: int = 8765, tick_interval: float = 0.2,
+                           volatility: float = 0.0002, seed: int = None):
+    """Stand-in sunucusunu başlat (websockets Server döner; ``async with`` ile de kullanılabilir)
+
+    Args:
+        host, port: Dinlenecek adres (port=0: boş port, ``server.sockets[0].getsockname()``)
+        tick_interval: Sembol başına tick aralığı (sn)
+        volatility: Tick başına göreli fiyat adımı (std)
+        seed: Random-walk tohumu (tekrarlanabilir testler için)
+    """
+    rng = random.Random(seed)
+    prices: Dict[str, float] = dict(DEFAULT_PRICES)
+
+    async def stream(ws, symbols: Set[str]):
+        while True:
+            await asyncio.sleep(tick_interval)
+            for symbol in list(symbols):
+                price = prices.setdefault(symbol, 100.0)
+                price *= 1 + rng.gauss(0, volatility)
+                prices[symbol] = price
+                await ws.send(json.dumps({
+                    "event": "price",
+                    "symbol": symbol,
+                    "currency_base": symbol.split("/")[0],
+                    "currency_quote": symbol.split("/")[-1],
+                    "type": "Physical Currency",
+                    "timestamp": int(time.time()),
+                    "price": round(price, 5),
+                }))
+
+    async def handler(ws):
+        symbols: Set[str] = set()
+        ticker = asyncio.create_task(stream(ws, symbols))
+        try:
+            async for message in ws:
+                try:
+                    request = json.loads(message)
+                except ValueError:
+                    await ws.send(json.dumps({"status": "error", "message": "invalid JSON"}))
+                    continue
+                action = request.get("action")
+                requested = [s.strip() for s in str(request.get("params", {}).get("symbols", "")).split(",") if s.strip()]
+                if action == "subscribe":
+                    symbols.update(requested)
+                    await ws.send(json.dumps({
+                        "event": "subscribe-status", "status": "ok",
+                        "success": [{"symbol": s, "exchange": "PHYSICAL CURRENCY", "type": "Physical Currency"} for s in requested],
+                        "fails": [],
+                    }))
+                elif action == "unsubscribe":
+                    symbols.difference_update(requested)
+                    await ws.send(json.dumps({"event": "unsubscribe-status", "status": "ok", "success": requested, "fails": []}))
+                elif action == "reset":
+                    symbols.clear()
+                    await ws.send(json.dumps({"event": "reset-status", "status": "ok"}))
+                elif action == "heartbeat":
+                    await ws.send(json.dumps({"event": "heartbeat", "status": "ok"}))
+                else:
+                    await ws.send(json.dumps({"status": "error", "message": f"unknown action: {action}"}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            ticker.cancel()
+
+    return await websockets.serve(handler, host, port)
+
+
+async def _run(args):
+    server = await serve_price_feed(args.host, args.port, args.tick_interval, args.volatility, args.seed)
+    print(f"Price feed stand-in listening on ws://{args.host}:{args.port}/v1/quotes/price")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Twelve Data WebSocket price feed stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tick-interval", type=float, default=0.2, help="Sembol başına tick aralığı (sn)")
+    parser.add_argument("--volatility", type=float, default=0.0002, help="Tick başına göreli fiyat adımı")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()